@@ -0,0 +1,110 @@
+"""
+Compare the SkillMatcher index with the old per-team substring scorer.
+
+Usage (from backend/):
+    python -m benchmarks.skill_matcher [--teams 10 1000 10000] [--tickets 200]
+
+Teams get 30 skills each from a synthetic vocabulary (one- to three-word
+phrases); tickets are ~80 words drawn from the same vocabulary plus filler.
+No database is needed.
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List
+from triage.skill_matcher import SkillMatcher
+
+
+SKILLS_PER_TEAM = 30
+FILLER = ["the", "customer", "says", "that", "after", "update", "page", "shows", "again", "please", "help", "today"]
+
+
+def legacy_score_users(users: List[Dict], context: Dict, priority_info: Dict) -> List[Dict]:
+    """The scorer AssigneeAgent used before SkillMatcher (substring checks per skill)."""
+    title = (context.get("title") or "").lower()
+    body = (context.get("body") or "").lower()
+    tags = [t.lower() for t in (context.get("tags") or [])]
+    product_area = (context.get("product_area") or "").lower()
+
+    combined_text = f"{title} {body} {product_area} {' '.join(tags)}"
+
+    for team in users:
+        skill_score = 0.0
+        team_skills = [s.lower() for s in team.get("skills", [])]
+        for skill in team_skills:
+            if skill in combined_text:
+                skill_score += 10.0
+        team["score"] = skill_score
+
+    users.sort(key=lambda u: u["score"], reverse=True)
+    return users
+
+
+def make_vocabulary(rng: random.Random, size: int) -> List[str]:
+    words = [f"w{i}" for i in range(size)]
+    phrases = []
+    for _ in range(size):
+        phrases.append(" ".join(rng.sample(words, rng.choice((1, 1, 2, 3)))))
+    return phrases
+
+
+def make_teams(rng: random.Random, count: int, vocabulary: List[str]) -> List[Dict]:
+    return [
+        {"user_id": f"team_{i}", "name": f"Team {i}", "skills": rng.sample(vocabulary, SKILLS_PER_TEAM)}
+        for i in range(count)
+    ]
+
+
+def make_tickets(rng: random.Random, count: int, vocabulary: List[str]) -> List[Dict]:
+    tickets = []
+    for _ in range(count):
+        words = [rng.choice(vocabulary) if rng.random() < 0.2 else rng.choice(FILLER) for _ in range(80)]
+        tickets.append({"title": " ".join(words[:8]), "body": " ".join(words[8:]), "tags": [], "product_area": ""})
+    return tickets
+
+
+def _time_per_ticket(score, tickets: List[Dict]) -> List[float]:
+    timings = []
+    for ticket in tickets:
+        started = time.perf_counter()
+        score(ticket)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def benchmark(team_counts: List[int], ticket_count: int, seed: int):
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng, 5000)
+    tickets = make_tickets(rng, ticket_count, vocabulary)
+
+    print(f"{ticket_count} tickets, {SKILLS_PER_TEAM} skills per team\n")
+    print(f"{'teams':>7} {'build ms':>9} {'legacy p50 ms':>14} {'matcher p50 ms':>15} {'top-5 p50 ms':>13} {'speedup':>8}")
+
+    for count in team_counts:
+        teams = make_teams(rng, count, vocabulary)
+
+        started = time.perf_counter()
+        matcher = SkillMatcher(teams)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        # The old callers copied the roster before scoring; include that cost
+        legacy = _time_per_ticket(lambda t: legacy_score_users([dict(team) for team in teams], t, {}), tickets)
+        full = _time_per_ticket(lambda t: matcher.score(t), tickets)
+        top = _time_per_ticket(lambda t: matcher.score(t, limit=5), tickets)
+
+        legacy_p50 = statistics.median(legacy)
+        top_p50 = statistics.median(top)
+        print(
+            f"{count:>7} {build_ms:>9.1f} {legacy_p50:>14.3f} {statistics.median(full):>15.3f} "
+            f"{top_p50:>13.3f} {legacy_p50 / top_p50:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--tickets", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    benchmark(args.teams, args.tickets, args.seed)
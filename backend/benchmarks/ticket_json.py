@@ -0,0 +1,129 @@
+"""
+Compare the orjson ticket response path with the old ticket_helper + Pydantic path.
+
+Usage (from backend/):
+    python -m benchmarks.ticket_json [--tickets 10000] [--runs 5]
+
+Documents look like reads from the tz_aware client (IST-aware datetimes,
+ObjectId _id, dedup fields, ten recent activities); list items are
+projected to TicketSummary fields first, as GET /tickets reads them.
+The legacy path is what FastAPI did per response: ticket_helper,
+response_model validation and serialisation, then json.dumps. No
+database is needed.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+import pytz
+from bson import ObjectId
+from pydantic import TypeAdapter
+from database import IST
+from schemas import TicketResponse, TicketSummary
+from migrate_tickets import rationale_text
+from services.ticket_json import TICKET_FIELDS, TICKET_SUMMARY_FIELDS, dumps, ticket_document
+
+
+ist = pytz.timezone("Asia/Kolkata")
+STATUSES = ["open", "triaged", "in_progress", "resolved", "closed"]
+AREAS = ["billing", "auth", "api", "mobile", "infra"]
+
+
+def legacy_ticket_helper(ticket: Dict) -> Dict:
+    """ticket_helper before the fast path (IST localisation and isoformat on every datetime)."""
+    ticket["id"] = str(ticket.pop("_id"))
+    for field in ("created_at", "updated_at"):
+        value = ticket.get(field)
+        if isinstance(value, datetime):
+            value = ist.localize(value) if value.tzinfo is None else value.astimezone(ist)
+            ticket[field] = value.isoformat()
+    for activity in ticket.get("activities") or []:
+        timestamp = activity.get("timestamp")
+        if isinstance(timestamp, datetime):
+            timestamp = ist.localize(timestamp) if timestamp.tzinfo is None else timestamp.astimezone(ist)
+            activity["timestamp"] = timestamp.isoformat()
+    if ticket.get("ai_rationale"):
+        ticket["ai_rationale"] = rationale_text(ticket["ai_rationale"])
+    return ticket
+
+
+def make_tickets(rng: random.Random, count: int) -> List[Dict]:
+    start = datetime(2024, 1, 1, 9, 0, tzinfo=IST)
+    tickets = []
+    for i in range(count):
+        created = start + timedelta(minutes=i, milliseconds=rng.randrange(1000))
+        tickets.append({
+            "_id": ObjectId(),
+            "title": f"Ticket {i}: checkout fails after update",
+            "description": " ".join(rng.choice(["payment", "page", "error", "customer", "retry"]) for _ in range(60)),
+            "category": "General",
+            "status": rng.choice(STATUSES),
+            "priority": rng.choice(["P0", "P1", "P2", "P3"]),
+            "assignee": "Billing Team",
+            "assignee_user_id": "billing",
+            "product_area": rng.choice(AREAS),
+            "tags": rng.sample(AREAS, 2),
+            "ai_rationale": "Payment failures block revenue | Billing owns checkout",
+            "ai_reply_draft": "Thanks for reporting this, we are looking into it. " * 4,
+            "ai_confidence": round(rng.random(), 2),
+            "duplicate_of": None,
+            "dedup_signature": [rng.randrange(2 ** 32) for _ in range(64)],
+            "dedup_bands": [f"{b}:{rng.randrange(2 ** 32):x}" for b in range(16)],
+            "created_at": created,
+            "updated_at": created + timedelta(hours=1),
+            "activities": [
+                {"timestamp": created + timedelta(minutes=a), "action": "updated", "details": "Updated fields: status", "user": "user"}
+                for a in range(10)
+            ],
+            "activity_count": 10
+        })
+    return tickets
+
+
+def legacy_list(tickets: List[Dict], adapter: TypeAdapter) -> bytes:
+    helped = [
+        legacy_ticket_helper(dict(t, activities=[dict(a) for a in t["activities"]]) if "activities" in t else dict(t))
+        for t in tickets
+    ]
+    validated = adapter.validate_python(helped)
+    return json.dumps(adapter.dump_python(validated, mode="json"), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _time(render: Callable[[], bytes], runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        render()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def benchmark(ticket_count: int, runs: int, seed: int):
+    tickets = make_tickets(random.Random(seed), ticket_count)
+    summaries = [{k: v for k, v in t.items() if k == "_id" or k in TicketSummary.model_fields} for t in tickets]
+    cases = [
+        ("summary", summaries, TypeAdapter(List[TicketSummary]), TICKET_SUMMARY_FIELDS),
+        ("full", tickets, TypeAdapter(List[TicketResponse]), TICKET_FIELDS)
+    ]
+
+    print(f"{ticket_count} tickets, median of {runs} runs\n")
+    print(f"{'schema':>8} {'legacy ms':>10} {'fast ms':>8} {'speedup':>8} {'bytes':>10}")
+    for name, docs, adapter, fields in cases:
+        fast = lambda: dumps([ticket_document(t, fields) for t in docs])
+        # Same payload either way (compared as parsed JSON)
+        assert json.loads(fast()) == json.loads(legacy_list(docs, adapter))
+        legacy_ms = statistics.median(_time(lambda: legacy_list(docs, adapter), runs))
+        fast_ms = statistics.median(_time(fast, runs))
+        print(f"{name:>8} {legacy_ms:>10.1f} {fast_ms:>8.1f} {legacy_ms / fast_ms:>7.1f}x {len(fast()):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    benchmark(args.tickets, args.runs, args.seed)
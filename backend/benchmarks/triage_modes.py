@@ -0,0 +1,70 @@
+"""
+Compare latency and token usage of the multi-agent and fused triage workflows.
+
+Usage (from backend/):
+    python -m benchmarks.triage_modes <ticket_id> [--runs 5]
+
+Results are not persisted - both graphs are compiled without persist_node.
+Set LLM_PROVIDER=stub (and LLM_STUB_LATENCY_MS) to benchmark offline.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from bson import ObjectId
+from langchain_core.callbacks import AsyncCallbackHandler
+from database import connect_to_mongo, close_mongo_connection, get_tickets_collection
+from triage.graph import create_triage_graph, TRIAGE_MODES
+
+
+class UsageCollector(AsyncCallbackHandler):
+    """Counts LLM calls and token usage reported by the chat model."""
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    async def on_llm_end(self, response, **kwargs):
+        self.calls += 1
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                self.input_tokens += usage.get("input_tokens", 0)
+                self.output_tokens += usage.get("output_tokens", 0)
+
+
+async def benchmark(ticket_id: str, runs: int):
+    """Run each mode `runs` times against the same ticket and print a summary."""
+    await connect_to_mongo()
+    ticket = await get_tickets_collection().find_one({"_id": ObjectId(ticket_id)})
+    if not ticket:
+        print(f"❌ Ticket {ticket_id} not found")
+        return
+
+    print(f"Ticket: {ticket.get('title')}  ({runs} runs per mode)\n")
+    print(f"{'mode':<8} {'p50 ms':>9} {'mean ms':>9} {'LLM calls':>10} {'in tokens':>10} {'out tokens':>11}")
+
+    for mode in TRIAGE_MODES:
+        graph = create_triage_graph(mode, persist=False)
+        usage = UsageCollector()
+        latencies = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            await graph.ainvoke({"ticket": ticket, "mode": mode}, config={"callbacks": [usage]})
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        print(
+            f"{mode:<8} {statistics.median(latencies):>9.0f} {statistics.mean(latencies):>9.0f} "
+            f"{usage.calls / runs:>10.1f} {usage.input_tokens / runs:>10.0f} {usage.output_tokens / runs:>11.0f}"
+        )
+
+    await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("ticket_id")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.ticket_id, args.runs))
@@ -0,0 +1,108 @@
+"""
+Measure the HeuristicClassifier's priority confidences against triage history.
+
+Every triaged ticket is labelled with its current priority (so human
+edits through PUT /tickets/{id} count). Tickets whose priority the
+classifier itself set and nobody changed are left out, since they would
+only confirm the classifier. Each classifier guess falls into a bucket
+(tier, keyword hits, conflicting tiers); a bucket's confidence is the
+share of its tickets whose label matches the guess. Buckets with fewer
+than --min-samples tickets are written as 0, so they never skip Gemini.
+
+Usage (from backend/):
+    python calibrate_heuristics.py [--output artifacts/heuristic_calibration.json] [--min-samples 30]
+
+Restart the API/workers afterwards to load the calibration, then lower
+TRIAGE_HEURISTIC_THRESHOLD to a confidence whose precision is acceptable.
+Only priority is calibrated; the assignee shortcut stays off until
+TRIAGE_HEURISTIC_ASSIGNEE_THRESHOLD is lowered separately.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+from database import connect_to_mongo, close_mongo_connection, get_tickets_collection, get_triage_results_collection
+from triage.agents.context_detailer import build_context
+from triage.agents.heuristic_classifier import (
+    HEURISTIC_CALIBRATION_PATH,
+    calibration_key,
+    match_priority
+)
+
+
+async def load_examples() -> List[Tuple[Dict, str]]:
+    """(context, priority label) for every triaged ticket with an independent label."""
+    latest = {}
+    pipeline = [
+        {"$sort": {"created_at": -1}},
+        {"$group": {"_id": "$ticket_id", "priority": {"$first": "$priority"}, "heuristic": {"$first": "$heuristic"}}}
+    ]
+    async for row in get_triage_results_collection().aggregate(pipeline):
+        latest[row["_id"]] = row
+
+    examples = []
+    projection = {"title": 1, "description": 1, "tags": 1, "product_area": 1, "category": 1, "priority": 1}
+    async for ticket in get_tickets_collection().find({"priority": {"$ne": None}}, projection):
+        result = latest.get(str(ticket["_id"]))
+        if not result:
+            continue
+        skipped = (result.get("heuristic") or {}).get("skipped") or []
+        if "priority" in skipped and ticket["priority"] == result.get("priority"):
+            continue
+        examples.append((build_context(ticket, [], []), ticket["priority"]))
+    return examples
+
+
+def calibrate(examples: List[Tuple[Dict, str]], min_samples: int) -> Dict[str, Dict[str, float]]:
+    """{bucket: {"samples", "precision"}} for every bucket the examples fall into."""
+    buckets: Dict[str, List[int]] = {}
+    for context, label in examples:
+        hits = match_priority(context)
+        if not hits:
+            continue
+        priority, _, _, matched = hits[0]
+        counts = buckets.setdefault(calibration_key(priority, len(matched), len(hits) > 1), [0, 0])
+        counts[0] += 1
+        counts[1] += int(priority == label)
+    return {
+        key: {"samples": total, "precision": round(correct / total, 3) if total >= min_samples else 0.0}
+        for key, (total, correct) in sorted(buckets.items())
+    }
+
+
+async def main(args):
+    await connect_to_mongo()
+    try:
+        examples = await load_examples()
+    finally:
+        await close_mongo_connection()
+
+    print(f"{len(examples)} labelled tickets")
+    buckets = calibrate(examples, args.min_samples)
+    if not buckets:
+        print("No ticket matched a priority keyword - calibration not written")
+        return
+
+    print(f"{'bucket':>16} {'samples':>8} {'confidence':>11}")
+    for key, bucket in buckets.items():
+        print(f"{key:>16} {bucket['samples']:>8} {bucket['precision']:>11.3f}")
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({
+            "priority": {key: bucket["precision"] for key, bucket in buckets.items()},
+            "samples": {key: bucket["samples"] for key, bucket in buckets.items()},
+            "calibrated_at": time.time()
+        }, f, indent=2)
+    print(f"Saved heuristic calibration to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=HEURISTIC_CALIBRATION_PATH)
+    parser.add_argument("--min-samples", type=int, default=30)
+    asyncio.run(main(parser.parse_args()))
@@ -20,7 +20,13 @@ async def clear_database():
         "activities",
         "activity_logs",
         "comments",
-        "attachments"
+        "attachments",
+        "llm_cache",
+        "triage_jobs",
+        "roster_meta",
+        "ticket_stats",
+        "ticket_activities",
+        "migration_checkpoints"
     ]
     
     print("Clearing MongoDB database...")
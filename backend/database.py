@@ -1,106 +1,340 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.write_concern import WriteConcern
 from typing import Optional
+import asyncio
 import os
+import threading
+import time
+from datetime import timedelta, timezone
 
 
-class Database:
-    client: Optional[AsyncIOMotorClient] = None
+# Fixed +05:30 offset (IST has no DST); unlike a pytz zone, orjson serialises it natively
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
 
 
-db = Database()
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    """Read an optional integer setting from the environment."""
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+_COLLECTION_WRITE_CONCERN_PREFIX = "MONGODB_WRITE_CONCERN_"
+
+
+class MongoSettings:
+    """MongoDB client settings, read from environment variables."""
+
+    def __init__(self):
+        # Default to localhost for local development (MongoDB exposed on host port 27017)
+        # In Docker, MONGODB_URL env var will override this to mongodb://mongodb:27017
+        self.url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+        self.database_name = os.getenv("MONGODB_DATABASE", "agent_on_call")
+
+        # Pool sizing - minPoolSize keeps warm connections so triage never pays the handshake
+        self.max_pool_size = _env_int("MONGODB_MAX_POOL_SIZE", 100)
+        self.min_pool_size = _env_int("MONGODB_MIN_POOL_SIZE", 10)
+        self.max_idle_time_ms = _env_int("MONGODB_MAX_IDLE_TIME_MS", 300000)
+        self.wait_queue_timeout_ms = _env_int("MONGODB_WAIT_QUEUE_TIMEOUT_MS", 10000)
+
+        # Timeouts
+        self.server_selection_timeout_ms = _env_int("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 5000)
+        self.connect_timeout_ms = _env_int("MONGODB_CONNECT_TIMEOUT_MS", 5000)
+        self.socket_timeout_ms = _env_int("MONGODB_SOCKET_TIMEOUT_MS", None)
+
+        # Wire compression - the server picks the first one it also supports
+        self.compressors = os.getenv("MONGODB_COMPRESSORS", "zstd,snappy,zlib")
+
+        # Read / write concern
+        self.read_concern = os.getenv("MONGODB_READ_CONCERN", "local")
+        w = os.getenv("MONGODB_WRITE_CONCERN", "1")
+        self.write_concern = int(w) if w.isdigit() else w
+        self.write_timeout_ms = _env_int("MONGODB_WRITE_TIMEOUT_MS", None)
+        # Per-collection overrides, e.g. MONGODB_WRITE_CONCERN_TICKETS=majority, MONGODB_WRITE_CONCERN_ACTIVITY_LOGS=1
+        self.collection_write_concerns = {}
+        for key, value in os.environ.items():
+            if key.startswith(_COLLECTION_WRITE_CONCERN_PREFIX) and value:
+                name = key[len(_COLLECTION_WRITE_CONCERN_PREFIX):].lower()
+                self.collection_write_concerns[name] = int(value) if value.isdigit() else value
+
+    def client_kwargs(self) -> dict:
+        """Keyword arguments for AsyncIOMotorClient."""
+        kwargs = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "socketTimeoutMS": self.socket_timeout_ms,
+            "compressors": _available_compressors(self.compressors),
+            "readConcernLevel": self.read_concern,
+            "w": self.write_concern,
+            "wTimeoutMS": self.write_timeout_ms,
+            "appname": "agent-on-call",
+            # Return datetimes as IST-aware values (BSON stores UTC) instead of naive UTC
+            "tz_aware": True,
+            "tzinfo": IST
+        }
+        return {k: v for k, v in kwargs.items() if v is not None}
+
+
+def _available_compressors(compressors: str) -> Optional[str]:
+    """Drop compressors whose Python module is not installed instead of warning on every connect."""
+    from pymongo import compression_support
+
+    installed = {
+        "zstd": compression_support._HAVE_ZSTD,
+        "snappy": compression_support._HAVE_SNAPPY,
+        "zlib": compression_support._HAVE_ZLIB
+    }
+    names = [c.strip() for c in compressors.split(",") if c.strip()]
+    return ",".join(c for c in names if installed.get(c, True)) or None
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool counters fed by pymongo CMAP events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Check-out events for one operation fire on the same executor thread
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.checked_out = 0
+            self.max_checked_out = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.wait_time_total_ms = 0.0
+            self.wait_time_max_ms = 0.0
+            self.pool_clears = 0
+
+    def snapshot(self) -> dict:
+        """Current pool metrics."""
+        with self._lock:
+            return {
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "connections_open": self.connections_created - self.connections_closed,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "wait_time_avg_ms": round(self.wait_time_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_time_max_ms": round(self.wait_time_max_ms, 3),
+                "pool_clears": self.pool_clears
+            }
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        waited_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        with self._lock:
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.checkouts += 1
+            self.wait_time_total_ms += waited_ms
+            self.wait_time_max_ms = max(self.wait_time_max_ms, waited_ms)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+
+class ConnectionManager:
+    """Owns the single Motor client for the process (opened and closed in the FastAPI lifespan)."""
+
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.settings = MongoSettings()
+        self.pool_metrics = PoolMetrics()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _create_client(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        kwargs = self.settings.client_kwargs()
+        if loop is not None:
+            kwargs["io_loop"] = loop
+        self.client = AsyncIOMotorClient(
+            self.settings.url,
+            event_listeners=[self.pool_metrics],
+            **kwargs
+        )
+        self._loop = loop
+
+    def get_client(self) -> AsyncIOMotorClient:
+        """
+        Return the shared client, creating it on first use.
+
+        Motor binds a client to the event loop it was created on. The client is
+        only rebuilt if the running loop changed (e.g. TestClient without a
+        lifespan runs each request on a fresh loop); under uvicorn the pool is
+        created once and reused for the life of the process.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if self.client is None:
+            self._create_client()
+            print(f"Connected to MongoDB at {self.settings.url} (lazy connection)")
+        elif loop is not None and self._loop is not None and loop is not self._loop:
+            self.client.close()
+            self._create_client()
+            print(f"Reconnected to MongoDB at {self.settings.url} (event loop changed)")
+        return self.client
+
+    async def connect(self):
+        """Create the client on the running loop."""
+        if self.client:
+            self.client.close()
+        self.settings = MongoSettings()
+        self._create_client()
+        print(f"Connected to MongoDB at {self.settings.url}")
+
+    async def close(self):
+        """Close the client and its pool."""
+        if self.client:
+            self.client.close()
+            self.client = None
+            self._loop = None
+            print("Closed MongoDB connection")
+
+
+db = ConnectionManager()
 
 
 async def connect_to_mongo():
     """Connect to MongoDB."""
-    # Default to localhost for local development (MongoDB exposed on host port 27017)
-    # In Docker, MONGODB_URL env var will override this to mongodb://mongodb:27017
-    mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
-    import asyncio
-    # Get the current event loop - Motor will use this for all operations
-    loop = asyncio.get_running_loop() if hasattr(asyncio, 'get_running_loop') else asyncio.get_event_loop()
-    db.client = AsyncIOMotorClient(mongo_url, io_loop=loop)
-    print(f"Connected to MongoDB at {mongo_url}")
+    await db.connect()
 
 
 async def close_mongo_connection():
     """Close MongoDB connection."""
-    if db.client:
-        db.client.close()
-        db.client = None
-        print("Closed MongoDB connection")
+    await db.close()
 
 
-def _ensure_connected():
-    """Ensure database connection is established."""
-    if db.client is None:
-        # Lazy connection - create client without specifying event loop
-        # Motor will use the current event loop when operations are performed
-        # This works because we're called from async context (TestClient)
-        mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
-        # Create client without io_loop - Motor will detect and use current loop
-        db.client = AsyncIOMotorClient(mongo_url)
-        print(f"Connected to MongoDB at {mongo_url} (lazy connection)")
+def get_pool_metrics() -> dict:
+    """Get connection pool metrics."""
+    return db.pool_metrics.snapshot()
+
+
+def get_client() -> AsyncIOMotorClient:
+    """Get the shared client (for sessions and transactions)."""
+    return db.get_client()
 
 
 def get_database():
     """Get database instance."""
-    _ensure_connected()
-    return db.client["agent_on_call"]
+    return db.get_client()[db.settings.database_name]
 
 
-def _recreate_client():
-    """Recreate the database client."""
-    if db.client:
-        db.client.close()
-        db.client = None
-    mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
-    db.client = AsyncIOMotorClient(mongo_url)
-    print(f"Reconnected to MongoDB at {mongo_url} (event loop was closed)")
+def _collection(name: str):
+    """A collection, with its MONGODB_WRITE_CONCERN_<NAME> override applied."""
+    collection = get_database()[name]
+    w = db.settings.collection_write_concerns.get(name)
+    if w is None:
+        return collection
+    return collection.with_options(write_concern=WriteConcern(w=w, wtimeout=db.settings.write_timeout_ms))
+
 
 def get_tickets_collection():
     """Get tickets collection."""
-    _ensure_connected()
-    database = get_database()
-    return database["tickets"]
+    return _collection("tickets")
 
 
 def get_activities_collection():
     """Get activities collection."""
-    _ensure_connected()
-    database = get_database()
-    return database["activities"]
+    return _collection("activities")
 
 
 def get_triage_results_collection():
     """Get triage_results collection."""
-    _ensure_connected()
-    database = get_database()
-    return database["triage_results"]
+    return _collection("triage_results")
 
 
 def get_users_collection():
     """Get users collection."""
-    _ensure_connected()
-    database = get_database()
-    return database["users"]
+    return _collection("users")
 
 
 def get_activity_logs_collection():
     """Get activity_logs collection."""
-    _ensure_connected()
-    database = get_database()
-    return database["activity_logs"]
+    return _collection("activity_logs")
 
 
 def get_comments_collection():
     """Get comments collection."""
-    _ensure_connected()
-    database = get_database()
-    return database["comments"]
+    return _collection("comments")
 
 
 def get_attachments_collection():
     """Get attachments collection (optional)."""
-    _ensure_connected()
-    database = get_database()
-    return database["attachments"]
+    return _collection("attachments")
+
+
+def get_llm_cache_collection():
+    """Get llm_cache collection (persistent tier of the LLM result cache)."""
+    return _collection("llm_cache")
+
+
+def get_triage_jobs_collection():
+    """Get triage_jobs collection (async triage queue)."""
+    return _collection("triage_jobs")
+
+
+def get_roster_meta_collection():
+    """Get roster_meta collection (roster version used to invalidate cached teams)."""
+    return _collection("roster_meta")
+
+
+def get_ticket_stats_collection():
+    """Get ticket_stats collection (ticket counters for GET /tickets/stats)."""
+    return _collection("ticket_stats")
+
+
+def get_ticket_activities_collection():
+    """Get ticket_activities collection (bucketed ticket activity history)."""
+    return _collection("ticket_activities")
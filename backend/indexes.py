@@ -0,0 +1,312 @@
+"""
+MongoDB index registry and schema migrations.
+
+INDEXES declares every index the app's queries rely on. apply_indexes()
+creates missing ones and rebuilds any whose options changed; running it
+again is a no-op. MIGRATIONS are one-off, ordered steps (backfills,
+dropping retired indexes) recorded in the schema_migrations collection so
+each runs once per database.
+
+Both run at API startup (unless MONGODB_AUTO_INDEX=false) or from the CLI:
+    python indexes.py            # run pending migrations, then apply indexes
+    python indexes.py --status   # show applied migrations and missing indexes
+"""
+import argparse
+import asyncio
+import os
+import socket
+import uuid
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Tuple
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from database import connect_to_mongo, close_mongo_connection, get_database
+from models import get_ist_now
+
+
+MONGODB_AUTO_INDEX = os.getenv("MONGODB_AUTO_INDEX", "true").lower() == "true"
+# A running migration whose lease is not renewed for this long is taken over by the next process
+MIGRATION_LEASE_SECONDS = float(os.getenv("MIGRATION_LEASE_SECONDS", "300"))
+
+# Index option conflicts: same name with different options / same keys with another name
+INDEX_CONFLICT_CODES = {85, 86}
+
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "tickets": [
+        # GET /tickets pages (newest first, _id breaks ties) and its filters
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_-1__id_-1"),
+        IndexModel([("status", ASCENDING), ("priority", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="status_1_priority_1_created_at_-1__id_-1"),
+        IndexModel([("assignee_user_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="assignee_user_id_1_status_1_created_at_-1__id_-1"),
+        # Near-duplicate lookup (triage/dedup.py): band matches inside the reuse window, newest first
+        IndexModel([("dedup_bands", ASCENDING), ("updated_at", DESCENDING)], name="dedup_bands_1_updated_at_-1", sparse=True),
+    ],
+    "comments": [
+        # ContextDetailer: first comments of a ticket
+        IndexModel([("ticket_id", ASCENDING), ("created_at", ASCENDING)], name="ticket_id_1_created_at_1"),
+    ],
+    "attachments": [
+        IndexModel([("ticket_id", ASCENDING)], name="ticket_id_1"),
+    ],
+    "triage_results": [
+        # Latest result per ticket (dedup reuse, router training)
+        IndexModel([("ticket_id", ASCENDING), ("created_at", DESCENDING)], name="ticket_id_1_created_at_-1"),
+    ],
+    "ticket_activities": [
+        # Open bucket lookup on append, newest-first paging of a ticket's history
+        IndexModel([("ticket_id", ASCENDING), ("first_at", DESCENDING), ("_id", DESCENDING)],
+                   name="ticket_id_1_first_at_-1__id_-1"),
+    ],
+    "activity_logs": [
+        IndexModel([("ticket_id", ASCENDING), ("timestamp", DESCENDING)], name="ticket_id_1_timestamp_-1"),
+    ],
+    "triage_jobs": [
+        # claim_next_job: due queued jobs and expired leases, oldest first
+        IndexModel([("status", ASCENDING), ("available_at", ASCENDING)], name="status_1_available_at_1"),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_1_lease_expires_at_1"),
+    ],
+    "llm_cache": [
+        # TTL: MongoDB deletes entries once expires_at has passed
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_1", expireAfterSeconds=0),
+    ],
+}
+
+
+# --- Migrations ---
+
+async def _backfill_dedup_signatures(db):
+    """Store MinHash signatures on tickets created before near-duplicate detection."""
+    from pymongo import UpdateOne
+    from triage.dedup import dedup_fields
+
+    tickets = db["tickets"]
+    batch = []
+    async for ticket in tickets.find({"dedup_signature": {"$exists": False}}, {"title": 1, "description": 1}):
+        batch.append(UpdateOne(
+            {"_id": ticket["_id"]},
+            {"$set": dedup_fields(ticket.get("title", ""), ticket.get("description", ""))}
+        ))
+        if len(batch) >= 500:
+            await tickets.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await tickets.bulk_write(batch, ordered=False)
+
+
+async def _drop_unpaged_ticket_indexes(db):
+    """Drop ticket list indexes without the _id tie-breaker used by keyset pagination."""
+    existing = await db["tickets"].index_information()
+    for name in ("created_at_-1", "status_1_priority_1_created_at_-1", "assignee_user_id_1_status_1_created_at_-1"):
+        if name in existing:
+            await db["tickets"].drop_index(name)
+
+
+async def _build_ticket_stats(db):
+    """Initial ticket counters for GET /tickets/stats."""
+    from services.ticket_stats import rebuild_ticket_stats
+
+    await rebuild_ticket_stats(db)
+
+
+async def _bucket_ticket_activities(db):
+    """Move embedded ticket activities into ticket_activities buckets, keeping the latest on the ticket."""
+    from services.ticket_activities import TICKET_RECENT_ACTIVITIES, bucket_documents
+
+    tickets = db["tickets"]
+    buckets = db["ticket_activities"]
+    # Tickets written by the bucketed code already have activity_count
+    async for ticket in tickets.find({"activity_count": {"$exists": False}}, {"activities": 1}):
+        ticket_id = str(ticket["_id"])
+        activities = ticket.get("activities") or []
+        # Rerunnable: the ticket keeps its full array until the buckets are written
+        await buckets.delete_many({"ticket_id": ticket_id})
+        if activities:
+            await buckets.insert_many(bucket_documents(ticket_id, activities))
+        await tickets.update_one(
+            {"_id": ticket["_id"]},
+            {"$set": {"activities": activities[-TICKET_RECENT_ACTIVITIES:], "activity_count": len(activities)}}
+        )
+
+
+async def _drop_dedup_bands_index(db):
+    """Drop the band-only dedup index, replaced by (dedup_bands, updated_at)."""
+    existing = await db["tickets"].index_information()
+    if "dedup_bands_1" in existing:
+        await db["tickets"].drop_index("dedup_bands_1")
+
+
+# (version, description, step) - append only; never renumber or edit an applied step
+MIGRATIONS: List[Tuple[int, str, Callable[..., Awaitable[None]]]] = [
+    (1, "Backfill near-duplicate signatures on existing tickets", _backfill_dedup_signatures),
+    (2, "Replace ticket list indexes with (created_at, _id) keyset indexes", _drop_unpaged_ticket_indexes),
+    (3, "Build ticket stats counters from existing tickets", _build_ticket_stats),
+    (4, "Move ticket activities into bucketed ticket_activities", _bucket_ticket_activities),
+    (5, "Replace the dedup_bands index with (dedup_bands, updated_at)", _drop_dedup_bands_index),
+]
+
+
+async def run_migrations(db) -> List[int]:
+    """
+    Run migrations not yet recorded in schema_migrations; return the versions run.
+
+    A process claims a version with a lease it renews while the step runs.
+    Failed versions, and running ones whose lease expired (the process
+    died mid-step), are claimed again. Steps run in order, so a version
+    another process is still running stops this run.
+    """
+    applied = db["schema_migrations"]
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    ran = []
+    for version, description, step in sorted(MIGRATIONS, key=lambda m: m[0]):
+        now = get_ist_now()
+        claim = {
+            "status": "running",
+            "lease_owner": owner,
+            "lease_expires_at": now + timedelta(seconds=MIGRATION_LEASE_SECONDS),
+            "started_at": now
+        }
+        try:
+            # Claiming the version first keeps two processes from running the same step
+            await applied.insert_one({"_id": version, "description": description, **claim})
+        except DuplicateKeyError:
+            taken = await applied.find_one_and_update(
+                {"_id": version, "$or": [
+                    {"status": "failed"},
+                    {"status": "running", "lease_expires_at": {"$lte": now}},
+                    # Claimed before leases were recorded
+                    {"status": "running", "lease_expires_at": {"$exists": False},
+                     "started_at": {"$lte": now - timedelta(seconds=MIGRATION_LEASE_SECONDS)}}
+                ]},
+                {"$set": claim}
+            )
+            if taken is None:
+                existing = await applied.find_one({"_id": version})
+                if existing and existing.get("status") == "running":
+                    print(f"⚠️  Migration {version} is being run by {existing.get('lease_owner', 'another process')}; later migrations wait for it")
+                    break
+                continue
+
+        renewing = asyncio.create_task(_renew_migration_lease(applied, version, owner))
+        try:
+            await step(db)
+        except Exception as e:
+            await applied.update_one(
+                {"_id": version, "lease_owner": owner},
+                {"$set": {"status": "failed", "error": str(e), "lease_expires_at": None}}
+            )
+            raise
+        finally:
+            renewing.cancel()
+        result = await applied.update_one(
+            {"_id": version, "lease_owner": owner},
+            {"$set": {"status": "applied", "applied_at": get_ist_now(), "lease_expires_at": None}, "$unset": {"error": ""}}
+        )
+        if not result.modified_count:
+            print(f"⚠️  Migration {version} finished after its lease was taken over; the new owner records it")
+        ran.append(version)
+        print(f"Applied migration {version}: {description}")
+    return ran
+
+
+async def _renew_migration_lease(applied, version: int, owner: str):
+    """Push a running migration's lease forward until cancelled."""
+    while True:
+        await asyncio.sleep(MIGRATION_LEASE_SECONDS / 3)
+        try:
+            await applied.update_one(
+                {"_id": version, "lease_owner": owner, "status": "running"},
+                {"$set": {"lease_expires_at": get_ist_now() + timedelta(seconds=MIGRATION_LEASE_SECONDS)}}
+            )
+        except Exception as e:
+            print(f"⚠️  Could not renew the lease of migration {version}: {e}")
+
+
+# --- Indexes ---
+
+async def apply_indexes(db) -> Dict[str, List[str]]:
+    """
+    Create every registered index; return {collection: [names created or rebuilt]}.
+
+    An existing index with the same name but different keys or options is
+    dropped and rebuilt from the registry.
+    """
+    changed = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        for model in models:
+            spec = model.document
+            name = spec["name"]
+            current = existing.get(name)
+            if current is not None and _same_index(current, spec):
+                continue
+            if current is not None:
+                await collection.drop_index(name)
+            try:
+                await collection.create_indexes([model])
+            except OperationFailure as e:
+                if e.code not in INDEX_CONFLICT_CODES:
+                    raise
+                # Same keys under another name (e.g. created by hand) - replace it
+                for other_name, other in existing.items():
+                    if list(other["key"]) == list(spec["key"].items()) and other_name != "_id_":
+                        await collection.drop_index(other_name)
+                await collection.create_indexes([model])
+            changed.setdefault(collection_name, []).append(name)
+    return changed
+
+
+def _same_index(current: dict, spec: dict) -> bool:
+    """Compare index_information() output with an IndexModel document."""
+    if list(current["key"]) != list(spec["key"].items()):
+        return False
+    options = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+    return all(current.get(option) == spec.get(option) for option in options)
+
+
+async def missing_indexes(db) -> Dict[str, List[str]]:
+    """Registered indexes that are absent or differ in the database."""
+    missing = {}
+    for collection_name, models in INDEXES.items():
+        existing = await db[collection_name].index_information()
+        for model in models:
+            spec = model.document
+            current = existing.get(spec["name"])
+            if current is None or not _same_index(current, spec):
+                missing.setdefault(collection_name, []).append(spec["name"])
+    return missing
+
+
+async def bootstrap_database():
+    """Run pending migrations, then make sure every registered index exists."""
+    db = get_database()
+    await run_migrations(db)
+    changed = await apply_indexes(db)
+    if changed:
+        print(f"Created indexes: {changed}")
+
+
+async def _cli(status_only: bool):
+    await connect_to_mongo()
+    try:
+        db = get_database()
+        if status_only:
+            async for migration in db["schema_migrations"].find().sort("_id", 1):
+                print(f"  migration {migration['_id']}: {migration.get('status')} - {migration.get('description')}")
+            pending = {m[0] for m in MIGRATIONS} - {m["_id"] async for m in db["schema_migrations"].find({"status": "applied"})}
+            print(f"Pending migrations: {sorted(pending) or 'none'}")
+            print(f"Missing indexes: {await missing_indexes(db) or 'none'}")
+            return
+        await bootstrap_database()
+        print("Database indexes and migrations are up to date")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="Only report pending migrations and missing indexes")
+    args = parser.parse_args()
+    asyncio.run(_cli(args.status))
@@ -1,12 +1,59 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import tickets
+from routes import tickets, system, triage_jobs, teams
 from database import connect_to_mongo, close_mongo_connection
+from indexes import MONGODB_AUTO_INDEX, bootstrap_database
+from triage import triage_engine
+from triage.jobs import TriageWorker
+
+
+# Jobs queued with ?async=true are drained by an in-process worker unless this is 0
+# (then run `python worker.py` processes instead)
+TRIAGE_IN_PROCESS_WORKER_CONCURRENCY = int(os.getenv("TRIAGE_IN_PROCESS_WORKER_CONCURRENCY", "2"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect to MongoDB and warm up the triage engine before serving traffic."""
+    try:
+        await connect_to_mongo()
+    except Exception as e:
+        print(f"⚠️  Failed to connect to MongoDB: {e}")
+        print("⚠️  Application will start but database operations will fail.")
+        # Don't raise - allow app to start for health checks, but log the error
+    
+    # Run pending migrations and create missing indexes (idempotent; see indexes.py)
+    if MONGODB_AUTO_INDEX:
+        try:
+            await bootstrap_database()
+        except Exception as e:
+            print(f"⚠️  Index bootstrap failed, run `python indexes.py` manually: {e}")
+    
+    # Compile the graph, load the roster and prime the pool once per process.
+    # /ready stays 503 until this succeeds.
+    await triage_engine.warm_up()
+    
+    worker = None
+    worker_task = None
+    if TRIAGE_IN_PROCESS_WORKER_CONCURRENCY > 0:
+        worker = TriageWorker(concurrency=TRIAGE_IN_PROCESS_WORKER_CONCURRENCY)
+        worker_task = asyncio.create_task(worker.run())
+    
+    yield
+    
+    if worker:
+        worker.stop()
+        await worker_task
+    await close_mongo_connection()
 
 app = FastAPI(
     title="Agent-on-Call API",
     description="AI-powered helpdesk ticket triage system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -16,26 +63,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# Event handlers
-@app.on_event("startup")
-async def startup_db_client():
-    """Connect to MongoDB on application startup."""
-    try:
-        await connect_to_mongo()
-    except Exception as e:
-        print(f"⚠️  Failed to connect to MongoDB: {e}")
-        print("⚠️  Application will start but database operations will fail.")
-        # Don't raise - allow app to start for health checks, but log the error
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    """Close MongoDB connection on application shutdown."""
-    await close_mongo_connection()
-
 # Include routers
 app.include_router(tickets.router, prefix="/tickets", tags=["tickets"])
+app.include_router(triage_jobs.router, prefix="/triage-jobs", tags=["triage-jobs"])
+app.include_router(teams.router, prefix="/teams", tags=["teams"])
+app.include_router(system.router, tags=["system"])
 
 @app.get("/")
 async def root():
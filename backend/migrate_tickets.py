@@ -0,0 +1,197 @@
+"""
+Rewrite legacy ticket documents into the canonical shape the read path expects.
+
+Older documents carry shapes the API used to repair on every read:
+- created_at / updated_at / activity timestamps stored as ISO strings
+  (naive strings are IST, as ticket_helper assumed) -> BSON dates
+- ai_rationale stored as {"priority_rationale", "assignee_rationale"} -> one string
+- the ticket text in `body` instead of `description` -> description only
+
+Tickets and ticket_activities buckets are scanned in _id order in batches;
+each batch is one bulk_write, after which the last _id is checkpointed in
+migration_checkpoints so an interrupted run resumes where it stopped.
+
+Usage (from backend/):
+    python migrate_tickets.py [--dry-run] [--batch-size 500] [--restart]
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from pymongo import UpdateOne
+from database import IST, connect_to_mongo, close_mongo_connection, get_database
+from models import get_ist_now
+from services.ticket_stats import STATS_ID
+
+
+CHECKPOINTS = "migration_checkpoints"
+
+# Documents with at least one legacy field (canonical documents are never rewritten)
+LEGACY_TICKET_FILTER = {"$or": [
+    {"created_at": {"$type": "string"}},
+    {"updated_at": {"$type": "string"}},
+    {"activities.timestamp": {"$type": "string"}},
+    {"ai_rationale": {"$ne": None, "$not": {"$type": "string"}}},
+    {"body": {"$exists": True}}
+]}
+LEGACY_BUCKET_FILTER = {"activities.timestamp": {"$type": "string"}}
+
+
+def parse_timestamp(value: Any) -> Any:
+    """An ISO string as an aware datetime (naive strings are IST); anything else unchanged."""
+    if not isinstance(value, str):
+        return value
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    return parsed.replace(tzinfo=IST) if parsed.tzinfo is None else parsed
+
+
+def rationale_text(rationale: Any) -> Optional[str]:
+    """ai_rationale as one string (older triage runs stored an object)."""
+    if not rationale or isinstance(rationale, str):
+        return rationale
+    if isinstance(rationale, dict):
+        priority_rationale = rationale.get("priority_rationale", "")
+        assignee_rationale = rationale.get("assignee_rationale", "")
+        if priority_rationale and assignee_rationale:
+            return f"{priority_rationale} | {assignee_rationale}"
+        return priority_rationale or assignee_rationale or ""
+    return str(rationale)
+
+
+def _normalise_activities(activities: List[Dict]) -> Optional[List[Dict]]:
+    """Activities with parsed timestamps, or None when none changed."""
+    normalised = [
+        {**activity, "timestamp": parse_timestamp(activity.get("timestamp"))}
+        for activity in activities
+    ]
+    if all(new["timestamp"] is old.get("timestamp") for new, old in zip(normalised, activities)):
+        return None
+    return normalised
+
+
+def normalise_ticket(ticket: Dict) -> Optional[Dict]:
+    """Update operators rewriting a ticket into the canonical shape, or None if it already is."""
+    set_fields, unset_fields = {}, {}
+    for field in ("created_at", "updated_at"):
+        value = parse_timestamp(ticket.get(field))
+        if value is not ticket.get(field):
+            set_fields[field] = value
+
+    activities = _normalise_activities(ticket.get("activities") or [])
+    if activities is not None:
+        set_fields["activities"] = activities
+
+    rationale = ticket.get("ai_rationale")
+    if rationale is not None and not isinstance(rationale, str):
+        set_fields["ai_rationale"] = rationale_text(rationale)
+
+    if "body" in ticket:
+        if not ticket.get("description"):
+            set_fields["description"] = ticket["body"] or ""
+        unset_fields["body"] = ""
+
+    update = {}
+    if set_fields:
+        update["$set"] = set_fields
+    if unset_fields:
+        update["$unset"] = unset_fields
+    if update:
+        # The rewrite changes the ticket's representation, so its ETag must change
+        update["$inc"] = {"revision": 1}
+    return update or None
+
+
+def normalise_bucket(bucket: Dict) -> Optional[Dict]:
+    """Update operators parsing a ticket_activities bucket's timestamps, or None if none are strings."""
+    activities = _normalise_activities(bucket.get("activities") or [])
+    if activities is None:
+        return None
+    timestamps = [a["timestamp"] for a in activities if isinstance(a["timestamp"], datetime)]
+    return {"$set": {
+        "activities": activities,
+        "first_at": min(timestamps) if timestamps else None,
+        "last_at": max(timestamps) if timestamps else None
+    }}
+
+
+async def migrate_collection(
+    db,
+    name: str,
+    legacy_filter: Dict,
+    normalise: Callable[[Dict], Optional[Dict]],
+    batch_size: int,
+    dry_run: bool,
+    restart: bool
+) -> Dict[str, int]:
+    """Rewrite one collection's legacy documents batch by batch; returns {"scanned", "updated"}."""
+    collection = db[name]
+    checkpoints = db[CHECKPOINTS]
+    checkpoint = None if restart else await checkpoints.find_one({"_id": name})
+    if checkpoint and checkpoint.get("finished_at") and not dry_run:
+        print(f"   {name}: already migrated (use --restart to scan again)")
+        return {"scanned": 0, "updated": 0}
+
+    last_id = checkpoint.get("last_id") if checkpoint else None
+    totals = {field: (checkpoint or {}).get(field, 0) for field in ("scanned", "updated")}
+    if last_id is not None:
+        print(f"   {name}: resuming after {last_id}")
+
+    while True:
+        query = {**legacy_filter, "_id": {"$gt": last_id}} if last_id is not None else legacy_filter
+        documents = await collection.find(query).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not documents:
+            break
+
+        requests = []
+        for document in documents:
+            update = normalise(document)
+            if update:
+                requests.append(UpdateOne({"_id": document["_id"]}, update))
+        last_id = documents[-1]["_id"]
+        totals["scanned"] += len(documents)
+        totals["updated"] += len(requests)
+
+        if not dry_run:
+            if requests:
+                await collection.bulk_write(requests, ordered=False)
+            # Checkpoint only after the batch is written; a rerun redoes at most one batch
+            await checkpoints.update_one(
+                {"_id": name},
+                {"$set": {"last_id": last_id, **totals, "updated_at": get_ist_now(), "finished_at": None}},
+                upsert=True
+            )
+        print(f"   {name}: {totals['scanned']} legacy documents scanned, {totals['updated']} {'to rewrite' if dry_run else 'rewritten'}")
+
+    if not dry_run:
+        await checkpoints.update_one({"_id": name}, {"$set": {**totals, "finished_at": get_ist_now()}}, upsert=True)
+    return totals
+
+
+async def migrate_tickets(batch_size: int = 500, dry_run: bool = False, restart: bool = False):
+    """Normalise legacy tickets, then the activity buckets."""
+    await connect_to_mongo()
+    try:
+        db = get_database()
+        print(f"Migrating legacy ticket documents{' (dry run, nothing is written)' if dry_run else ''}...")
+        tickets = await migrate_collection(db, "tickets", LEGACY_TICKET_FILTER, normalise_ticket, batch_size, dry_run, restart)
+        buckets = await migrate_collection(db, "ticket_activities", LEGACY_BUCKET_FILTER, normalise_bucket, batch_size, dry_run, restart)
+        if tickets["updated"] and not dry_run:
+            # Invalidate GET /tickets ETags
+            await db["ticket_stats"].update_one({"_id": STATS_ID}, {"$inc": {"revision": 1}}, upsert=True)
+    finally:
+        await close_mongo_connection()
+
+    verb = "would be rewritten" if dry_run else "rewritten"
+    print(f"Done: {tickets['updated']} tickets and {buckets['updated']} activity buckets {verb}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and scan from the start")
+    args = parser.parse_args()
+    asyncio.run(migrate_tickets(args.batch_size, args.dry_run, args.restart))
@@ -0,0 +1,35 @@
+"""
+Rebuild the ticket stats counters (GET /tickets/stats) from the tickets collection.
+
+The counters are updated on every ticket write; this recounts them with an
+aggregation to repair drift (e.g. a counter update that failed after its
+ticket write). Run it periodically or after bulk edits, ideally when
+traffic is low.
+
+Usage (from backend/):
+    python reconcile_ticket_stats.py
+"""
+import asyncio
+from database import connect_to_mongo, close_mongo_connection
+from services.ticket_stats import parse_stats_key, rebuild_ticket_stats
+
+
+async def main():
+    await connect_to_mongo()
+    try:
+        drift = await rebuild_ticket_stats()
+    finally:
+        await close_mongo_connection()
+
+    if not drift:
+        print("Ticket stats were already correct")
+        return
+    print(f"Corrected {len(drift)} ticket stats counters:")
+    for key, difference in sorted(drift.items()):
+        row = parse_stats_key(key)
+        label = " / ".join(str(row[field]) for field in row)
+        print(f"   {label}: counter was off by {difference:+d}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from database import get_pool_metrics
+from triage import triage_engine
+from triage.llm_cache import llm_cache
+from triage.llm_governor import llm_governor
+from triage.roster import roster
+from triage.assignee_router import assignee_router
+from triage.agents.persist_node import persist_metrics
+
+router = APIRouter()
+
+
+@router.get("/ready")
+async def readiness():
+    """Report ready only once the triage engine has finished warming up."""
+    # Retry a failed warm-up (e.g. MongoDB came up after the API) on the next probe
+    if not triage_engine.ready and triage_engine.warmup_error:
+        await triage_engine.warm_up()
+    
+    engine_status = triage_engine.status()
+    status_code = 200 if engine_status["ready"] else 503
+    return JSONResponse(status_code=status_code, content=engine_status)
+
+
+@router.get("/metrics")
+async def metrics():
+    """Runtime metrics for capacity monitoring."""
+    return {
+        "mongo_pool": get_pool_metrics(),
+        "llm_cache": llm_cache.stats(),
+        "llm_governor": llm_governor.stats(),
+        "roster": roster.stats(),
+        "assignee_router": assignee_router.status(),
+        "persist": persist_metrics.stats()
+    }
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, HTTPException, status
+from typing import List
+
+from schemas import TeamUpsert, TeamResponse
+from database import get_users_collection
+from triage.roster import roster, bump_roster_version
+
+router = APIRouter()
+
+
+def team_helper(team) -> dict:
+    """Convert a roster team to TeamResponse fields."""
+    return {"id": team["user_id"], "name": team.get("name", ""), "skills": team.get("skills", [])}
+
+
+async def _roster_changed():
+    """Reload this process's roster now and tell other processes to reload theirs."""
+    await bump_roster_version()
+    roster.invalidate()
+
+
+@router.get("", response_model=List[TeamResponse])
+async def get_teams():
+    """List all teams (from the cached roster triage uses)."""
+    return [team_helper(team) for team in await roster.get_teams()]
+
+
+@router.get("/{team_id}", response_model=TeamResponse)
+async def get_team(team_id: str):
+    """Get a single team."""
+    team = await roster.get_team(team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    return team_helper(team)
+
+
+@router.put("/{team_id}", response_model=TeamResponse)
+async def upsert_team(team_id: str, team: TeamUpsert):
+    """Create or replace a team and invalidate every cached roster."""
+    await get_users_collection().replace_one(
+        {"_id": team_id},
+        {"name": team.name, "skills": team.skills},
+        upsert=True
+    )
+    await _roster_changed()
+    return {"id": team_id, "name": team.name, "skills": team.skills}
+
+
+@router.delete("/{team_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_team(team_id: str):
+    """Delete a team and invalidate every cached roster."""
+    result = await get_users_collection().delete_one({"_id": team_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Team not found")
+    await _roster_changed()
+    return None
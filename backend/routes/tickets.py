@@ -1,85 +1,50 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
-import pytz
+from bson.errors import InvalidId
+import asyncio
+import base64
+import binascii
+import json
+import os
 
-from schemas import TicketCreate, TicketUpdate, TicketResponse, TriageResponse
-from database import get_tickets_collection, get_activity_logs_collection
+from schemas import (
+    ActivityResponse, TicketCreate, TicketUpdate, TicketResponse, TicketSummary, TicketStatsResponse,
+    TriageResponse, TriageJobAccepted, TriageBatchRequest, TriageBatchResponse
+)
+from database import get_tickets_collection, get_activity_logs_collection, get_ticket_activities_collection
 from services.ai_triage import perform_triage
 from models import Activity, get_ist_now
-from triage import create_triage_graph
+from triage import triage_engine, build_triage_response, TRIAGE_MODES
+from triage.jobs import enqueue_triage_job
+from triage.batch import run_triage_batch, TRIAGE_BATCH_MAX_IDS
+from triage.dedup import dedup_fields
+from services.ticket_activities import (
+    TICKET_ACTIVITY_BUCKET_SIZE, append_activity, list_activities, recent_activity_update, with_recent_activity
+)
+from services.ticket_stats import STATS_PROJECTION, get_ticket_stats, get_tickets_revision, record_ticket_change, stats_pending
+from services.ticket_etags import ETAG_PROJECTION, cache_headers, etag_matches, list_etag, not_modified, ticket_etag
+from services.ticket_json import activity_list_response, ticket_list_response, ticket_response
 
-# IST timezone
-ist = pytz.timezone('Asia/Kolkata')
+# Page size of GET /tickets when no limit is given, and the largest allowed
+TICKET_LIST_DEFAULT_LIMIT = int(os.getenv("TICKET_LIST_DEFAULT_LIMIT", "50"))
+TICKET_LIST_MAX_LIMIT = int(os.getenv("TICKET_LIST_MAX_LIMIT", "200"))
+
+# Fields returned by GET /tickets (TicketSummary)
+TICKET_SUMMARY_PROJECTION = {
+    field: 1 for field in TicketSummary.model_fields if field != "id"
+}
 
 router = APIRouter()
-def ticket_helper(ticket) -> dict:
-    """Convert MongoDB document to dict."""
-    if ticket:
-        ticket["id"] = str(ticket["_id"])
-        ticket.pop("_id", None)
-        # Ensure datetime fields are properly formatted with timezone info
-        # MongoDB may return naive datetimes, so we ensure they're timezone-aware
-        
-        datetime_fields = ['created_at', 'updated_at']
-        for field in datetime_fields:
-            if field in ticket and ticket[field]:
-                if isinstance(ticket[field], datetime):
-                    # If datetime is naive (no timezone), assume it's IST
-                    if ticket[field].tzinfo is None:
-                        ticket[field] = ist.localize(ticket[field])
-                    # Convert to IST if it has a different timezone
-                    elif ticket[field].tzinfo != ist:
-                        ticket[field] = ticket[field].astimezone(ist)
-        
-        # Handle activities timestamps
-        if 'activities' in ticket and ticket['activities']:
-            for activity in ticket['activities']:
-                if 'timestamp' in activity and activity['timestamp']:
-                    # Handle datetime objects
-                    if isinstance(activity['timestamp'], datetime):
-                        if activity['timestamp'].tzinfo is None:
-                            activity['timestamp'] = ist.localize(activity['timestamp'])
-                        elif activity['timestamp'].tzinfo != ist:
-                            activity['timestamp'] = activity['timestamp'].astimezone(ist)
-                        # Ensure it's serialized as ISO string with timezone
-                        activity['timestamp'] = activity['timestamp'].isoformat()
-                    # Handle string timestamps (already ISO formatted)
-                    elif isinstance(activity['timestamp'], str):
-                        # If it's already a string, try to parse and ensure it's in IST
-                        try:
-                            # Parse the string to datetime
-                            parsed_dt = datetime.fromisoformat(activity['timestamp'].replace('Z', '+00:00'))
-                            if parsed_dt.tzinfo is None:
-                                parsed_dt = ist.localize(parsed_dt)
-                            else:
-                                parsed_dt = parsed_dt.astimezone(ist)
-                            activity['timestamp'] = parsed_dt.isoformat()
-                        except (ValueError, AttributeError):
-                            # If parsing fails, keep the original string
-                            pass
-    
-        # Convert datetime fields to ISO strings for JSON serialization
-        for field in datetime_fields:
-            if field in ticket and ticket[field] and isinstance(ticket[field], datetime):
-                ticket[field] = ticket[field].isoformat()
-        
-        # Ensure ai_rationale is always a string (not an object)
-        if 'ai_rationale' in ticket and ticket['ai_rationale']:
-            if not isinstance(ticket['ai_rationale'], str):
-                # If it's a dict/object, try to combine priority_rationale and assignee_rationale
-                if isinstance(ticket['ai_rationale'], dict):
-                    priority_rationale = ticket['ai_rationale'].get('priority_rationale', '')
-                    assignee_rationale = ticket['ai_rationale'].get('assignee_rationale', '')
-                    if priority_rationale and assignee_rationale:
-                        ticket['ai_rationale'] = f"{priority_rationale} | {assignee_rationale}"
-                    else:
-                        ticket['ai_rationale'] = priority_rationale or assignee_rationale or ''
-                else:
-                    ticket['ai_rationale'] = str(ticket['ai_rationale'])
-    
-    return ticket
+
+
+def _now_ms() -> datetime:
+    """Current IST time at the millisecond precision MongoDB stores, so locally built responses match later reads."""
+    now = get_ist_now()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
 
 @router.post("", response_model=TicketResponse, status_code=status.HTTP_201_CREATED)
 async def create_ticket(ticket: TicketCreate):
@@ -91,6 +56,13 @@ async def create_ticket(ticket: TicketCreate):
     if not ticket_dict.get("category"):
         ticket_dict["category"] = "General"
     
+    now = _now_ms()
+    activity = {
+        "timestamp": now,
+        "action": "created",
+        "details": "Ticket created",
+        "user": "system"
+    }
     ticket_dict.update({
         "status": "open",
         "priority": None,
@@ -99,216 +71,424 @@ async def create_ticket(ticket: TicketCreate):
         "ai_rationale": None,
         "ai_reply_draft": None,
         "ai_confidence": None,
-        "created_at": get_ist_now(),
-        "updated_at": get_ist_now(),
-        "activities": [{
-            "timestamp": get_ist_now(),
-            "action": "created",
-            "details": "Ticket created",
-            "user": "system"
-        }]
+        "duplicate_of": None,
+        # MinHash signature used to reuse triage of near-identical tickets
+        **dedup_fields(ticket_dict["title"], ticket_dict["description"]),
+        "created_at": now,
+        "updated_at": now,
+        # Latest activities only; the full history is in ticket_activities
+        "activities": [activity],
+        "activity_count": 1,
+        # Incremented on every write; part of the ticket's ETag
+        "revision": 1
     })
     
-    result = await collection.insert_one(ticket_dict)
-    created_ticket = await collection.find_one({"_id": result.inserted_id})
+    # insert_one sets ticket_dict["_id"]; the response is built from the inserted document
+    await collection.insert_one(ticket_dict)
+    await asyncio.gather(
+        append_activity(str(ticket_dict["_id"]), activity),
+        record_ticket_change(None, ticket_dict)
+    )
     
-    return ticket_helper(created_ticket)
+    return ticket_response(ticket_dict, status_code=status.HTTP_201_CREATED)
+
+def encode_cursor(ticket: dict) -> str:
+    """Opaque cursor pointing just after `ticket` in (created_at, _id) descending order."""
+    raw = json.dumps({"created_at": ticket["created_at"].isoformat(), "id": str(ticket["_id"])})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """(created_at, ObjectId) from a cursor; ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["created_at"]), ObjectId(data["id"])
+    except (binascii.Error, InvalidId, KeyError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
 
-@router.get("", response_model=List[TicketResponse])
-async def list_tickets():
-    """List all tickets."""
+def build_list_query(
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assignee_user_id: Optional[str] = None,
+    product_area: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    cursor: Optional[str] = None
+) -> dict:
+    """MongoDB filter for one page of GET /tickets."""
+    query = {}
+    for field, value in (
+        ("status", status),
+        ("priority", priority),
+        ("assignee_user_id", assignee_user_id),
+        ("product_area", product_area)
+    ):
+        if value is not None:
+            query[field] = value
+    if tags:
+        query["tags"] = {"$all": tags}
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        # Keyset: everything strictly after the last ticket of the previous page
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}}
+        ]
+    return query
+
+
+@router.get("", response_model=List[TicketSummary])
+async def list_tickets(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    priority: Optional[str] = None,
+    assignee_user_id: Optional[str] = None,
+    product_area: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None, description="Only tickets with all of these tags"),
+    limit: int = Query(TICKET_LIST_DEFAULT_LIMIT, ge=1, le=TICKET_LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    List tickets, newest first, one page at a time.
+    
+    When more tickets match, the X-Next-Cursor response header holds the
+    cursor for the next page. The ETag changes with any ticket write; a
+    matching If-None-Match gets 304 without the tickets being queried.
+    """
+    try:
+        query = build_list_query(status_filter, priority, assignee_user_id, product_area, tags, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Read before the tickets: a write landing in between only makes the ETag older than the page
+    etag = list_etag(await get_tickets_revision(), {
+        "status": status_filter,
+        "priority": priority,
+        "assignee_user_id": assignee_user_id,
+        "product_area": product_area,
+        "tags": tags,
+        "limit": limit,
+        "cursor": cursor
+    })
+    # While a write of this process is not yet counted, the revision may predate it
+    if etag_matches(if_none_match, etag) and not stats_pending():
+        return not_modified(etag)
+    
     collection = get_tickets_collection()
-    tickets = []
+    tickets = [
+        ticket async for ticket in collection.find(query, TICKET_SUMMARY_PROJECTION)
+        .sort([("created_at", -1), ("_id", -1)])
+        .limit(limit + 1)
+    ]
+    
+    # The extra ticket only tells us whether there is another page
+    headers = cache_headers(etag)
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(tickets[-1])
+    
+    return ticket_list_response(tickets, headers)
+
+@router.get("/stats", response_model=TicketStatsResponse)
+async def ticket_stats(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    priority: Optional[str] = None,
+    assignee_user_id: Optional[str] = None,
+    product_area: Optional[str] = None
+):
+    """
+    Ticket counts by status × priority × assignee_user_id × product_area.
+    
+    Served from counters maintained on every ticket write (one document
+    read); filters narrow the rows, e.g. ?status=open&priority=P0 for open
+    P0s per team.
+    """
+    return await get_ticket_stats(
+        status=status_filter,
+        priority=priority,
+        assignee_user_id=assignee_user_id,
+        product_area=product_area
+    )
+
+@router.post("/triage:batch", response_model=TriageBatchResponse)
+async def triage_tickets_batch(request: TriageBatchRequest):
+    """
+    Triage many tickets in one request.
+    
+    Tickets, comments and attachments are fetched with $in queries, the LLM
+    stages run under TRIAGE_BATCH_CONCURRENCY and results are persisted with
+    bulk writes. One ticket failing does not fail the batch.
+    """
+    if not request.ticket_ids:
+        raise HTTPException(status_code=400, detail="ticket_ids must not be empty")
+    
+    if len(request.ticket_ids) > TRIAGE_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {TRIAGE_BATCH_MAX_IDS} tickets per batch")
+    
+    if request.mode is not None and request.mode not in TRIAGE_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid triage mode. Use one of: {', '.join(TRIAGE_MODES)}")
     
-    async for ticket in collection.find().sort("created_at", -1):
-        tickets.append(ticket_helper(ticket))
+    results = await run_triage_batch(request.ticket_ids, request.mode, request.bypass_cache)
+    succeeded = sum(1 for item in results if item["status"] == "succeeded")
     
-    return tickets
+    return TriageBatchResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results
+    )
 
 @router.get("/{ticket_id}", response_model=TicketResponse)
-async def get_ticket(ticket_id: str):
-    """Get a single ticket by ID."""
-    from database import _recreate_client
+async def get_ticket(ticket_id: str, if_none_match: Optional[str] = Header(None)):
+    """
+    Get a single ticket by ID.
     
+    With If-None-Match, only the ticket's revision is read first; a match
+    returns 304 without loading the document.
+    """
     if not ObjectId.is_valid(ticket_id):
         raise HTTPException(status_code=400, detail="Invalid ticket ID format")
     
-    # Get ticket - retry if event loop is closed
     collection = get_tickets_collection()
-    try:
-        ticket = await collection.find_one({"_id": ObjectId(ticket_id)})
-    except RuntimeError as e:
-        if "Event loop is closed" in str(e):
-            _recreate_client()
-            collection = get_tickets_collection()
-            ticket = await collection.find_one({"_id": ObjectId(ticket_id)})
-        else:
-            raise
+    if if_none_match:
+        current = await collection.find_one({"_id": ObjectId(ticket_id)}, ETAG_PROJECTION)
+        if current and etag_matches(if_none_match, ticket_etag(current)):
+            return not_modified(ticket_etag(current))
+    
+    # Get ticket
+    ticket = await collection.find_one({"_id": ObjectId(ticket_id)})
     
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
-    return ticket_helper(ticket)
+    return ticket_response(ticket)
+
+@router.get("/{ticket_id}/activities", response_model=List[ActivityResponse])
+async def list_ticket_activities(
+    ticket_id: str,
+    limit: int = Query(TICKET_ACTIVITY_BUCKET_SIZE, ge=1, le=TICKET_LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page")
+):
+    """
+    Full activity history of a ticket, newest first, one page at a time.
+    
+    The ticket itself only carries its latest activities. When older ones
+    remain, the X-Next-Cursor response header holds the next page's cursor.
+    """
+    if not ObjectId.is_valid(ticket_id):
+        raise HTTPException(status_code=400, detail="Invalid ticket ID format")
+    
+    if not await get_tickets_collection().find_one({"_id": ObjectId(ticket_id)}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    
+    try:
+        activities, next_cursor = await list_activities(ticket_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return activity_list_response(activities, {"X-Next-Cursor": next_cursor} if next_cursor else None)
 
 @router.put("/{ticket_id}", response_model=TicketResponse)
 async def update_ticket(ticket_id: str, ticket_update: TicketUpdate):
     """Update a ticket."""
-    from database import _recreate_client
-    
     if not ObjectId.is_valid(ticket_id):
         raise HTTPException(status_code=400, detail="Invalid ticket ID format")
     
-    # Get existing ticket - retry if event loop is closed
     collection = get_tickets_collection()
-    try:
-        existing_ticket = await collection.find_one({"_id": ObjectId(ticket_id)})
-    except RuntimeError as e:
-        if "Event loop is closed" in str(e):
-            _recreate_client()
-            collection = get_tickets_collection()
-            existing_ticket = await collection.find_one({"_id": ObjectId(ticket_id)})
-        else:
-            raise
-    if not existing_ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
     
     # Prepare update data
     update_data = {k: v for k, v in ticket_update.dict().items() if v is not None}
     
-    if update_data:
-        update_data["updated_at"] = get_ist_now()
-        
-        # Add activity log
-        activity = {
-            "timestamp": get_ist_now(),
-            "action": "updated",
-            "details": f"Updated fields: {', '.join(update_data.keys())}",
-            "user": "user"
-        }
-        
-        await collection.update_one(
-            {"_id": ObjectId(ticket_id)},
-            {
-                "$set": update_data,
-                "$push": {"activities": activity}
-            }
-        )
+    if not update_data:
+        ticket = await collection.find_one({"_id": ObjectId(ticket_id)})
+        if not ticket:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+        return ticket_response(ticket)
+    
+    update_data["updated_at"] = _now_ms()
+    
+    # Add activity log
+    activity = {
+        "timestamp": update_data["updated_at"],
+        "action": "updated",
+        "details": f"Updated fields: {', '.join(update_data.keys())}",
+        "user": "user"
+    }
+    
+    text_changed = "title" in update_data or "description" in update_data
+    if "title" in update_data and "description" in update_data:
+        update_data.update(dedup_fields(update_data["title"], update_data["description"]))
+        text_changed = False
+    
+    # One round trip: the pre-update document tells which stats counters the
+    # ticket moves between, and the response is built from it locally
+    update = {"$set": update_data, **recent_activity_update(activity)}
+    update["$inc"]["revision"] = 1
+    before = await collection.find_one_and_update({"_id": ObjectId(ticket_id)}, update)
+    if not before:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    
+    updated_ticket = with_recent_activity(
+        {**before, **update_data, "revision": (before.get("revision") or 0) + 1}, activity
+    )
+    side_writes = [
+        append_activity(ticket_id, activity),
+        record_ticket_change(before, updated_ticket)
+    ]
+    if text_changed:
+        # Only one of title/description was sent; the signature needs the other from the stored ticket
+        fields = dedup_fields(updated_ticket.get("title", ""), updated_ticket.get("description", ""))
+        side_writes.append(collection.update_one({"_id": before["_id"]}, {"$set": fields}))
+    await asyncio.gather(*side_writes)
     
-    # Return updated ticket
-    updated_ticket = await collection.find_one({"_id": ObjectId(ticket_id)})
-    return ticket_helper(updated_ticket)
+    return ticket_response(updated_ticket)
 
 @router.delete("/{ticket_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_ticket(ticket_id: str):
     """Delete a ticket."""
-    from database import _recreate_client
-    
     if not ObjectId.is_valid(ticket_id):
         raise HTTPException(status_code=400, detail="Invalid ticket ID format")
     
-    # Delete ticket - retry if event loop is closed
+    # Delete ticket
     collection = get_tickets_collection()
-    try:
-        result = await collection.delete_one({"_id": ObjectId(ticket_id)})
-    except RuntimeError as e:
-        if "Event loop is closed" in str(e):
-            _recreate_client()
-            collection = get_tickets_collection()
-            result = await collection.delete_one({"_id": ObjectId(ticket_id)})
-        else:
-            raise
-    
-    if result.deleted_count == 0:
+    deleted = await collection.find_one_and_delete({"_id": ObjectId(ticket_id)}, projection=STATS_PROJECTION)
+    
+    if not deleted:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
+    await asyncio.gather(
+        get_ticket_activities_collection().delete_many({"ticket_id": ticket_id}),
+        record_ticket_change(deleted, None)
+    )
     return None
 
-@router.post("/{ticket_id}/triage", response_model=TriageResponse)
-async def triage_ticket(ticket_id: str):
+@router.post(
+    "/{ticket_id}/triage",
+    response_model=TriageResponse,
+    responses={202: {"model": TriageJobAccepted, "description": "Triage queued (?async=true)"}}
+)
+async def triage_ticket(
+    ticket_id: str,
+    mode: Optional[str] = Query(None, description="Triage workflow: 'multi' (one call per agent) or 'fused' (one call)"),
+    bypass_cache: bool = Query(False, description="Ignore cached LLM results and call the model again"),
+    run_async: bool = Query(False, alias="async", description="Queue the triage and return 202 with a job id")
+):
     """
     Trigger AI triage for a ticket using LangGraph multi-agent workflow.
     
-    Flow: ContextDetailer → PriorityAgent → AssigneeAgent → RationaleAgent → ReplyAgent → PersistNode
-    """
-    from database import _recreate_client
+    Flow: ContextDetailer → PriorityAgent → AssigneeAgent → (RationaleAgent ∥ ReplyAgent) → PersistNode
+    Fused flow: ContextDetailer → FusedTriageAgent → PersistNode
     
+    With ?async=true the run is queued for a triage worker; poll GET /triage-jobs/{job_id}.
+    """
     if not ObjectId.is_valid(ticket_id):
         raise HTTPException(status_code=400, detail="Invalid ticket ID format")
     
-    # Get ticket from MongoDB - retry if event loop is closed
+    if mode is not None and mode not in TRIAGE_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid triage mode. Use one of: {', '.join(TRIAGE_MODES)}")
+    
+    # Get ticket from MongoDB
     collection = get_tickets_collection()
-    try:
-        ticket = await collection.find_one({"_id": ObjectId(ticket_id)})
-    except RuntimeError as e:
-        if "Event loop is closed" in str(e):
-            _recreate_client()
-            collection = get_tickets_collection()
-            ticket = await collection.find_one({"_id": ObjectId(ticket_id)})
-        else:
-            raise
+    ticket = await collection.find_one({"_id": ObjectId(ticket_id)})
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
-    # Ensure database client is recreated before LangGraph workflow
-    # This ensures Motor uses the correct event loop for workflow operations
-    _recreate_client()
+    if run_async:
+        job = await enqueue_triage_job(ticket_id, mode, bypass_cache)
+        job_id = str(job["_id"])
+        return JSONResponse(
+            status_code=202,
+            content=TriageJobAccepted(
+                job_id=job_id,
+                status=job["status"],
+                status_url=f"/triage-jobs/{job_id}"
+            ).model_dump()
+        )
     
     try:
-        # Create LangGraph workflow
-        graph = create_triage_graph()
-        
-        # Initialize state with ticket
-        initial_state = {
-            "ticket": ticket,
-            "context": None,
-            "priority": None,
-            "assignee": None,
-            "rationale": None,
-            "reply": None,
-            "error": None
-        }
-        
-        # Run multi-agent workflow
-        final_state = await graph.ainvoke(initial_state)
+        # Run multi-agent workflow on the process-wide engine (graph compiled once at startup)
+        final_state = await triage_engine.run(ticket, mode, bypass_cache)
         
         # Check for errors
         if final_state.get("error"):
             raise Exception(final_state["error"])
         
-        # Extract results
-        priority_info = final_state.get("priority", {})
-        assignee_info = final_state.get("assignee", {})
-        rationale_info = final_state.get("rationale", {})
-        reply = final_state.get("reply", "")
-        
-        # Combine rationales from RationaleAgent
-        priority_rationale = rationale_info.get("priority_rationale", "")
-        assignee_rationale = rationale_info.get("assignee_rationale", "")
-        combined_rationale = f"{priority_rationale} | {assignee_rationale}" if priority_rationale and assignee_rationale else (priority_rationale or assignee_rationale)
-        
         # Return triage response (persist_node already updated MongoDB)
-        return TriageResponse(
-            priority=priority_info.get("priority", "P3"),
-            confidence=priority_info.get("confidence", 0.0),
-            assignee=assignee_info.get("assignee_user_id", "unassigned"),
-            rationale=combined_rationale,
-            reply_draft=reply
-        )
+        return TriageResponse(**build_triage_response(final_state))
         
     except Exception as e:
-        # Log error to activity_logs
-        try:
-            activity_logs_collection = get_activity_logs_collection()
-            await activity_logs_collection.insert_one({
-                "ticket_id": str(ticket_id),
-                "event_type": "triage_failed",
-                "payload": {"error": str(e)},
-                "timestamp": get_ist_now()
-            })
-        except:
-            pass
-        
+        await _log_triage_failure(ticket_id, str(e))
         raise HTTPException(
             status_code=500,
             detail=f"AI triage failed: {str(e)}"
         )
+
+@router.get("/{ticket_id}/triage/stream")
+async def triage_ticket_stream(
+    ticket_id: str,
+    mode: Optional[str] = Query(None, description="Triage workflow: 'multi' (one call per agent) or 'fused' (one call)"),
+    bypass_cache: bool = Query(False, description="Ignore cached LLM results and call the model again")
+):
+    """
+    Run AI triage and stream progress as Server-Sent Events.
+    
+    Events:
+    - node: one per finished graph node, {"node", "output", "node_ms", "elapsed_ms"}
+    - token: a chunk of the reply draft as it is generated, {"node", "token"};
+      with "reset": true the token replaces the draft sent so far (fallback after a failed stream)
+    - result: the TriageResponse once the workflow has finished
+    - failed: {"detail"} if triage failed
+    """
+    if not ObjectId.is_valid(ticket_id):
+        raise HTTPException(status_code=400, detail="Invalid ticket ID format")
+    
+    if mode is not None and mode not in TRIAGE_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid triage mode. Use one of: {', '.join(TRIAGE_MODES)}")
+    
+    collection = get_tickets_collection()
+    ticket = await collection.find_one({"_id": ObjectId(ticket_id)})
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    
+    return StreamingResponse(
+        _triage_events(ticket, mode, bypass_cache),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _triage_events(ticket: dict, mode: Optional[str], bypass_cache: bool):
+    """Format triage_engine.stream() progress as SSE messages."""
+    ticket_id = str(ticket["_id"])
+    try:
+        async for event in triage_engine.stream(ticket, mode, bypass_cache):
+            if event["event"] in ("node", "token"):
+                yield _sse(event["event"], {key: value for key, value in event.items() if key != "event"})
+                continue
+            
+            final_state = event["state"]
+            if final_state.get("error"):
+                raise Exception(final_state["error"])
+            yield _sse("result", TriageResponse(**build_triage_response(final_state)).model_dump())
+    
+    except Exception as e:
+        await _log_triage_failure(ticket_id, str(e))
+        yield _sse("failed", {"detail": f"AI triage failed: {str(e)}"})
+
+def _sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _log_triage_failure(ticket_id: str, error: str):
+    """Log a failed triage run to activity_logs."""
+    try:
+        activity_logs_collection = get_activity_logs_collection()
+        await activity_logs_collection.insert_one({
+            "ticket_id": str(ticket_id),
+            "event_type": "triage_failed",
+            "payload": {"error": error},
+            "timestamp": get_ist_now()
+        })
+    except:
+        pass
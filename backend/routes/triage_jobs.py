@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException
+from bson import ObjectId
+
+from schemas import TriageJobResponse
+from triage.jobs import get_triage_job
+
+router = APIRouter()
+
+
+def triage_job_helper(job) -> dict:
+    """Convert a triage_jobs document to TriageJobResponse fields."""
+    job["id"] = str(job.pop("_id"))
+    return job
+
+
+@router.get("/{job_id}", response_model=TriageJobResponse)
+async def get_triage_job_status(job_id: str):
+    """Get the status (and result, once finished) of an async triage job."""
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+    
+    job = await get_triage_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Triage job not found")
+    
+    return triage_job_helper(job)
@@ -46,9 +46,43 @@ class TicketResponse(BaseModel):
     ai_rationale: Optional[str] = None
     ai_reply_draft: Optional[str] = None
     ai_confidence: Optional[float] = None
+    duplicate_of: Optional[str] = None
     created_at: datetime
     updated_at: datetime
-    activities: List[ActivityResponse] = []
+    activities: List[ActivityResponse] = []  # latest only; see GET /tickets/{id}/activities
+    activity_count: Optional[int] = None
+
+class TicketSummary(BaseModel):
+    """Schema for ticket list items (no activities, rationale or reply draft)."""
+    id: str
+    title: str
+    description: str
+    category: str
+    status: str
+    priority: Optional[str] = None
+    assignee: Optional[str] = None
+    assignee_user_id: Optional[str] = None
+    product_area: Optional[str] = None
+    tags: List[str] = []
+    ai_confidence: Optional[float] = None
+    duplicate_of: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+class TicketStatsRow(BaseModel):
+    """Schema for one ticket counter."""
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    assignee_user_id: Optional[str] = None
+    product_area: Optional[str] = None
+    count: int
+
+class TicketStatsResponse(BaseModel):
+    """Schema for ticket statistics."""
+    total: int
+    rows: List[TicketStatsRow]
+    updated_at: Optional[datetime] = None
+    reconciled_at: Optional[datetime] = None
 
 class TriageResponse(BaseModel):
     """Schema for triage response."""
@@ -57,3 +91,54 @@ class TriageResponse(BaseModel):
     assignee: str
     rationale: str
     reply_draft: str
+
+class TriageBatchRequest(BaseModel):
+    """Schema for batch triage request."""
+    ticket_ids: List[str]
+    mode: Optional[str] = None
+    bypass_cache: bool = False
+
+class TriageBatchItem(BaseModel):
+    """Schema for one ticket's outcome in a batch triage."""
+    ticket_id: str
+    status: str  # succeeded | failed
+    result: Optional[TriageResponse] = None
+    error: Optional[str] = None
+
+class TriageBatchResponse(BaseModel):
+    """Schema for batch triage response."""
+    total: int
+    succeeded: int
+    failed: int
+    results: List[TriageBatchItem]
+
+class TriageJobAccepted(BaseModel):
+    """Schema for an accepted async triage request (202)."""
+    job_id: str
+    status: str
+    status_url: str
+
+class TriageJobResponse(BaseModel):
+    """Schema for async triage job status."""
+    id: str
+    ticket_id: str
+    status: str  # queued | running | succeeded | failed
+    mode: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    result: Optional[TriageResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+class TeamUpsert(BaseModel):
+    """Schema for creating or replacing a team."""
+    name: str
+    skills: List[str] = []
+
+class TeamResponse(BaseModel):
+    """Schema for a team in the roster."""
+    id: str
+    name: str
+    skills: List[str] = []
@@ -4,6 +4,7 @@ Run this once to initialize the users collection.
 """
 import asyncio
 from database import connect_to_mongo, get_users_collection
+from triage.roster import bump_roster_version
 
 
 async def seed_users():
@@ -144,6 +145,10 @@ async def seed_users():
     result = await users_collection.insert_many(teams)
     print(f"Seeded {len(result.inserted_ids)} teams to MongoDB")
     
+    # Running API servers and workers reload their cached roster
+    version = await bump_roster_version()
+    print(f"Roster version is now {version}")
+    
     # Display summary
     count = await users_collection.count_documents({})
     print(f"\nTotal teams in database: {count}\n")
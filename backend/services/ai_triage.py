@@ -1,21 +1,10 @@
-import os
-import google.generativeai as genai
 from typing import Dict
 import json
 
 
 from models import get_ist_now
-
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-USE_MOCK = os.getenv("USE_MOCK_AI", "false").lower() == "true"
-
-if GEMINI_API_KEY and not USE_MOCK:
-    genai.configure(api_key=GEMINI_API_KEY)
-    # Using gemini-2.0-flash-exp for consistency with triage agents
-    model = genai.GenerativeModel('gemini-2.0-flash-exp')
-else:
-    model = None
+from triage.llm_governor import llm_governor
+from triage.llm_registry import get_llm
 
 async def perform_triage(title: str, description: str, category: str) -> Dict:
     """
@@ -24,7 +13,8 @@ async def perform_triage(title: str, description: str, category: str) -> Dict:
     """
     
     # Mock fallback for development/testing
-    if USE_MOCK or not GEMINI_API_KEY or not model:
+    llm = get_llm("legacy")
+    if not llm:
         return _mock_triage(title, description, category)
     
     try:
@@ -65,8 +55,8 @@ Reply Draft Guidelines:
 - Keep it under 120 words
 """
         
-        response = model.generate_content(prompt)
-        result_text = response.text.strip()
+        response = await llm_governor.ainvoke(llm, prompt, lane="legacy")
+        result_text = response.content.strip()
         
         # Extract JSON from markdown code blocks if present
         if "```json" in result_text:
@@ -0,0 +1,124 @@
+"""
+Ticket activities - Full activity history in fixed-size buckets.
+
+Each ticket's history lives in ticket_activities documents of at most
+TICKET_ACTIVITY_BUCKET_SIZE entries:
+
+    {"ticket_id": "...", "first_at": ..., "last_at": ..., "count": 3, "activities": [...]}
+
+Appends go to the ticket's open bucket (count below the size), or a new
+one. The ticket document itself only keeps the latest
+TICKET_RECENT_ACTIVITIES entries (plus activity_count), so reads of a
+long-lived ticket stay small; GET /tickets/{id}/activities pages through
+the buckets.
+"""
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from database import get_ticket_activities_collection
+
+
+TICKET_ACTIVITY_BUCKET_SIZE = int(os.getenv("TICKET_ACTIVITY_BUCKET_SIZE", "50"))
+# Activities embedded in the ticket document (the rest only in buckets)
+TICKET_RECENT_ACTIVITIES = int(os.getenv("TICKET_RECENT_ACTIVITIES", "10"))
+
+
+def recent_activity_update(activity: Dict) -> Dict:
+    """Update operators adding an activity to the ticket's capped recent list."""
+    return {
+        "$push": {"activities": {"$each": [activity], "$slice": -TICKET_RECENT_ACTIVITIES}},
+        "$inc": {"activity_count": 1}
+    }
+
+
+def with_recent_activity(ticket: Dict, activity: Dict) -> Dict:
+    """The ticket as recent_activity_update leaves it in MongoDB (for building responses locally)."""
+    return {
+        **ticket,
+        "activities": ((ticket.get("activities") or []) + [activity])[-TICKET_RECENT_ACTIVITIES:],
+        "activity_count": (ticket.get("activity_count") or 0) + 1
+    }
+
+
+def bucket_documents(ticket_id: str, activities: List[Dict]) -> List[Dict]:
+    """Full buckets for a ticket's existing history (oldest first)."""
+    buckets = []
+    for start in range(0, len(activities), TICKET_ACTIVITY_BUCKET_SIZE):
+        chunk = activities[start:start + TICKET_ACTIVITY_BUCKET_SIZE]
+        timestamps = [a["timestamp"] for a in chunk if isinstance(a.get("timestamp"), datetime)]
+        buckets.append({
+            "ticket_id": ticket_id,
+            "first_at": min(timestamps) if timestamps else None,
+            "last_at": max(timestamps) if timestamps else None,
+            "count": len(chunk),
+            "activities": chunk
+        })
+    return buckets
+
+
+async def append_activity(ticket_id: str, activity: Dict):
+    """Add an activity to the ticket's open bucket, starting a new bucket when it is full."""
+    timestamp = activity["timestamp"]
+    await get_ticket_activities_collection().update_one(
+        {"ticket_id": ticket_id, "count": {"$lt": TICKET_ACTIVITY_BUCKET_SIZE}},
+        {
+            "$push": {"activities": activity},
+            "$inc": {"count": 1},
+            "$min": {"first_at": timestamp},
+            "$max": {"last_at": timestamp}
+        },
+        upsert=True
+    )
+
+
+def encode_activity_cursor(bucket: Dict, index: int) -> str:
+    """Cursor for the entries before position `index` of `bucket`."""
+    raw = json.dumps({
+        "first_at": bucket["first_at"].isoformat() if bucket.get("first_at") else None,
+        "bucket": str(bucket["_id"]),
+        "index": index
+    })
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_activity_cursor(cursor: str) -> Tuple[Optional[datetime], ObjectId, int]:
+    """(first_at, bucket id, index) from a cursor; ValueError if it is malformed."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        first_at = datetime.fromisoformat(data["first_at"]) if data["first_at"] else None
+        return first_at, ObjectId(data["bucket"]), int(data["index"])
+    except (binascii.Error, InvalidId, KeyError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def list_activities(ticket_id: str, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of a ticket's activities, newest first.
+
+    Returns (activities, next_cursor); next_cursor is None on the last page.
+    """
+    query = {"ticket_id": ticket_id}
+    bucket_id, index = None, None
+    if cursor:
+        first_at, bucket_id, index = decode_activity_cursor(cursor)
+        # The cursor's bucket and every older one
+        query["$or"] = [
+            {"first_at": {"$lt": first_at}},
+            {"first_at": first_at, "_id": {"$lte": bucket_id}}
+        ]
+
+    page = []
+    buckets = get_ticket_activities_collection().find(query).sort([("first_at", -1), ("_id", -1)])
+    async for bucket in buckets:
+        entries = bucket.get("activities") or []
+        end = index if bucket["_id"] == bucket_id else len(entries)
+        for position in range(end - 1, -1, -1):
+            if len(page) == limit:
+                return page, encode_activity_cursor(bucket, position + 1)
+            page.append(entries[position])
+    return page, None
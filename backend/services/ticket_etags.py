@@ -0,0 +1,57 @@
+"""
+Ticket ETags - Conditional GET for ticket reads.
+
+Every ticket write increments the ticket's `revision`, so a single
+ticket's ETag is its id, revision and updated_at. Every ticket write is
+also counted in the ticket_stats document, which bumps its `revision`
+after the ticket write has landed (retried in the background if that
+fails, with no 304s meanwhile); a list's ETag is that revision plus the
+query parameters. A poll whose If-None-Match still matches gets a
+304 after one small read, without querying or serialising tickets.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional
+from fastapi.responses import Response
+
+
+# Browsers may keep ticket responses but must revalidate them (cheap with ETags)
+TICKET_CACHE_CONTROL = os.getenv("TICKET_CACHE_CONTROL", "private, no-cache")
+
+# Fields a ticket's ETag is computed from
+ETAG_PROJECTION = {"revision": 1, "updated_at": 1}
+
+
+def ticket_etag(ticket: Dict) -> str:
+    """Strong ETag for one ticket."""
+    updated_at = ticket.get("updated_at")
+    updated_ms = int(updated_at.timestamp() * 1000) if isinstance(updated_at, datetime) else 0
+    return f'"{ticket["_id"]}-{ticket.get("revision") or 0}-{updated_ms}"'
+
+
+def list_etag(revision: int, params: Dict) -> str:
+    """Strong ETag for a ticket list page: the tickets revision plus the query parameters."""
+    raw = json.dumps([revision, params], sort_keys=True, default=str)
+    return f'"l-{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers `etag` (weak comparison, as RFC 9110 specifies for it)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """ETag and Cache-Control headers for a ticket response."""
+    return {"ETag": etag, "Cache-Control": TICKET_CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """304 response for a matching If-None-Match."""
+    return Response(status_code=304, headers=cache_headers(etag))
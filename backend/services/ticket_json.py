@@ -0,0 +1,93 @@
+"""
+Ticket JSON - Fast serialisation of ticket documents for API responses.
+
+Ticket reads return documents straight from MongoDB, which the API trusts,
+so the response path skips Pydantic validation and the stdlib encoder:
+each response schema is compiled once into a (field, default) table, a
+document is reduced to those fields and orjson writes the bytes. The
+MongoDB client is tz_aware, so datetimes arrive as IST-aware values that
+orjson serialises natively. Documents are assumed to be in the canonical
+shape (see migrate_tickets.py), so nothing is repaired per read. The
+response schemas stay as response_model for the OpenAPI docs.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+import orjson
+from bson import ObjectId
+from fastapi.responses import Response
+from pydantic import BaseModel
+from schemas import ActivityResponse, TicketResponse, TicketSummary
+from services.ticket_etags import cache_headers, ticket_etag
+
+
+# Naive datetimes (none from a tz_aware client) are written as UTC
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC
+
+
+def compile_fields(model: Type[BaseModel]) -> Tuple[Tuple[str, Any], ...]:
+    """(field, default) pairs of a response schema, in declaration order."""
+    return tuple(
+        (name, None if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in model.model_fields.items()
+    )
+
+
+TICKET_FIELDS = compile_fields(TicketResponse)
+TICKET_SUMMARY_FIELDS = compile_fields(TicketSummary)
+ACTIVITY_FIELDS = compile_fields(ActivityResponse)
+
+
+def _default(value: Any) -> Any:
+    """Types orjson does not know natively."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def activity_document(activity: Dict) -> Dict:
+    """An activity reduced to ActivityResponse fields."""
+    return {name: activity.get(name, default) for name, default in ACTIVITY_FIELDS}
+
+
+def ticket_document(ticket: Dict, fields: Tuple[Tuple[str, Any], ...] = TICKET_FIELDS) -> Dict:
+    """A MongoDB ticket reduced to the fields of a response schema, ready for orjson."""
+    document = {name: ticket.get(name, default) for name, default in fields}
+    document["id"] = str(ticket["_id"])
+    if "activities" in document:
+        document["activities"] = [activity_document(a) for a in document["activities"] or []]
+    return document
+
+
+def dumps(content: Any) -> bytes:
+    """JSON bytes with the ticket serialisation options."""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class TicketJSONResponse(Response):
+    """JSON response rendered with orjson (content is already plain data)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def ticket_response(ticket: Dict, status_code: int = 200) -> TicketJSONResponse:
+    """TicketResponse body for one ticket document, with its ETag."""
+    return TicketJSONResponse(
+        ticket_document(ticket),
+        status_code=status_code,
+        headers=cache_headers(ticket_etag(ticket))
+    )
+
+
+def ticket_list_response(tickets: Iterable[Dict], headers: Optional[Dict[str, str]] = None) -> TicketJSONResponse:
+    """List[TicketSummary] body for ticket documents."""
+    return TicketJSONResponse(
+        [ticket_document(ticket, TICKET_SUMMARY_FIELDS) for ticket in tickets],
+        headers=headers
+    )
+
+
+def activity_list_response(activities: List[Dict], headers: Optional[Dict[str, str]] = None) -> TicketJSONResponse:
+    """List[ActivityResponse] body for activity entries."""
+    return TicketJSONResponse([activity_document(a) for a in activities], headers=headers)
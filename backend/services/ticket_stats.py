@@ -0,0 +1,217 @@
+"""
+Ticket statistics - Counters kept up to date on every ticket write.
+
+A single ticket_stats document holds one counter per
+(status, priority, assignee_user_id, product_area) combination:
+
+    {"_id": "tickets", "counts": {"open|P0|devops|billing": 3, ...}}
+
+create/update/delete and triage apply a $inc for the combination a ticket
+leaves and the one it enters, so GET /tickets/stats is one small read
+instead of a scan of the tickets collection. Every recorded write also
+increments `revision`, which GET /tickets uses as its list ETag; callers
+record a change only after the ticket write itself has landed. A counter
+update that fails never fails that write: it is kept as pending and
+retried in the background, and while anything is pending this process
+answers GET /tickets without 304s (its revision would be stale).
+rebuild_ticket_stats()
+recounts everything with an aggregation (reconcile_ticket_stats.py, and
+the first index/migration run) to repair any drift.
+"""
+import asyncio
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+from database import get_tickets_collection, get_ticket_stats_collection
+from models import get_ist_now
+
+
+STATS_ID = "tickets"
+STATS_FIELDS = ("status", "priority", "assignee_user_id", "product_area")
+# Fields to read before a write so the change can be counted
+STATS_PROJECTION = {field: 1 for field in STATS_FIELDS}
+
+# Wait before the first background retry of a failed counter update (doubled per retry, up to a minute)
+TICKET_STATS_RETRY_SECONDS = float(os.getenv("TICKET_STATS_RETRY_SECONDS", "0.5"))
+TICKET_STATS_RETRY_MAX_SECONDS = 60.0
+
+# $inc of counter updates that failed and are not yet retried successfully
+_pending_inc: Dict[str, int] = {}
+_retry_task: Optional[asyncio.Task] = None
+
+# Characters MongoDB field names cannot contain, plus our separator
+_ESCAPES = {"%": "%25", ".": "%2E", "$": "%24", "|": "%7C"}
+
+
+def _encode(value) -> str:
+    if value is None:
+        return ""
+    text = str(value)
+    for char, escaped in _ESCAPES.items():
+        text = text.replace(char, escaped)
+    return text
+
+
+def stats_key(ticket: Dict) -> str:
+    """Counter key for a ticket's status/priority/assignee/product area."""
+    return "|".join(_encode(ticket.get(field)) for field in STATS_FIELDS)
+
+
+def parse_stats_key(key: str) -> Dict:
+    """Inverse of stats_key (missing values come back as None)."""
+    return {field: unquote(part) or None for field, part in zip(STATS_FIELDS, key.split("|"))}
+
+
+def stats_delta(changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]]) -> Dict[str, int]:
+    """
+    $inc document for (before, after) ticket pairs.
+
+    before is None for a created ticket, after is None for a deleted one.
+    """
+    delta: Dict[str, int] = {}
+    for before, after in changes:
+        if before is not None:
+            key = f"counts.{stats_key(before)}"
+            delta[key] = delta.get(key, 0) - 1
+        if after is not None:
+            key = f"counts.{stats_key(after)}"
+            delta[key] = delta.get(key, 0) + 1
+    return {key: value for key, value in delta.items() if value}
+
+
+async def record_ticket_changes(changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]]):
+    """
+    Apply ticket writes to the counters in one update.
+
+    Writes that move no counter (e.g. a title edit) still bump the
+    revision. Failures are logged, not raised: the ticket write already
+    happened, so the update is queued and retried in the background.
+    """
+    changes = list(changes)
+    if not changes:
+        return
+    inc = {**stats_delta(changes), "revision": 1}
+    try:
+        await _apply_inc(inc)
+    except Exception as e:
+        print(f"⚠️  Could not update ticket stats, retrying in the background: {e}")
+        _queue_inc(inc)
+
+
+async def _apply_inc(inc: Dict[str, int]):
+    await get_ticket_stats_collection().update_one(
+        {"_id": STATS_ID},
+        {"$inc": inc, "$set": {"updated_at": get_ist_now()}},
+        upsert=True
+    )
+
+
+def _queue_inc(inc: Dict[str, int]):
+    """Merge a failed update into the pending one and make sure it is being retried."""
+    global _retry_task
+    for key, value in inc.items():
+        _pending_inc[key] = _pending_inc.get(key, 0) + value
+    if _retry_task is None or _retry_task.done():
+        _retry_task = asyncio.create_task(_retry_pending())
+
+
+async def _retry_pending():
+    """Retry the pending counter update with a doubling wait until it lands."""
+    delay = TICKET_STATS_RETRY_SECONDS
+    while _pending_inc:
+        await asyncio.sleep(delay)
+        inc = dict(_pending_inc)
+        _pending_inc.clear()
+        try:
+            await _apply_inc(inc)
+        except Exception as e:
+            # Updates queued meanwhile are merged with this one for the next attempt
+            for key, value in inc.items():
+                _pending_inc[key] = _pending_inc.get(key, 0) + value
+            print(f"⚠️  Ticket stats still not updated ({inc['revision']} writes pending): {e}")
+            delay = min(delay * 2, TICKET_STATS_RETRY_MAX_SECONDS)
+        else:
+            print(f"Ticket stats caught up with {inc['revision']} pending writes")
+
+
+def stats_pending() -> bool:
+    """Whether this process has ticket writes not yet counted (the list revision is stale)."""
+    return bool(_pending_inc) or (_retry_task is not None and not _retry_task.done())
+
+
+async def record_ticket_change(before: Optional[Dict], after: Optional[Dict]):
+    """Apply one ticket write to the counters."""
+    await record_ticket_changes([(before, after)])
+
+
+async def get_tickets_revision() -> int:
+    """Revision of the tickets collection (incremented on every recorded ticket write)."""
+    doc = await get_ticket_stats_collection().find_one({"_id": STATS_ID}, {"revision": 1})
+    return (doc or {}).get("revision", 0)
+
+
+async def get_ticket_stats(**filters) -> Dict:
+    """
+    Counter rows, optionally narrowed to the given field values.
+
+    Returns {"total", "rows": [{status, priority, assignee_user_id,
+    product_area, count}], "updated_at", "reconciled_at"}.
+    """
+    doc = await get_ticket_stats_collection().find_one({"_id": STATS_ID}) or {}
+    rows: List[Dict] = []
+    for key, count in (doc.get("counts") or {}).items():
+        if not count:
+            continue
+        row = parse_stats_key(key)
+        if any(value is not None and row[field] != value for field, value in filters.items()):
+            continue
+        rows.append({**row, "count": count})
+    rows.sort(key=lambda row: -row["count"])
+    return {
+        "total": sum(row["count"] for row in rows),
+        "rows": rows,
+        "updated_at": doc.get("updated_at"),
+        "reconciled_at": doc.get("reconciled_at")
+    }
+
+
+async def rebuild_ticket_stats(db=None) -> Dict[str, int]:
+    """
+    Recount every combination from the tickets collection and replace the counters.
+
+    Uses `db`'s collections when given (migrations), else the app database.
+    Writes that land while the aggregation runs can be lost; run it when
+    traffic is low. Returns {key: old_count - new_count} for counters that
+    had drifted.
+    """
+    tickets = db["tickets"] if db is not None else get_tickets_collection()
+    collection = db["ticket_stats"] if db is not None else get_ticket_stats_collection()
+    counts: Dict[str, int] = {}
+    pipeline = [
+        {"$group": {"_id": {field: f"${field}" for field in STATS_FIELDS}, "count": {"$sum": 1}}}
+    ]
+    async for row in tickets.aggregate(pipeline):
+        key = stats_key(row["_id"])
+        # None and "" share a key
+        counts[key] = counts.get(key, 0) + row["count"]
+
+    previous_doc = await collection.find_one({"_id": STATS_ID}) or {}
+    previous = previous_doc.get("counts") or {}
+    now = get_ist_now()
+    await collection.replace_one(
+        {"_id": STATS_ID},
+        {
+            "_id": STATS_ID,
+            "counts": counts,
+            # Keep list ETags moving forward (never reuse an old revision)
+            "revision": previous_doc.get("revision", 0) + 1,
+            "updated_at": now,
+            "reconciled_at": now
+        },
+        upsert=True
+    )
+    return {
+        key: previous.get(key, 0) - counts.get(key, 0)
+        for key in set(previous) | set(counts)
+        if previous.get(key, 0) != counts.get(key, 0)
+    }
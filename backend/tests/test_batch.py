@@ -0,0 +1,196 @@
+import asyncio
+from datetime import timedelta
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from pymongo.results import BulkWriteResult
+import triage.batch as batch_module
+from models import get_ist_now
+
+
+class BulkCollection:
+    """Collection stand-in whose bulk calls fail at the given positions (or raise `error`)."""
+
+    def __init__(self, failed_positions=(), error=None):
+        self.failed_positions = set(failed_positions)
+        self.error = error
+        self.written = []
+
+    async def _bulk(self, operations):
+        if self.error:
+            raise self.error
+        self.written = [op for i, op in enumerate(operations) if i not in self.failed_positions]
+        if self.failed_positions:
+            raise BulkWriteError({
+                "writeErrors": [{"index": i, "code": 121, "errmsg": "Document failed validation"}
+                                for i in sorted(self.failed_positions)],
+                "nInserted": len(self.written)
+            })
+
+    async def bulk_write(self, requests, ordered=True):
+        await self._bulk(requests)
+
+    async def insert_many(self, documents, ordered=True):
+        await self._bulk(documents)
+
+
+class TicketsCollection(BulkCollection):
+    """Tickets stand-in applying revision-guarded UpdateOnes to stored documents."""
+
+    def __init__(self, stored, failed_positions=(), error=None, edited_between=()):
+        super().__init__(failed_positions, error)
+        self.stored = {doc["_id"]: dict(doc) for doc in stored}
+        # Tickets a user edits after the pre-write read
+        self.edited_between = set(edited_between)
+
+    def find(self, query, projection=None):
+        docs = [dict(self.stored[i]) for i in query["_id"]["$in"] if i in self.stored]
+        return FakeCursor(docs)
+
+    async def bulk_write(self, requests, ordered=True):
+        for ticket_id in self.edited_between:
+            self.stored[ticket_id]["revision"] = self.stored[ticket_id].get("revision", 0) + 1
+            self.stored[ticket_id]["updated_at"] = get_ist_now() - timedelta(seconds=1)
+        self.edited_between = set()
+        matched = 0
+        for i, request in enumerate(requests):
+            doc = self.stored.get(request._filter["_id"])
+            if i in self.failed_positions or doc is None or doc.get("revision") != request._filter["revision"]:
+                continue
+            doc.update(request._doc["$set"])
+            doc["revision"] = (doc.get("revision") or 0) + 1
+            matched += 1
+        await self._bulk(requests)
+        return BulkWriteResult({"nMatched": matched}, True)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+def _states(count, status="open"):
+    states = {}
+    for _ in range(count):
+        ticket = {"_id": ObjectId(), "status": status, "revision": 1}
+        states[str(ticket["_id"])] = {
+            "ticket": ticket,
+            "priority": {"priority": "P2", "confidence": 0.8},
+            "assignee": {"assignee_user_id": "devops"},
+            "rationale": {},
+            "reply": "On it"
+        }
+    return states
+
+
+def _tickets(states, **kwargs):
+    return TicketsCollection([state["ticket"] for state in states.values()], **kwargs)
+
+
+def _setup(monkeypatch, tickets, triage_results=None, activity_logs=None):
+    recorded = []
+
+    async def record_ticket_changes(changes):
+        recorded.extend((before["_id"], before["status"], after["status"]) for before, after in changes)
+
+    monkeypatch.setattr(batch_module, "get_tickets_collection", lambda: tickets)
+    monkeypatch.setattr(batch_module, "get_triage_results_collection", lambda: triage_results or BulkCollection())
+    monkeypatch.setattr(batch_module, "get_activity_logs_collection", lambda: activity_logs or BulkCollection())
+    monkeypatch.setattr(batch_module, "record_ticket_changes", record_ticket_changes)
+    return recorded
+
+
+def test_persist_reports_only_the_failed_tickets(monkeypatch):
+    states = _states(4)
+    ids = list(states)
+    recorded = _setup(monkeypatch, _tickets(states, failed_positions=[1]), triage_results=BulkCollection(failed_positions=[2]))
+
+    failures = asyncio.run(batch_module._persist_states(states, {"devops": "DevOps"}))
+
+    assert set(failures) == {ids[1], ids[2]}
+    assert "validation" in failures[ids[1]]
+    # Stats follow the ticket updates that landed, including the one whose triage result failed
+    assert [ticket_id for ticket_id, _, _ in recorded] == [states[t]["ticket"]["_id"] for t in (ids[0], ids[2], ids[3])]
+
+
+def test_stats_count_from_the_stored_tickets(monkeypatch):
+    states = _states(3)
+    ids = list(states)
+    tickets = _tickets(states)
+    # Edited by a user while the batch's LLM stages ran
+    tickets.stored[states[ids[0]]["ticket"]["_id"]].update(status="in_progress", revision=2)
+    recorded = _setup(monkeypatch, tickets)
+
+    failures = asyncio.run(batch_module._persist_states(states, {}))
+
+    assert failures == {}
+    assert [(before, after) for _, before, after in recorded] == [
+        ("in_progress", "triaged"), ("open", "triaged"), ("open", "triaged")
+    ]
+
+
+def test_ticket_edited_during_the_write_is_failed_not_counted(monkeypatch):
+    states = _states(2)
+    ids = list(states)
+    edited = states[ids[1]]["ticket"]["_id"]
+    recorded = _setup(monkeypatch, _tickets(states, edited_between=[edited]))
+
+    failures = asyncio.run(batch_module._persist_states(states, {}))
+
+    assert list(failures) == [ids[1]] and "changed during triage" in failures[ids[1]]
+    assert [ticket_id for ticket_id, _, _ in recorded] == [states[ids[0]]["ticket"]["_id"]]
+
+
+def test_persist_fails_every_ticket_when_the_bulk_write_errors(monkeypatch):
+    states = _states(3)
+    recorded = _setup(monkeypatch, _tickets(states, error=ConnectionError("connection reset")))
+
+    failures = asyncio.run(batch_module._persist_states(states, {}))
+
+    assert failures == {ticket_id: "connection reset" for ticket_id in states}
+    assert recorded == []
+
+
+class AggregateCollection:
+    """Collection stand-in that records the pipeline and returns fixed groups."""
+
+    def __init__(self, groups):
+        self.groups = groups
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return self._iterate()
+
+    async def _iterate(self):
+        for group in self.groups:
+            yield group
+
+
+def test_fetch_contexts_groups_only_the_context_fields(monkeypatch):
+    from datetime import datetime
+    import triage.agents.context_detailer as detailer_module
+
+    ticket = {"_id": ObjectId(), "title": "Server down", "description": "Prod is down"}
+    ticket_id = str(ticket["_id"])
+    comments = AggregateCollection([{"_id": ticket_id, "docs": [{"text": "Still down", "created_at": datetime(2024, 1, 1)}]}])
+    attachments = AggregateCollection([{"_id": ticket_id, "docs": [{"filename": "trace.log", "size": 120}]}])
+    monkeypatch.setattr(detailer_module, "get_comments_collection", lambda: comments)
+    monkeypatch.setattr(detailer_module, "get_attachments_collection", lambda: attachments)
+
+    contexts = asyncio.run(detailer_module.fetch_contexts([ticket]))
+
+    assert contexts[ticket_id]["comments"] == [{"text": "Still down", "created_at": "2024-01-01T00:00:00"}]
+    assert contexts[ticket_id]["attachments"] == [{"filename": "trace.log", "size": 120}]
+    group = comments.pipelines[0][-1]["$group"]
+    # Bounded per ticket and no full documents carried through the group
+    assert group["docs"] == {"$firstN": {"n": detailer_module.COMMENT_LIMIT,
+                                         "input": {"text": "$text", "created_at": "$created_at"}}}
+    assert comments.pipelines[0][1] == {"$sort": {"ticket_id": 1, "created_at": 1}}
+    assert attachments.pipelines[0][-1]["$group"]["docs"]["$firstN"]["input"] == {"filename": "$filename", "size": "$size"}
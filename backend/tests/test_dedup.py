@@ -0,0 +1,169 @@
+import asyncio
+from datetime import timedelta
+import triage.dedup as dedup_module
+import triage.graph as graph_module
+from triage.graph import create_triage_graph
+from triage.agents import duplicate_detector as detector_module
+from triage.agents.persist_node import build_persist_docs
+from models import get_ist_now
+from triage.dedup import CANDIDATE_LIMIT, TICKET_DEDUP_THRESHOLD, dedup_fields, similarity
+
+
+STORED_RESULT = {
+    "_id": "r1",
+    "ticket_id": "canonical",
+    "priority": "P0",
+    "priority_confidence": 0.9,
+    "priority_rationale": "Outage",
+    "assignee_user_id": "devops",
+    "assignee_rationale": "Infra",
+    "reply_draft": "We are on it."
+}
+
+
+def test_near_identical_tickets_share_signature_and_bands():
+    a = dedup_fields("Dashboard down", "The analytics dashboard is down for all users since 10am")
+    b = dedup_fields("Dashboard is down!", "The analytics dashboard is down for all our users since 10 am")
+    c = dedup_fields("Refund request", "Please refund my last invoice, I was charged twice")
+
+    assert similarity(a["dedup_signature"], b["dedup_signature"]) >= TICKET_DEDUP_THRESHOLD
+    assert set(a["dedup_bands"]) & set(b["dedup_bands"])
+    assert similarity(a["dedup_signature"], c["dedup_signature"]) < 0.2
+    assert dedup_fields("", "") == {"dedup_signature": [], "dedup_bands": []}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for op, operand in condition.items():
+            if op == "$in" and not (set(value) & set(operand) if isinstance(value, list) else value in operand):
+                return False
+            if op == "$ne" and value == operand:
+                return False
+            if op == "$gte" and (value is None or value < operand):
+                return False
+    return True
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.projections = []
+
+    def find(self, query, projection=None):
+        self.projections.append(projection)
+        return FakeCursor([doc for doc in self.docs if _matches(doc, query)])
+
+
+def test_find_canonical_skips_matches_older_than_the_window(monkeypatch):
+    fields = dedup_fields("Dashboard down", "The analytics dashboard is down for all users since 10am")
+    now = get_ist_now()
+    # An old storm of identical tickets, stored first, must not crowd out the recent canonical ticket
+    old = [
+        {"_id": f"old{i}", "priority": "P1", "updated_at": now - timedelta(days=3), **fields}
+        for i in range(CANDIDATE_LIMIT + 10)
+    ]
+    recent = {"_id": "canonical", "priority": "P0", "assignee_user_id": "devops",
+              "updated_at": now - timedelta(minutes=5), **fields}
+    tickets = FakeCollection(old + [recent])
+    results = FakeCollection(
+        [{**STORED_RESULT, "created_at": now - timedelta(minutes=5)}]
+        + [{"_id": f"r{i}", "ticket_id": f"old{i}", "created_at": now - timedelta(days=3)} for i in range(len(old))]
+    )
+    monkeypatch.setattr(dedup_module, "get_tickets_collection", lambda: tickets)
+    monkeypatch.setattr(dedup_module, "get_triage_results_collection", lambda: results)
+
+    match = asyncio.run(dedup_module.duplicate_index.find_canonical({"_id": "new", **fields}))
+
+    assert match is not None
+    assert match[0]["ticket_id"] == "canonical"
+    assert match[1] == 1.0
+    # Only the reused fields are read, not the whole stored result
+    assert "heuristic" not in results.projections[0] and "reply_draft" in results.projections[0]
+
+
+def test_find_canonical_skips_tickets_changed_by_hand(monkeypatch):
+    fields = dedup_fields("Dashboard down", "The analytics dashboard is down for all users since 10am")
+    now = get_ist_now()
+    # Triaged as P0/devops, then re-prioritised by a human
+    edited = {"_id": "canonical", "priority": "P2", "assignee_user_id": "devops", "updated_at": now, **fields}
+    tickets = FakeCollection([edited])
+    results = FakeCollection([
+        {**STORED_RESULT, "created_at": now - timedelta(minutes=5)},
+        # An older result that happens to agree must not be picked instead
+        {**STORED_RESULT, "_id": "r0", "priority": "P2", "created_at": now - timedelta(minutes=30)}
+    ])
+    monkeypatch.setattr(dedup_module, "get_tickets_collection", lambda: tickets)
+    monkeypatch.setattr(dedup_module, "get_triage_results_collection", lambda: results)
+
+    assert asyncio.run(dedup_module.duplicate_index.find_canonical({"_id": "new", **fields})) is None
+
+    edited["priority"] = "P0"
+    match = asyncio.run(dedup_module.duplicate_index.find_canonical({"_id": "new", **fields}))
+    assert match[0]["_id"] == "r1"
+
+
+def _patch_graph(monkeypatch, match):
+    async def find_canonical(ticket):
+        return match
+
+    async def llm_node(state):
+        raise AssertionError("LLM agent should have been skipped")
+
+    monkeypatch.setattr(detector_module.duplicate_index, "find_canonical", find_canonical)
+    monkeypatch.setattr(graph_module, "context_detailer", lambda state: {"context": {"title": "t", "body": "b"}})
+    for name in ("heuristic_classifier", "priority_agent", "assignee_agent", "fused_triage_agent"):
+        monkeypatch.setattr(graph_module, name, llm_node)
+
+
+def test_duplicate_reuses_canonical_triage(monkeypatch):
+    _patch_graph(monkeypatch, (STORED_RESULT, 0.91))
+    monkeypatch.setattr(graph_module, "reply_agent", lambda state: (_ for _ in ()).throw(AssertionError("reply")))
+
+    for mode in ("multi", "fused"):
+        final_state = asyncio.run(create_triage_graph(mode, persist=False).ainvoke({"ticket": {"_id": "t2"}}))
+        assert final_state["duplicate"] == {"ticket_id": "canonical", "similarity": 0.91}
+        assert final_state["priority"] == {"priority": "P0", "confidence": 0.9}
+        assert final_state["assignee"] == {"assignee_user_id": "devops"}
+        assert final_state["reply"] == "We are on it."
+
+    update_fields, triage_result_doc, _ = build_persist_docs(final_state, "DevOps", None)
+    assert update_fields["duplicate_of"] == "canonical"
+    assert triage_result_doc["duplicate_similarity"] == 0.91
+
+
+def test_duplicate_can_get_a_fresh_reply(monkeypatch):
+    # A canonical that was itself a duplicate links to the original ticket
+    _patch_graph(monkeypatch, ({**STORED_RESULT, "duplicate_of": "original"}, 0.8))
+    monkeypatch.setattr(detector_module, "TICKET_DEDUP_FRESH_REPLY", True)
+    monkeypatch.setattr(graph_module, "reply_agent", lambda state: {"reply": "Fresh reply"})
+
+    for mode in ("multi", "fused"):
+        final_state = asyncio.run(create_triage_graph(mode, persist=False).ainvoke({"ticket": {"_id": "t3"}}))
+        assert final_state["duplicate"]["ticket_id"] == "original"
+        assert final_state["rationale"]["priority_rationale"] == "Outage"
+        assert final_state["reply"] == "Fresh reply"
@@ -0,0 +1,50 @@
+from triage.agents.fused_agent import FusedTriageOutput, _with_fallbacks
+
+
+CONTEXT = {"title": "Website is down", "body": "Customer cannot access dashboard", "tags": [], "product_area": ""}
+CANDIDATES = [
+    {"user_id": "devops_team", "name": "DevOps Team", "skills": ["server down"], "score": 10.0},
+    {"user_id": "customer_support", "name": "Customer Support", "skills": ["support"], "score": 0.0},
+]
+
+
+def test_fused_output_keeps_valid_fields():
+    output = FusedTriageOutput.model_validate(
+        {
+            "priority": "P0",
+            "confidence": 0.93,
+            "assignee_user_id": "devops_team",
+            "priority_rationale": "Outage",
+            "assignee_rationale": "Infra",
+            "reply_draft": "We are on it."
+        },
+        context={"candidate_ids": ["devops_team", "customer_support"]}
+    )
+    result = _with_fallbacks(output, CONTEXT, CANDIDATES)
+
+    assert result["priority"] == {"priority": "P0", "confidence": 0.93}
+    assert result["assignee"] == {"assignee_user_id": "devops_team"}
+    assert result["rationale"] == {"priority_rationale": "Outage", "assignee_rationale": "Infra"}
+    assert result["reply"] == "We are on it."
+
+
+def test_fused_output_falls_back_per_field():
+    """Invalid fields fall back to the agents' heuristics; valid ones are kept."""
+    output = FusedTriageOutput.model_validate(
+        {
+            "priority": "urgent",
+            "confidence": 7,
+            "assignee_user_id": "made_up_team",
+            "priority_rationale": "",
+            "assignee_rationale": "Infra",
+            "reply_draft": "word " * 200
+        },
+        context={"candidate_ids": ["devops_team", "customer_support"]}
+    )
+    result = _with_fallbacks(output, CONTEXT, CANDIDATES)
+
+    assert result["priority"] == {"priority": "P3", "confidence": 0.5}
+    assert result["assignee"] == {"assignee_user_id": "devops_team"}
+    assert result["rationale"]["priority_rationale"].startswith("Low priority")
+    assert result["rationale"]["assignee_rationale"] == "Infra"
+    assert len(result["reply"].split()) == 120
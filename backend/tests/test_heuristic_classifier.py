@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+import triage.graph as graph_module
+from triage.graph import create_triage_graph
+from triage.skill_matcher import SkillMatcher
+from triage.agents import heuristic_classifier as classifier_module
+from triage.agents.heuristic_classifier import (
+    MAX_CONFIDENCE,
+    TRIAGE_HEURISTIC_THRESHOLD,
+    classify_assignee,
+    classify_priority
+)
+from calibrate_heuristics import calibrate
+
+
+# The old default; deployments opt in by lowering TRIAGE_HEURISTIC_THRESHOLD to about this
+OPT_IN_THRESHOLD = 0.85
+
+
+TEAMS = [
+    {"user_id": "infra", "name": "Infra", "skills": ["database", "outage", "server"]},
+    {"user_id": "billing", "name": "Billing", "skills": ["invoice", "refund"]},
+]
+
+
+class FakeRoster:
+    async def get_matcher(self):
+        return SkillMatcher(TEAMS)
+
+
+def test_obvious_outage_is_confident_p0():
+    priority, confidence, matched = classify_priority(
+        {"title": "Production outage", "body": "The server is down for all customers"}
+    )
+    assert priority == "P0"
+    assert confidence >= OPT_IN_THRESHOLD
+    assert matched == ["down", "outage"]
+
+
+def test_shortcut_is_off_by_default():
+    assert TRIAGE_HEURISTIC_THRESHOLD > MAX_CONFIDENCE
+
+
+@pytest.mark.parametrize("title", [
+    "Typo issue on the pricing page",
+    "Broken image on FAQ page",
+    "Urgent: please update my email address"
+])
+def test_one_keyword_never_decides_p0_or_p1(title):
+    priority, confidence, matched = classify_priority({"title": title, "body": ""})
+    assert priority in ("P0", "P1") and len(matched) == 1
+    assert confidence < OPT_IN_THRESHOLD
+
+
+def test_calibration_replaces_guessed_confidences():
+    outage = {"title": "Production outage", "body": "The server is down"}
+    examples = [(outage, "P0")] * 27 + [(outage, "P1")] * 3 + [({"title": "Invoice", "body": ""}, "P3")] * 5
+    buckets = calibrate(examples, min_samples=10)
+
+    assert buckets["P0:2"] == {"samples": 30, "precision": 0.9}
+    # Too little history: never confident
+    assert buckets["P2:1"] == {"samples": 5, "precision": 0.0}
+
+    calibration = {key: bucket["precision"] for key, bucket in buckets.items()}
+    assert classify_priority(outage, calibration)[1] == 0.9
+    assert classify_priority({"title": "Invoice", "body": ""}, calibration)[1] == 0.0
+    # Buckets the history never saw are not confident either
+    assert classify_priority({"title": "Error", "body": "a bug"}, calibration)[1] == 0.0
+
+
+def test_conflicting_keywords_fall_below_threshold():
+    # Billing words plus a generic error: ambiguous, so the LLM decides
+    priority, confidence, _ = classify_priority({"title": "Invoice error", "body": "Refund shows a problem"})
+    assert priority == "P1"
+    assert confidence < TRIAGE_HEURISTIC_THRESHOLD
+
+
+def test_keywords_match_whole_words_only():
+    assert classify_priority({"title": "Dropdown label typo", "body": "Minor cosmetic thing"}) == (None, 0.0, [])
+
+
+def test_assignee_needs_a_clear_lead():
+    assert classify_assignee([]) == (None, 0.0)
+    assert classify_assignee([{"user_id": "a", "score": 30.0}, {"user_id": "b", "score": 0.0}]) == ("a", 0.95)
+    _, tied = classify_assignee([{"user_id": "a", "score": 20.0}, {"user_id": "b", "score": 20.0}])
+    assert tied == 0.0
+
+
+def test_confident_ticket_skips_priority_and_assignee_agents(monkeypatch):
+    called = []
+    monkeypatch.setattr(classifier_module, "TRIAGE_HEURISTIC_THRESHOLD", OPT_IN_THRESHOLD)
+    monkeypatch.setattr(classifier_module, "TRIAGE_HEURISTIC_ASSIGNEE_THRESHOLD", OPT_IN_THRESHOLD)
+
+    async def llm_node(state):
+        called.append("llm")
+        return {"error": "LLM agent should have been skipped"}
+
+    monkeypatch.setattr(classifier_module, "roster", FakeRoster())
+    monkeypatch.setattr(graph_module, "context_detailer", lambda state: {"context": {
+        "title": "Database outage", "body": "The server is down and we see an outage on the database", "tags": []
+    }})
+    monkeypatch.setattr(graph_module, "priority_agent", llm_node)
+    monkeypatch.setattr(graph_module, "assignee_agent", llm_node)
+    monkeypatch.setattr(graph_module, "rationale_agent", lambda state: {"rationale": {}})
+    monkeypatch.setattr(graph_module, "reply_agent", lambda state: {"reply": "hi"})
+    monkeypatch.setattr(graph_module, "persist_node", lambda state: {"error": None})
+
+    final_state = asyncio.run(create_triage_graph().ainvoke({"ticket": {"_id": "t1"}}))
+
+    assert called == []
+    assert final_state["priority"]["priority"] == "P0"
+    assert final_state["assignee"] == {"assignee_user_id": "infra"}
+    assert final_state["heuristic"]["skipped"] == ["priority", "assignee"]
+
+
+def test_priority_opt_in_leaves_the_assignee_shortcut_off(monkeypatch):
+    monkeypatch.setattr(classifier_module, "TRIAGE_HEURISTIC_THRESHOLD", OPT_IN_THRESHOLD)
+    monkeypatch.setattr(classifier_module, "roster", FakeRoster())
+    state = {"context": {"title": "Database outage", "body": "The server is down and we see an outage on the database"}}
+
+    update = asyncio.run(classifier_module.heuristic_classifier(state))
+
+    assert update["priority"]["priority"] == "P0"
+    assert "assignee" not in update
+    assert update["heuristic"]["assignee_confidence"] >= OPT_IN_THRESHOLD
+    assert update["heuristic"]["skipped"] == ["priority"]
@@ -0,0 +1,287 @@
+import asyncio
+from datetime import timedelta
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from pymongo.results import UpdateResult
+import indexes
+from database import db
+from models import get_ist_now
+
+
+class FakeCollection:
+    """Collection stand-in for the index and migration bookkeeping calls."""
+
+    def __init__(self):
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+        self.docs = {}
+        self.created = []
+        self.dropped = []
+
+    async def index_information(self):
+        return {name: dict(info) for name, info in self.indexes.items()}
+
+    async def create_indexes(self, models):
+        for model in models:
+            spec = dict(model.document)
+            name = spec.pop("name")
+            spec["key"] = list(spec["key"].items())
+            self.indexes[name] = spec
+            self.created.append(name)
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+        self.dropped.append(name)
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate _id")
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def find_one_and_update(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if doc is None or not _matches(doc, query):
+            return None
+        before = dict(doc)
+        doc.update(update["$set"])
+        return before
+
+    async def update_one(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if doc is None or not _matches(doc, query):
+            return UpdateResult({"n": 0, "nModified": 0}, True)
+        doc.update(update.get("$set", {}))
+        for field in update.get("$unset", {}):
+            doc.pop(field, None)
+        return UpdateResult({"n": 1, "nModified": 1}, True)
+
+
+def _matches(doc, query):
+    """Equality, $lte, $exists and $or - the operators the migration claims use."""
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(_matches(doc, option) for option in condition):
+                return False
+        elif isinstance(condition, dict):
+            if "$exists" in condition and (field in doc) != condition["$exists"]:
+                return False
+            if "$lte" in condition and (doc.get(field) is None or doc[field] > condition["$lte"]):
+                return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+def _index_keys(collection):
+    return [list(model.document["key"].items()) for model in indexes.INDEXES[collection]]
+
+
+def test_registry_names_are_unique_and_cover_hot_queries():
+    for collection, models in indexes.INDEXES.items():
+        names = [model.document["name"] for model in models]
+        assert len(names) == len(set(names)), collection
+
+    # Equality field first, then the sort field, so the index also returns the order
+    assert [("ticket_id", 1), ("created_at", 1)] in _index_keys("comments")
+    assert [("ticket_id", 1)] in _index_keys("attachments")
+    assert [("ticket_id", 1), ("created_at", -1)] in _index_keys("triage_results")
+    assert [("ticket_id", 1), ("timestamp", -1)] in _index_keys("activity_logs")
+    assert [("created_at", -1), ("_id", -1)] in _index_keys("tickets")
+    assert [("dedup_bands", 1), ("updated_at", -1)] in _index_keys("tickets")
+    assert [("ticket_id", 1), ("first_at", -1), ("_id", -1)] in _index_keys("ticket_activities")
+
+
+def test_apply_indexes_is_idempotent_and_rebuilds_changed_options():
+    fake_db = FakeDatabase()
+
+    first = asyncio.run(indexes.apply_indexes(fake_db))
+    assert set(first) == set(indexes.INDEXES)
+    assert asyncio.run(indexes.apply_indexes(fake_db)) == {}
+    assert asyncio.run(indexes.missing_indexes(fake_db)) == {}
+
+    # An index created by hand without the TTL option is replaced
+    fake_db["llm_cache"].indexes["expires_at_1"].pop("expireAfterSeconds")
+    assert asyncio.run(indexes.missing_indexes(fake_db)) == {"llm_cache": ["expires_at_1"]}
+    assert asyncio.run(indexes.apply_indexes(fake_db)) == {"llm_cache": ["expires_at_1"]}
+    assert fake_db["llm_cache"].dropped == ["expires_at_1"]
+    assert fake_db["llm_cache"].indexes["expires_at_1"]["expireAfterSeconds"] == 0
+
+
+def test_migrations_run_once_and_retry_after_failure(monkeypatch):
+    fake_db = FakeDatabase()
+    calls = []
+
+    async def step(database):
+        calls.append("step")
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(indexes, "MIGRATIONS", [(1, "test step", step)])
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(indexes.run_migrations(fake_db))
+    assert fake_db["schema_migrations"].docs[1]["status"] == "failed"
+
+    assert asyncio.run(indexes.run_migrations(fake_db)) == [1]
+    assert asyncio.run(indexes.run_migrations(fake_db)) == []
+    record = fake_db["schema_migrations"].docs[1]
+    assert record["status"] == "applied" and "error" not in record
+    assert calls == ["step", "step"]
+
+
+def test_migrations_take_over_expired_leases_only(monkeypatch):
+    fake_db = FakeDatabase()
+    calls = []
+
+    async def step(database):
+        calls.append("step")
+
+    monkeypatch.setattr(indexes, "MIGRATIONS", [(1, "first", step), (2, "second", step)])
+    records = fake_db["schema_migrations"].docs
+    now = get_ist_now()
+
+    # Another live process holds version 1: nothing runs, not even version 2
+    records[1] = {"_id": 1, "status": "running", "lease_owner": "other", "started_at": now,
+                  "lease_expires_at": now + timedelta(minutes=5)}
+    assert asyncio.run(indexes.run_migrations(fake_db)) == []
+    assert calls == [] and 2 not in records
+
+    # Its process died: the expired lease is taken over and both versions run
+    records[1]["lease_expires_at"] = now - timedelta(seconds=1)
+    assert asyncio.run(indexes.run_migrations(fake_db)) == [1, 2]
+    assert calls == ["step", "step"]
+    assert records[1]["status"] == "applied" and records[1]["lease_owner"] != "other"
+    assert records[1]["lease_expires_at"] is None
+
+    # Claimed before leases were recorded and stuck since
+    records[1] = {"_id": 1, "status": "running", "started_at": now - timedelta(hours=1)}
+    assert asyncio.run(indexes.run_migrations(fake_db)) == [1]
+
+
+def _plan_stages(node, found=None):
+    """Every (stage, indexName) in the winning plans of an explain document."""
+    found = [] if found is None else found
+    if isinstance(node, dict):
+        if "stage" in node:
+            found.append((node["stage"], node.get("indexName")))
+        for key, value in node.items():
+            if key != "rejectedPlans":
+                _plan_stages(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _plan_stages(value, found)
+    return found
+
+
+def _assert_index_scan(explain, index_name):
+    stages = _plan_stages(explain)
+    assert ("IXSCAN", index_name) in stages, stages
+    assert "COLLSCAN" not in [stage for stage, _ in stages], stages
+
+
+def test_hot_queries_use_index_scans():
+    """Needs MongoDB (MONGODB_URL); uses a scratch database that is dropped afterwards."""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    async def scenario():
+        client = AsyncIOMotorClient(db.settings.url, serverSelectionTimeoutMS=2000)
+        try:
+            await client.admin.command("ping")
+        except Exception as e:
+            client.close()
+            pytest.skip(f"MongoDB not available: {e}")
+
+        scratch = client[f"{db.settings.database_name}_index_test"]
+        try:
+            await indexes.apply_indexes(scratch)
+            now = get_ist_now()
+            ticket_ids = [str(ObjectId()) for _ in range(20)]
+            await scratch["tickets"].insert_many([
+                # Varied values so the compound indexes are clearly more selective than created_at_-1
+                {"status": ["open", "in_progress", "resolved"][i % 3], "priority": f"P{i % 4}",
+                 "assignee_user_id": ["devops", "legal"][i % 2],
+                 "created_at": now - timedelta(minutes=i), "updated_at": now - timedelta(minutes=i),
+                 "dedup_bands": [f"{i % 16}:abc"]}
+                for i in range(20)
+            ])
+            await scratch["comments"].insert_many([
+                {"ticket_id": ticket_id, "body": "hi", "created_at": now - timedelta(minutes=i)}
+                for ticket_id in ticket_ids for i in range(3)
+            ])
+            await scratch["attachments"].insert_many([{"ticket_id": t, "filename": "a.log"} for t in ticket_ids])
+            await scratch["triage_results"].insert_many([{"ticket_id": t, "created_at": now} for t in ticket_ids])
+            await scratch["triage_jobs"].insert_many([
+                {"status": "queued", "available_at": now, "lease_expires_at": None} for _ in range(5)
+            ])
+
+            # ContextDetailer
+            _assert_index_scan(
+                await scratch["comments"].find({"ticket_id": ticket_ids[0]}).sort("created_at", 1).limit(10).explain(),
+                "ticket_id_1_created_at_1"
+            )
+            _assert_index_scan(
+                await scratch["attachments"].find({"ticket_id": ticket_ids[0]}).limit(5).explain(),
+                "ticket_id_1"
+            )
+            _assert_index_scan(
+                await scratch.command("aggregate", "comments", explain=True, pipeline=[
+                    {"$match": {"ticket_id": {"$in": ticket_ids[:5]}}},
+                    {"$sort": {"ticket_id": 1, "created_at": 1}},
+                    {"$group": {"_id": "$ticket_id", "docs": {"$firstN": {"n": 10, "input": {"text": "$text"}}}}}
+                ]),
+                "ticket_id_1_created_at_1"
+            )
+            # GET /tickets pages and its filters
+            page = [("created_at", -1), ("_id", -1)]
+            _assert_index_scan(await scratch["tickets"].find().sort(page).limit(51).explain(), "created_at_-1__id_-1")
+            last = await scratch["tickets"].find_one(sort=page)
+            _assert_index_scan(
+                await scratch["tickets"].find({"$or": [
+                    {"created_at": {"$lt": last["created_at"]}},
+                    {"created_at": last["created_at"], "_id": {"$lt": last["_id"]}}
+                ]}).sort(page).limit(51).explain(),
+                "created_at_-1__id_-1"
+            )
+            _assert_index_scan(
+                await scratch["tickets"].find({"status": "open", "priority": "P2"}).sort(page).explain(),
+                "status_1_priority_1_created_at_-1__id_-1"
+            )
+            _assert_index_scan(
+                await scratch["tickets"].find({"assignee_user_id": "devops", "status": "open"}).sort(page).explain(),
+                "assignee_user_id_1_status_1_created_at_-1__id_-1"
+            )
+            # Near-duplicate lookup
+            _assert_index_scan(
+                await scratch["tickets"].find(
+                    {"dedup_bands": {"$in": ["1:abc", "2:abc"]}, "updated_at": {"$gte": now - timedelta(hours=1)}}
+                ).sort("updated_at", -1).limit(50).explain(),
+                "dedup_bands_1_updated_at_-1"
+            )
+            _assert_index_scan(
+                await scratch["triage_results"].find(
+                    {"ticket_id": {"$in": ticket_ids[:3]}, "created_at": {"$gte": now - timedelta(hours=1)}}
+                ).sort("created_at", -1).explain(),
+                "ticket_id_1_created_at_-1"
+            )
+            # Job queue claim
+            claim = await scratch["triage_jobs"].find({"$or": [
+                {"status": "queued", "available_at": {"$lte": now}},
+                {"status": "running", "lease_expires_at": {"$lte": now}}
+            ]}).sort("available_at", 1).explain()
+            stages = _plan_stages(claim)
+            assert ("IXSCAN", "status_1_available_at_1") in stages, stages
+            assert "COLLSCAN" not in [stage for stage, _ in stages], stages
+        finally:
+            await client.drop_database(scratch.name)
+            client.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+from triage.llm_cache import LLMCache, make_cache_key
+from triage.agents import priority_agent as priority_module
+
+
+class FakeLLM:
+    """Chat model stand-in that counts calls."""
+    model = "fake-model"
+
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return SimpleNamespace(content=self.content)
+
+
+def test_cache_key_ignores_whitespace_but_not_content():
+    key = make_cache_key("priority", "m", "1", {"title": "Site  down", "tags": ["a"]})
+    assert key == make_cache_key("priority", "m", "1", {"title": " Site down\n", "tags": ["a"]})
+    assert key != make_cache_key("priority", "m", "2", {"title": "Site down", "tags": ["a"]})
+    assert key != make_cache_key("reply", "m", "1", {"title": "Site down", "tags": ["a"]})
+
+
+def test_cache_lru_eviction_ttl_and_bypass():
+    async def scenario():
+        cache = LLMCache(max_entries=2, ttl_seconds=60)
+        cache.persist = False
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        assert await cache.get("a") == 1  # "a" is now most recently used
+        await cache.set("c", 3)           # evicts "b"
+        assert await cache.get("b") is None
+        assert await cache.get("a", bypass=True) is None
+
+        expired = LLMCache(max_entries=2, ttl_seconds=-1)
+        expired.persist = False
+        await expired.set("a", 1)
+        assert await expired.get("a") is None
+        return cache.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["bypassed"] == 1
+    assert stats["evictions"] == 1
+
+
+def test_priority_agent_reuses_cached_result(monkeypatch):
+    fake = FakeLLM('{"priority": "P1", "confidence": 0.8}')
+    cache = LLMCache(max_entries=10, ttl_seconds=60)
+    cache.persist = False
+    monkeypatch.setattr(priority_module, "get_llm", lambda agent: fake)
+    monkeypatch.setattr(priority_module, "llm_cache", cache)
+
+    state = {"context": {"title": "Checkout broken", "body": "Cannot pay", "tags": []}}
+
+    async def scenario():
+        first = await priority_module.priority_agent(state)
+        second = await priority_module.priority_agent(state)
+        bypassed = await priority_module.priority_agent({**state, "bypass_cache": True})
+        return first, second, bypassed
+
+    first, second, bypassed = asyncio.run(scenario())
+    assert first == second == bypassed == {"priority": {"priority": "P1", "confidence": 0.8}}
+    assert fake.calls == 2
@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+from triage.llm_governor import LLMGovernor
+import triage.llm_governor as governor_module
+
+
+class ResourceExhausted(Exception):
+    """Same name as google.api_core's 429 exception."""
+
+
+def test_queued_calls_run_by_lane_priority():
+    governor = LLMGovernor(initial_concurrency=1, max_concurrency=1)
+    order = []
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def blocker():
+            await gate.wait()
+            return "done"
+
+        first = asyncio.create_task(governor.call("reply", blocker))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(governor.call(lane, lambda lane=lane: _record(order, lane)))
+            for lane in ("reply", "rationale", "priority")
+        ]
+        await asyncio.sleep(0.01)
+        gate.set()
+        await asyncio.gather(first, *queued)
+
+    asyncio.run(scenario())
+    assert order == ["priority", "reply", "rationale"]
+    stats = governor.stats()
+    assert stats["lanes"]["priority"]["calls"] == 1
+    assert stats["in_flight"] == 0
+
+
+async def _record(order, lane):
+    order.append(lane)
+    return SimpleNamespace(content=lane)
+
+
+def test_rate_limit_halves_concurrency_and_retries(monkeypatch):
+    monkeypatch.setattr(governor_module, "LLM_RETRY_BACKOFF_SECONDS", 0.0)
+    governor = LLMGovernor(initial_concurrency=8, max_concurrency=8)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ResourceExhausted("429 Resource has been exhausted")
+        return SimpleNamespace(content="ok")
+
+    result = asyncio.run(governor.call("priority", flaky))
+
+    assert result.content == "ok"
+    assert len(attempts) == 2
+    stats = governor.stats()
+    assert stats["throttled"] == 1
+    assert 4 <= stats["concurrency_limit"] < 5  # halved, then one additive step
+    assert stats["lanes"]["priority"]["retries"] == 1
+
+
+def test_non_overload_errors_are_not_retried():
+    governor = LLMGovernor()
+    attempts = []
+
+    async def broken():
+        attempts.append(1)
+        raise ValueError("bad prompt")
+
+    try:
+        asyncio.run(governor.call("rationale", broken))
+    except ValueError:
+        pass
+    assert len(attempts) == 1
+    assert governor.stats()["lanes"]["rationale"]["failures"] == 1
+    assert governor.in_flight == 0
+
+
+def test_cancelled_calls_release_their_slots():
+    governor = LLMGovernor(initial_concurrency=2, max_concurrency=2)
+
+    async def scenario():
+        async def hang():
+            await asyncio.Event().wait()
+
+        calls = [asyncio.create_task(governor.call("reply", hang)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        assert governor.in_flight == 2
+        tokens_while_running = governor.tokens.tokens
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+
+        assert governor.in_flight == 0
+        assert governor.tokens.tokens > tokens_while_running
+        return await asyncio.wait_for(governor.call("priority", lambda: _record([], "priority")), timeout=1)
+
+    result = asyncio.run(scenario())
+    assert result.content == "priority"
+    assert governor.stats()["in_flight"] == 0
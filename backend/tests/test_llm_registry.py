@@ -0,0 +1,52 @@
+import asyncio
+from triage.llm_registry import LLMRegistry, StubChatModel, agent_config
+from triage.agents.priority_agent import _gemini_priority
+from triage.agents.assignee_agent import _gemini_assignee
+from triage.agents.rationale_agent import _gemini_rationale
+from triage.agents.reply_agent import _gemini_reply
+
+
+CONTEXT = {"title": "Website is down", "body": "Customer cannot access dashboard", "tags": [], "product_area": ""}
+
+
+def test_agent_config_falls_back_to_global_settings(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL", "gemini-2.5-flash")
+    monkeypatch.setenv("LLM_REPLY_MODEL", "gemini-2.5-flash-lite")
+    monkeypatch.setenv("LLM_REPLY_MAX_OUTPUT_TOKENS", "256")
+
+    assert agent_config("reply") == {"model": "gemini-2.5-flash-lite", "temperature": 0.2, "max_output_tokens": 256}
+    assert agent_config("priority") == {"model": "gemini-2.5-flash", "temperature": 0.2, "max_output_tokens": None}
+
+
+def test_registry_shares_one_client_per_model(monkeypatch):
+    monkeypatch.setenv("LLM_REPLY_MODEL", "other-model")
+    registry = LLMRegistry(provider="stub")
+
+    assert registry.get("priority") is registry.get("priority")
+    assert registry.get("priority") is registry.get("assignee")
+    assert registry.get("reply") is not registry.get("priority")
+    assert len(registry._clients) == 2
+
+
+def test_stub_provider_answers_every_agent_prompt():
+    """The stub returns output each agent can parse, without network calls."""
+    stub = StubChatModel(latency_ms=1)
+    candidates = [
+        {"user_id": "devops_team", "name": "DevOps Team", "skills": ["server down"], "score": 10.0},
+        {"user_id": "customer_support", "name": "Customer Support", "skills": ["support"], "score": 0.0},
+    ]
+
+    async def scenario():
+        priority = await _gemini_priority(stub, CONTEXT, bypass_cache=True)
+        assignee = await _gemini_assignee(stub, CONTEXT, priority, candidates, bypass_cache=True)
+        rationale = await _gemini_rationale(stub, CONTEXT, priority, assignee, "DevOps Team", [], bypass_cache=True)
+        reply = await _gemini_reply(stub, CONTEXT, priority, assignee, bypass_cache=True)
+        return priority, assignee, rationale, reply
+
+    priority, assignee, rationale, reply = asyncio.run(scenario())
+    assert priority["priority"] in ["P0", "P1", "P2", "P3"]
+    assert assignee == {"assignee_user_id": "devops_team"}
+    assert rationale["priority_rationale"].startswith("Stub rationale")
+    assert reply.startswith("Hello") and priority["priority"] in reply
+    # Deterministic: the same prompt gets the same answer
+    assert asyncio.run(_gemini_priority(stub, CONTEXT, bypass_cache=True)) == priority
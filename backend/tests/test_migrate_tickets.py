@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timezone
+from bson import ObjectId
+from database import IST
+from migrate_tickets import migrate_collection, normalise_bucket, normalise_ticket
+
+
+def test_legacy_ticket_is_rewritten_to_canonical_shape():
+    update = normalise_ticket({
+        "_id": ObjectId(),
+        "title": "Old ticket",
+        "body": "Text in the old field",
+        "description": "",
+        "created_at": "2024-06-01T09:30:00",
+        "updated_at": datetime(2024, 6, 1, 4, 0, tzinfo=timezone.utc),
+        "ai_rationale": {"priority_rationale": "outage", "assignee_rationale": "servers"},
+        "activities": [{"timestamp": "2024-06-01T04:00:00Z", "action": "created"}]
+    })
+
+    assert update["$set"] == {
+        "created_at": datetime(2024, 6, 1, 9, 30, tzinfo=IST),
+        "activities": [{"timestamp": datetime(2024, 6, 1, 4, 0, tzinfo=timezone.utc), "action": "created"}],
+        "ai_rationale": "outage | servers",
+        "description": "Text in the old field"
+    }
+    assert update["$unset"] == {"body": ""}
+
+
+def test_canonical_documents_are_left_alone():
+    now = datetime(2024, 6, 1, 9, 30, tzinfo=IST)
+    assert normalise_ticket({
+        "_id": ObjectId(), "description": "d", "created_at": now, "updated_at": now,
+        "ai_rationale": "ok", "activities": [{"timestamp": now, "action": "created"}]
+    }) is None
+    assert normalise_bucket({"activities": [{"timestamp": now}]}) is None
+    assert normalise_bucket({"activities": [{"timestamp": "2024-06-01T09:30:00"}]})["$set"]["first_at"] == now
+
+
+class FakeCollection:
+    """Just enough of a collection for migrate_collection (filters on _id only)."""
+
+    def __init__(self, documents=(), fail_after=None):
+        self.documents = {d["_id"]: d for d in documents}
+        self.fail_after = fail_after
+        self.bulk_writes = 0
+
+    def find(self, query):
+        after = query.get("_id", {}).get("$gt")
+        matching = sorted((d for i, d in self.documents.items() if after is None or i > after), key=lambda d: d["_id"])
+
+        class Cursor:
+            def sort(self, *args):
+                return self
+
+            def limit(self, n):
+                self.n = n
+                return self
+
+            async def to_list(self, length):
+                return matching[:self.n]
+        return Cursor()
+
+    async def bulk_write(self, requests, ordered=True):
+        if self.fail_after is not None and self.bulk_writes >= self.fail_after:
+            raise ConnectionError("interrupted")
+        self.bulk_writes += 1
+        for request in requests:
+            self.documents[request._filter["_id"]].update(request._doc["$set"])
+
+    async def find_one(self, query):
+        return self.documents.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        self.documents.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+
+def _db(tickets):
+    return {"tickets": tickets, "migration_checkpoints": FakeCollection()}
+
+
+def test_interrupted_migration_resumes_from_checkpoint():
+    legacy = [{"_id": ObjectId(), "created_at": "2024-06-01T09:30:00"} for _ in range(5)]
+    tickets = FakeCollection(legacy, fail_after=1)
+    db = _db(tickets)
+    run = lambda **kwargs: asyncio.run(migrate_collection(db, "tickets", {}, normalise_ticket, 2, restart=False, **kwargs))
+
+    # A dry run writes nothing, not even a checkpoint
+    assert run(dry_run=True) == {"scanned": 5, "updated": 5}
+    assert tickets.bulk_writes == 0 and not db["migration_checkpoints"].documents
+
+    try:
+        run(dry_run=False)
+    except ConnectionError:
+        pass
+    assert db["migration_checkpoints"].documents["tickets"]["last_id"] == legacy[1]["_id"]
+
+    tickets.fail_after = None
+    assert run(dry_run=False) == {"scanned": 5, "updated": 5}
+    assert tickets.bulk_writes == 3
+    assert all(isinstance(t["created_at"], datetime) for t in tickets.documents.values())
+    assert run(dry_run=False) == {"scanned": 0, "updated": 0}
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from bson import ObjectId
+import triage.agents.persist_node as persist_module
+from triage.agents.persist_node import PersistMetrics, persist_node
+
+
+class SlowCollection:
+    """Collection stand-in where every write takes `delay` seconds."""
+
+    def __init__(self, delay=0.05, fail=False, stored=None):
+        self.delay = delay
+        self.fail = fail
+        # Document find_one_and_update returns as it was before the update
+        self.stored = stored
+        self.writes = []
+
+    async def _write(self, kind, doc):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("write failed")
+        self.writes.append((kind, doc))
+
+    async def update_one(self, query, update, session=None):
+        await self._write("update", update)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None, session=None):
+        await self._write("update", update)
+        return {field: value for field, value in self.stored.items() if field == "_id" or field in projection}
+
+    async def insert_one(self, doc, session=None):
+        await self._write("insert", doc)
+
+
+def _setup(monkeypatch, tickets_fail=False, stored_status="open"):
+    stored = {"_id": ObjectId(), "status": stored_status, "title": "Server down", "description": "Prod is down"}
+    collections = {
+        "tickets": SlowCollection(fail=tickets_fail, stored=stored),
+        "triage_results": SlowCollection(),
+        "activity_logs": SlowCollection()
+    }
+    stats_changes = []
+
+    async def record_ticket_change(before, after):
+        await asyncio.sleep(0.05)
+        stats_changes.append((before["status"], after["status"]))
+
+    async def get_team(user_id):
+        return {"user_id": user_id, "name": "DevOps"}
+
+    monkeypatch.setattr(persist_module, "get_tickets_collection", lambda: collections["tickets"])
+    monkeypatch.setattr(persist_module, "get_triage_results_collection", lambda: collections["triage_results"])
+    monkeypatch.setattr(persist_module, "get_activity_logs_collection", lambda: collections["activity_logs"])
+    monkeypatch.setattr(persist_module, "record_ticket_change", record_ticket_change)
+    monkeypatch.setattr(persist_module.roster, "get_team", get_team)
+    monkeypatch.setattr(persist_module, "persist_metrics", PersistMetrics())
+    return collections, stats_changes
+
+
+def _state():
+    return {
+        "ticket": {"_id": ObjectId(), "status": "open", "title": "Server down"},
+        "priority": {"priority": "P1", "confidence": 0.9},
+        "assignee": {"assignee_user_id": "devops"},
+        "rationale": {"priority_rationale": "outage", "assignee_rationale": "servers"},
+        "reply": "On it"
+    }
+
+
+def test_writes_run_concurrently_and_report_timings(monkeypatch):
+    collections, stats_changes = _setup(monkeypatch)
+
+    started = time.perf_counter()
+    result = asyncio.run(persist_node(_state()))
+    elapsed = time.perf_counter() - started
+
+    assert result["error"] is None
+    # Four 50ms writes in about two writes' time: only the stats update waits (for the ticket)
+    assert elapsed < 0.2
+    timings = result["persist_timings"]
+    for write in ("ticket", "triage_result", "activity_log", "stats"):
+        assert timings[f"{write}_ms"] >= 40
+    assert timings["transactional"] is False
+    assert [kind for kind, _ in collections["tickets"].writes] == ["update"]
+    assert collections["tickets"].writes[0][1]["$set"]["assignee"] == "DevOps"
+    assert collections["tickets"].writes[0][1]["$inc"] == {"revision": 1}
+    assert stats_changes == [("open", "triaged")]
+    assert persist_module.persist_metrics.stats()["runs"] == 1
+
+
+def test_stats_move_from_the_stored_ticket(monkeypatch):
+    # Someone started work on the ticket while it was being triaged
+    collections, stats_changes = _setup(monkeypatch, stored_status="in_progress")
+
+    result = asyncio.run(persist_node(_state()))
+
+    assert result["error"] is None
+    assert stats_changes == [("in_progress", "triaged")]
+
+
+def test_failed_write_is_reported(monkeypatch):
+    collections, stats_changes = _setup(monkeypatch, tickets_fail=True)
+
+    result = asyncio.run(persist_node(_state()))
+
+    assert "write failed" in result["error"]
+    # A ticket that was not updated is not counted
+    assert stats_changes == []
+    assert "ticket_ms" in result["persist_timings"]
+    # The failure itself is logged next to the triage_run activity log
+    events = [doc.get("event_type") for _, doc in collections["activity_logs"].writes]
+    assert "triage_failed" in events
+    assert persist_module.persist_metrics.stats()["failures"] == 1
@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+import triage.graph as graph_module
+from triage.llm_cache import LLMCache
+from triage.agents import reply_agent as reply_module
+
+
+class FakeStreamingLLM:
+    """Chat model stand-in that streams a long reply and counts chunks pulled."""
+    model = "fake-model"
+
+    def __init__(self, words: int, words_per_chunk: int = 7):
+        text = " ".join(f"word{i}" for i in range(words))
+        tokens = text.split(" ")
+        self.chunks = [
+            " ".join(tokens[i:i + words_per_chunk]) + " "
+            for i in range(0, len(tokens), words_per_chunk)
+        ]
+        self.pulled = 0
+
+    async def astream(self, prompt):
+        for chunk in self.chunks:
+            self.pulled += 1
+            yield SimpleNamespace(content=chunk)
+
+
+class FailingStreamingLLM(FakeStreamingLLM):
+    """Streams a few chunks, then the connection drops."""
+
+    def __init__(self, chunks_before_failure: int):
+        super().__init__(words=50)
+        self.chunks_before_failure = chunks_before_failure
+
+    async def astream(self, prompt):
+        for chunk in self.chunks[:self.chunks_before_failure]:
+            yield SimpleNamespace(content=chunk)
+        raise ConnectionError("stream reset by peer")
+
+
+def _use_fake(monkeypatch, fake):
+    cache = LLMCache(max_entries=10, ttl_seconds=60)
+    cache.persist = False
+    monkeypatch.setattr(reply_module, "get_llm", lambda agent: fake)
+    monkeypatch.setattr(reply_module, "llm_cache", cache)
+
+
+def test_reply_is_cut_off_while_streaming(monkeypatch):
+    fake = FakeStreamingLLM(words=300)
+    _use_fake(monkeypatch, fake)
+    tokens = []
+
+    state = {"context": {"title": "Checkout broken", "body": "Cannot pay"}, "priority": {"priority": "P1"}}
+    result = asyncio.run(reply_module.reply_agent(state, lambda chunk: tokens.append(chunk["token"])))
+
+    reply = result["reply"]
+    assert len(reply.split()) == 120
+    assert reply.endswith("word119...")
+    assert "".join(tokens) == reply
+    # Generation stopped soon after the limit instead of reading all 43 chunks
+    assert fake.pulled == 18
+    # Stopping early hands the governor slot back
+    assert reply_module.llm_governor.in_flight == 0
+
+
+def test_reply_tokens_reach_engine_stream(monkeypatch):
+    from triage.engine import TriageEngine
+
+    _use_fake(monkeypatch, FakeStreamingLLM(words=30))
+
+    monkeypatch.setattr(graph_module, "context_detailer", lambda state: {"context": {"title": "t", "body": "b"}})
+    monkeypatch.setattr(graph_module, "heuristic_classifier", lambda state: {"heuristic": None})
+    monkeypatch.setattr(graph_module, "priority_agent", lambda state: {"priority": {"priority": "P2"}})
+    monkeypatch.setattr(graph_module, "assignee_agent", lambda state: {"assignee": {"assignee_user_id": "x"}})
+    monkeypatch.setattr(graph_module, "rationale_agent", lambda state: {"rationale": {}})
+    monkeypatch.setattr(graph_module, "persist_node", lambda state: {"error": None})
+
+    async def collect():
+        return [event async for event in TriageEngine().stream({"_id": "t1"}, "multi")]
+
+    events = asyncio.run(collect())
+    kinds = [(event["event"], event.get("node")) for event in events]
+    tokens = [event["token"] for event in events if event["event"] == "token"]
+
+    assert len(tokens) == 5
+    assert kinds.index(("token", "generate_reply")) < kinds.index(("node", "generate_reply"))
+    assert events[-1]["state"]["reply"] == "".join(tokens).strip()
+
+
+def test_failed_stream_replaces_the_partial_draft(monkeypatch):
+    _use_fake(monkeypatch, FailingStreamingLLM(chunks_before_failure=2))
+    chunks = []
+
+    state = {"context": {"title": "Checkout broken", "body": "Cannot pay"}, "priority": {"priority": "P1"}}
+    result = asyncio.run(reply_module.reply_agent(state, chunks.append))
+
+    # Listeners rebuild exactly the reply that is returned and persisted
+    shown = ""
+    for chunk in chunks:
+        shown = chunk["token"] if chunk.get("reset") else shown + chunk["token"]
+    assert chunks[0]["token"].startswith("word0") and chunks[-1]["reset"] is True
+    assert shown == result["reply"] == reply_module._mock_reply({}, {"priority": "P1"}, {})
+    assert reply_module.llm_governor.in_flight == 0
+
+
+def test_failed_stream_before_any_token_sends_the_fallback(monkeypatch):
+    _use_fake(monkeypatch, FailingStreamingLLM(chunks_before_failure=0))
+    chunks = []
+
+    state = {"context": {"title": "Checkout broken", "body": "Cannot pay"}, "priority": {"priority": "P3"}}
+    result = asyncio.run(reply_module.reply_agent(state, chunks.append))
+
+    assert chunks == [{"node": "generate_reply", "token": result["reply"]}]
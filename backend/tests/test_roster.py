@@ -0,0 +1,103 @@
+import asyncio
+import triage.roster as roster_module
+from triage.roster import TeamRoster
+
+
+class FakeUsers:
+    """users collection stand-in that counts full scans."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.scans = 0
+        self.fail = False
+
+    def find(self, query):
+        self.scans += 1
+        if self.fail:
+            raise ConnectionError("mongo down")
+
+        async def cursor():
+            await asyncio.sleep(0.01)
+            for doc in self.docs:
+                yield doc
+        return cursor()
+
+
+def _setup(monkeypatch, version_check_seconds=0.0):
+    users = FakeUsers([
+        {"_id": "devops", "name": "DevOps", "skills": ["server"]},
+        {"_id": "legal", "name": "Legal", "skills": ["ip"]},
+    ])
+    version = {"value": 1}
+
+    async def get_version():
+        return version["value"]
+
+    monkeypatch.setattr(roster_module, "get_users_collection", lambda: users)
+    monkeypatch.setattr(roster_module, "get_roster_version", get_version)
+    monkeypatch.setattr(roster_module, "ROSTER_VERSION_CHECK_SECONDS", version_check_seconds)
+    return users, version
+
+
+def test_lookups_are_served_from_memory(monkeypatch):
+    users, _ = _setup(monkeypatch)
+    roster = TeamRoster()
+
+    async def scenario():
+        assert (await roster.get_team("devops"))["name"] == "DevOps"
+        assert (await roster.get_team("legal"))["skills"] == ["ip"]
+        assert await roster.get_team("nobody") is None
+
+    asyncio.run(scenario())
+    assert users.scans == 1
+    stats = roster.stats()
+    assert (stats["hits"], stats["misses"], stats["reloads"], stats["version"]) == (2, 1, 1, 1)
+
+
+def test_concurrent_callers_share_one_reload(monkeypatch):
+    users, _ = _setup(monkeypatch)
+    roster = TeamRoster()
+
+    async def scenario():
+        await asyncio.gather(*(roster.get_teams() for _ in range(20)))
+
+    asyncio.run(scenario())
+    assert users.scans == 1
+
+
+def test_version_bump_and_invalidate_trigger_reload(monkeypatch):
+    users, version = _setup(monkeypatch, version_check_seconds=0.001)
+    roster = TeamRoster()
+
+    async def scenario():
+        await roster.get_teams()
+        await asyncio.sleep(0.01)
+        await roster.get_teams()
+        assert users.scans == 1  # version unchanged
+
+        users.docs = users.docs[:1]
+        version["value"] = 2
+        await asyncio.sleep(0.01)
+        assert [t["user_id"] for t in await roster.get_teams()] == ["devops"]
+        assert users.scans == 2
+        assert roster.stats()["version_changes"] == 1
+
+        roster.invalidate()
+        await roster.get_teams()
+        assert users.scans == 3
+
+    asyncio.run(scenario())
+
+
+def test_failed_reload_keeps_serving_cached_teams(monkeypatch):
+    users, _ = _setup(monkeypatch)
+    roster = TeamRoster()
+
+    async def scenario():
+        await roster.get_teams()
+        users.fail = True
+        roster.invalidate()
+        assert await roster.get_team("legal") is not None
+
+    asyncio.run(scenario())
+    assert roster.stats()["reload_errors"] == 1
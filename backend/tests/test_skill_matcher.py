@@ -0,0 +1,82 @@
+import asyncio
+from triage.roster import TeamRoster
+from triage.skill_matcher import SkillMatcher
+
+
+TEAMS = [
+    {"user_id": "legal", "name": "Legal", "skills": ["ip", "trademark", "terms of service"]},
+    {"user_id": "devops", "name": "DevOps", "skills": ["ci/cd", "server", "deployment"]},
+    {"user_id": "billing", "name": "Billing", "skills": ["invoice", "refund"]},
+]
+
+
+def _scores(scored):
+    return {team["user_id"]: team["score"] for team in scored}
+
+
+def test_skills_match_whole_words_and_phrases():
+    matcher = SkillMatcher(TEAMS)
+
+    # "ip" must not match inside "ship"/"shipping"; "service" alone is not "terms of service"
+    scored = matcher.score({"title": "Shipping label", "body": "Our service is slow", "tags": []})
+    assert _scores(scored) == {"legal": 0.0, "devops": 0.0, "billing": 0.0}
+
+    scored = matcher.score({"title": "IP question", "body": "Does the Terms of Service cover it?"})
+    assert scored[0]["user_id"] == "legal"
+    assert scored[0]["score"] == 20.0
+
+
+def test_plurals_and_punctuated_skills_match():
+    scored = SkillMatcher(TEAMS).score({"title": "Invoices missing", "body": "CI/CD deployments and servers fail"})
+    assert _scores(scored) == {"devops": 30.0, "billing": 10.0, "legal": 0.0}
+    assert [team["user_id"] for team in scored] == ["devops", "billing", "legal"]
+
+
+def test_limit_pads_with_unmatched_teams_in_roster_order():
+    matcher = SkillMatcher(TEAMS)
+    scored = matcher.score({"title": "refund please"}, limit=2)
+    assert [(t["user_id"], t["score"]) for t in scored] == [("billing", 10.0), ("legal", 0.0)]
+    # Scoring returns copies; the roster's team dicts are not modified
+    assert "score" not in TEAMS[2]
+
+
+class FakeUsers:
+    """Minimal users collection: find() yields the current documents."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query):
+        async def cursor():
+            for doc in self.docs:
+                yield doc
+        return cursor()
+
+
+async def _version_zero():
+    return 0
+
+
+def test_roster_rebuilds_matcher_only_when_teams_change(monkeypatch):
+    import triage.roster as roster_module
+
+    users = FakeUsers([{"_id": t["user_id"], "name": t["name"], "skills": t["skills"]} for t in TEAMS])
+    monkeypatch.setattr(roster_module, "get_users_collection", lambda: users)
+    monkeypatch.setattr(roster_module, "get_roster_version", _version_zero)
+    roster = TeamRoster()
+
+    async def scenario():
+        first = await roster.get_matcher()
+        assert await roster.get_matcher() is first
+
+        # A reload with identical content keeps the matcher
+        await roster.load()
+        assert await roster.get_matcher() is first
+
+        users.docs = users.docs[:1]
+        await roster.load()
+        rebuilt = await roster.get_matcher()
+        assert rebuilt is not first
+        assert [t["user_id"] for t in rebuilt.teams] == ["legal"]
+
+    asyncio.run(scenario())
@@ -35,6 +35,80 @@ def test_list_tickets():
     assert response.status_code == 200
     assert isinstance(response.json(), list)
 
+def test_list_tickets_pages_with_cursor():
+    """Test keyset pagination and filters on the ticket list."""
+    tag = f"smoke-page-{os.getpid()}"
+    created = [
+        client.post("/tickets", json={"title": f"Page {i}", "description": "Paging", "tags": [tag]}).json()["id"]
+        for i in range(3)
+    ]
+    
+    first = client.get("/tickets", params={"tags": tag, "limit": 2})
+    assert first.status_code == 200
+    assert [t["id"] for t in first.json()] == created[::-1][:2]
+    assert "activities" not in first.json()[0]
+    
+    second = client.get("/tickets", params={"tags": tag, "limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [t["id"] for t in second.json()] == created[:1]
+    assert "X-Next-Cursor" not in second.headers
+    
+    assert client.get("/tickets", params={"cursor": "bogus"}).status_code == 400
+
+def test_ticket_stats_follow_writes():
+    """Test that the stats counters move with create, update and delete."""
+    area = f"smoke-stats-{os.getpid()}"
+    ticket_id = client.post("/tickets", json={"title": "Stats", "description": "Count me", "product_area": area}).json()["id"]
+    
+    def count(**filters):
+        response = client.get("/tickets/stats", params={"product_area": area, **filters})
+        assert response.status_code == 200
+        return response.json()["total"]
+    
+    assert count(status="open") == 1
+    client.put(f"/tickets/{ticket_id}", json={"status": "resolved", "priority": "P2"})
+    assert (count(status="open"), count(status="resolved", priority="P2")) == (0, 1)
+    client.delete(f"/tickets/{ticket_id}")
+    assert count() == 0
+
+def test_ticket_activities_are_paged():
+    """Test the bucketed activity history endpoint."""
+    ticket_id = client.post("/tickets", json={"title": "History", "description": "Many edits"}).json()["id"]
+    for i in range(3):
+        client.put(f"/tickets/{ticket_id}", json={"description": f"Edit {i}"})
+    assert client.get(f"/tickets/{ticket_id}").json()["activity_count"] == 4
+    
+    first = client.get(f"/tickets/{ticket_id}/activities", params={"limit": 3})
+    assert first.status_code == 200
+    assert [a["action"] for a in first.json()] == ["updated"] * 3
+    second = client.get(f"/tickets/{ticket_id}/activities", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]})
+    assert [a["action"] for a in second.json()] == ["created"]
+    assert "X-Next-Cursor" not in second.headers
+    
+    client.delete(f"/tickets/{ticket_id}")
+    assert client.get(f"/tickets/{ticket_id}/activities").status_code == 404
+
+def test_conditional_get_returns_304_until_ticket_changes():
+    """Test ETags on the single-ticket and list reads."""
+    tag = f"smoke-etag-{os.getpid()}"
+    ticket_id = client.post("/tickets", json={"title": "ETag", "description": "Cache me", "tags": [tag]}).json()["id"]
+    
+    first = client.get(f"/tickets/{ticket_id}")
+    etag = first.headers["ETag"]
+    assert "no-cache" in first.headers["Cache-Control"]
+    unchanged = client.get(f"/tickets/{ticket_id}", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304 and not unchanged.content
+    
+    page = client.get("/tickets", params={"tags": tag})
+    list_etag = page.headers["ETag"]
+    assert client.get("/tickets", params={"tags": tag}, headers={"If-None-Match": list_etag}).status_code == 304
+    
+    client.put(f"/tickets/{ticket_id}", json={"title": "ETag v2"})
+    changed = client.get(f"/tickets/{ticket_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()["title"] == "ETag v2"
+    assert client.get("/tickets", params={"tags": tag}, headers={"If-None-Match": list_etag}).status_code == 200
+    
+    client.delete(f"/tickets/{ticket_id}")
+
 def test_create_and_triage_ticket():
     """Smoke test: Create a ticket and run triage."""
     # Create ticket
@@ -113,3 +187,86 @@ def test_delete_ticket():
     # Verify ticket is deleted
     get_response = client.get(f"/tickets/{ticket_id}")
     assert get_response.status_code == 404
+
+def test_async_triage_returns_job():
+    """Test queueing triage with ?async=true and reading the job status."""
+    ticket_data = {
+        "title": "Password reset email not arriving",
+        "description": "Customer never receives the reset link",
+        "category": "Account"
+    }
+    create_response = client.post("/tickets", json=ticket_data)
+    ticket_id = create_response.json()["id"]
+    
+    triage_response = client.post(f"/tickets/{ticket_id}/triage?async=true")
+    assert triage_response.status_code == 202
+    accepted = triage_response.json()
+    assert accepted["status"] == "queued"
+    
+    job_response = client.get(accepted["status_url"])
+    assert job_response.status_code == 200
+    job = job_response.json()
+    assert job["ticket_id"] == ticket_id
+    assert job["status"] in ["queued", "running", "succeeded", "failed"]
+    
+    assert client.get("/triage-jobs/000000000000000000000000").status_code == 404
+
+def test_batch_triage():
+    """Test triaging several tickets in one request, with per-ticket errors."""
+    ticket_ids = []
+    for title in ["Payment page times out", "Dark mode request"]:
+        create_response = client.post("/tickets", json={
+            "title": title,
+            "description": "Reported by a customer",
+            "category": "General"
+        })
+        ticket_ids.append(create_response.json()["id"])
+    
+    batch_response = client.post("/tickets/triage:batch", json={
+        "ticket_ids": ticket_ids + ["000000000000000000000000", "not-an-id"]
+    })
+    assert batch_response.status_code == 200
+    batch = batch_response.json()
+    assert batch["total"] == 4
+    assert batch["succeeded"] == 2
+    
+    results = {item["ticket_id"]: item for item in batch["results"]}
+    for ticket_id in ticket_ids:
+        assert results[ticket_id]["result"]["priority"] in ["P0", "P1", "P2", "P3"]
+        assert client.get(f"/tickets/{ticket_id}").json()["priority"] == results[ticket_id]["result"]["priority"]
+    assert results["000000000000000000000000"]["error"] == "Ticket not found"
+    assert results["not-an-id"]["error"] == "Invalid ticket ID format"
+
+def test_team_admin_invalidates_roster():
+    """Test that team writes through /teams are visible to the cached roster right away."""
+    team_id = "smoke_test_team"
+    put_response = client.put(f"/teams/{team_id}", json={"name": "Smoke Team", "skills": ["smoke"]})
+    assert put_response.status_code == 200
+    assert client.get(f"/teams/{team_id}").json()["skills"] == ["smoke"]
+    
+    client.put(f"/teams/{team_id}", json={"name": "Smoke Team", "skills": ["smoke", "fire"]})
+    assert client.get(f"/teams/{team_id}").json()["skills"] == ["smoke", "fire"]
+    
+    assert client.delete(f"/teams/{team_id}").status_code == 204
+    assert client.get(f"/teams/{team_id}").status_code == 404
+    assert client.delete(f"/teams/{team_id}").status_code == 404
+
+def test_duplicate_ticket_reuses_triage():
+    """Test that a near-identical ticket reuses the first ticket's triage and links to it."""
+    ticket_ids = []
+    for title, description in [
+        ("Dashboard down", "The analytics dashboard is down for all users since 10am"),
+        ("Dashboard is down!", "The analytics dashboard is down for all our users since 10 am"),
+    ]:
+        create_response = client.post("/tickets", json={"title": title, "description": description})
+        ticket_ids.append(create_response.json()["id"])
+    
+    first = client.post(f"/tickets/{ticket_ids[0]}/triage").json()
+    second = client.post(f"/tickets/{ticket_ids[1]}/triage").json()
+    assert second["priority"] == first["priority"]
+    assert second["assignee"] == first["assignee"]
+    
+    # Earlier runs may have left a similar ticket, in which case both link to that one
+    original = client.get(f"/tickets/{ticket_ids[0]}").json()
+    duplicate = client.get(f"/tickets/{ticket_ids[1]}").json()
+    assert duplicate["duplicate_of"] == (original["duplicate_of"] or ticket_ids[0])
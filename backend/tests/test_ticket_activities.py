@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+import services.ticket_activities as activities_module
+from services.ticket_activities import bucket_documents, decode_activity_cursor, list_activities
+
+
+START = datetime(2024, 6, 1, 9, 0)
+
+
+def _activities(n):
+    return [
+        {"timestamp": START + timedelta(minutes=i), "action": "updated", "details": f"#{i}", "user": "user"}
+        for i in range(n)
+    ]
+
+
+class FakeBuckets:
+    """ticket_activities stand-in supporting the paging query."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.read = 0
+
+    def find(self, query):
+        def matches(bucket):
+            if bucket["ticket_id"] != query["ticket_id"]:
+                return False
+            if "$or" not in query:
+                return True
+            older, same = query["$or"]
+            return bucket["first_at"] < older["first_at"]["$lt"] or (
+                bucket["first_at"] == same["first_at"] and bucket["_id"] <= same["_id"]["$lte"]
+            )
+
+        fake = self
+
+        class Cursor:
+            def sort(self, keys):
+                ordered = sorted(
+                    (b for b in fake.buckets if matches(b)),
+                    key=lambda b: (b["first_at"], b["_id"]),
+                    reverse=True
+                )
+
+                async def iterate():
+                    for bucket in ordered:
+                        fake.read += 1
+                        yield bucket
+                return iterate()
+        return Cursor()
+
+
+def test_history_is_split_into_fixed_size_buckets(monkeypatch):
+    monkeypatch.setattr(activities_module, "TICKET_ACTIVITY_BUCKET_SIZE", 4)
+    buckets = bucket_documents("t1", _activities(10))
+    assert [b["count"] for b in buckets] == [4, 4, 2]
+    assert buckets[1]["first_at"] == START + timedelta(minutes=4)
+    assert buckets[1]["last_at"] == START + timedelta(minutes=7)
+
+
+def test_pages_walk_buckets_newest_first(monkeypatch):
+    monkeypatch.setattr(activities_module, "TICKET_ACTIVITY_BUCKET_SIZE", 4)
+    buckets = bucket_documents("t1", _activities(10)) + bucket_documents("t2", _activities(3))
+    for bucket in buckets:
+        bucket["_id"] = ObjectId()
+    fake = FakeBuckets(buckets)
+    monkeypatch.setattr(activities_module, "get_ticket_activities_collection", lambda: fake)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = asyncio.run(list_activities("t1", 3, cursor))
+        seen += [a["details"] for a in page]
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == [f"#{i}" for i in range(9, -1, -1)]
+    assert pages == 4
+
+    # A short page stops reading buckets as soon as it is full
+    fake.read = 0
+    page, cursor = asyncio.run(list_activities("t1", 1))
+    assert [a["details"] for a in page] == ["#9"]
+    assert fake.read == 1
+    assert decode_activity_cursor(cursor)[2] == 1
+
+
+def test_malformed_activity_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_activity_cursor("bogus")
@@ -0,0 +1,34 @@
+from datetime import datetime
+from bson import ObjectId
+from database import IST
+from services.ticket_etags import etag_matches, list_etag, not_modified, ticket_etag
+
+
+def test_ticket_etag_follows_revision():
+    ticket = {"_id": ObjectId(), "revision": 3, "updated_at": datetime(2024, 6, 1, 9, 30, tzinfo=IST)}
+    etag = ticket_etag(ticket)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert ticket_etag({**ticket}) == etag
+    assert ticket_etag({**ticket, "revision": 4}) != etag
+    # Tickets written before revisions existed still get a stable tag
+    assert ticket_etag({"_id": ticket["_id"]}) == ticket_etag({"_id": ticket["_id"]})
+
+
+def test_list_etag_depends_on_revision_and_params():
+    params = {"status": "open", "tags": ["vip"], "limit": 50, "cursor": None}
+    assert list_etag(7, params) == list_etag(7, dict(reversed(params.items())))
+    assert list_etag(8, params) != list_etag(7, params)
+    assert list_etag(7, {**params, "status": "closed"}) != list_etag(7, params)
+
+
+def test_if_none_match_comparison():
+    etag = '"abc-1"'
+    assert etag_matches('"abc-1"', etag)
+    assert etag_matches('"old", W/"abc-1"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abc-2"', etag)
+    assert not etag_matches(None, etag)
+
+    response = not_modified(etag)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag and not response.body
@@ -0,0 +1,46 @@
+import json
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from database import IST
+from schemas import TicketResponse
+from services.ticket_json import TICKET_SUMMARY_FIELDS, dumps, ticket_document
+
+
+def _ticket():
+    created = datetime(2024, 6, 1, 9, 30, 15, 123000, tzinfo=IST)
+    return {
+        "_id": ObjectId(),
+        "title": "Checkout fails",
+        "description": "Card declined",
+        "category": "General",
+        "status": "triaged",
+        "priority": "P1",
+        "ai_rationale": "revenue | billing",
+        "ai_confidence": 0.8,
+        "dedup_signature": [1, 2, 3],
+        "created_at": created,
+        "updated_at": created + timedelta(hours=1),
+        "activities": [{"timestamp": created, "action": "created", "details": "Ticket created", "user": "system"}],
+        "activity_count": 1
+    }
+
+
+def test_fast_path_matches_response_model():
+    ticket = _ticket()
+    fast = json.loads(dumps(ticket_document(ticket)))
+
+    expected = TicketResponse(**{**ticket, "id": str(ticket["_id"])})
+    assert fast == json.loads(expected.model_dump_json())
+    assert fast["created_at"] == "2024-06-01T09:30:15.123000+05:30"
+    assert "dedup_signature" not in fast and "_id" not in fast
+
+
+def test_summary_fields_and_naive_datetimes():
+    ticket = _ticket()
+    ticket["created_at"] = datetime(2024, 6, 1, 4, 0)
+    summary = json.loads(dumps(ticket_document(ticket, TICKET_SUMMARY_FIELDS)))
+
+    assert list(summary) == [name for name, _ in TICKET_SUMMARY_FIELDS]
+    assert summary["tags"] == [] and summary["assignee"] is None
+    # Naive values are UTC, as BSON stores them
+    assert datetime.fromisoformat(summary["created_at"]) == datetime(2024, 6, 1, 4, 0, tzinfo=timezone.utc)
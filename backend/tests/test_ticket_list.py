@@ -0,0 +1,40 @@
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from routes.tickets import TICKET_SUMMARY_PROJECTION, build_list_query, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    ticket = {"_id": ObjectId(), "created_at": datetime(2024, 6, 1, 9, 30, 15, 123000)}
+    cursor = encode_cursor(ticket)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (ticket["created_at"], ticket["_id"])
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_cursor({"_id": "x", "created_at": datetime(2024, 1, 1)})])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_list_query_combines_filters_and_keyset():
+    last = {"_id": ObjectId(), "created_at": datetime(2024, 6, 1, 9, 30)}
+    query = build_list_query(
+        status="open", priority="P1", tags=["billing", "vip"], cursor=encode_cursor(last)
+    )
+    assert query == {
+        "status": "open",
+        "priority": "P1",
+        "tags": {"$all": ["billing", "vip"]},
+        "$or": [
+            {"created_at": {"$lt": last["created_at"]}},
+            {"created_at": last["created_at"], "_id": {"$lt": last["_id"]}}
+        ]
+    }
+    assert build_list_query() == {}
+
+
+def test_summary_projection_leaves_out_heavy_fields():
+    for field in ("activities", "ai_reply_draft", "ai_rationale", "dedup_signature", "dedup_bands"):
+        assert field not in TICKET_SUMMARY_PROJECTION
+    assert TICKET_SUMMARY_PROJECTION["created_at"] == 1
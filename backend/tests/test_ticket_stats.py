@@ -0,0 +1,123 @@
+import asyncio
+import services.ticket_stats as stats_module
+from services.ticket_stats import parse_stats_key, stats_delta, stats_key
+
+
+def test_keys_round_trip_awkward_values():
+    ticket = {"status": "open", "priority": None, "assignee_user_id": "team.a|$x", "product_area": "100%"}
+    key = stats_key(ticket)
+    assert "." not in key and "$" not in key
+    assert parse_stats_key(key) == ticket
+
+
+def test_delta_moves_ticket_between_counters():
+    created = {"status": "open", "priority": None, "assignee_user_id": None, "product_area": "billing"}
+    triaged = {**created, "status": "triaged", "priority": "P1", "assignee_user_id": "finance"}
+
+    assert stats_delta([(None, created)]) == {f"counts.{stats_key(created)}": 1}
+    assert stats_delta([(created, triaged)]) == {
+        f"counts.{stats_key(created)}": -1,
+        f"counts.{stats_key(triaged)}": 1
+    }
+    # Edits that leave the counted fields alone are not written at all
+    assert stats_delta([(triaged, {**triaged, "title": "new"})]) == {}
+    assert stats_delta([(None, triaged), (None, triaged), (triaged, None)]) == {f"counts.{stats_key(triaged)}": 1}
+
+
+class FakeStats:
+    def __init__(self, doc):
+        self.doc = doc
+
+    async def find_one(self, query):
+        return self.doc
+
+
+def test_stats_filters_rows_and_skips_empty_counters(monkeypatch):
+    rows = [
+        ({"status": "open", "priority": "P0", "assignee_user_id": "devops", "product_area": None}, 3),
+        ({"status": "open", "priority": "P0", "assignee_user_id": "legal", "product_area": None}, 1),
+        ({"status": "open", "priority": "P2", "assignee_user_id": "devops", "product_area": None}, 5),
+        ({"status": "resolved", "priority": "P0", "assignee_user_id": "devops", "product_area": None}, 0),
+    ]
+    doc = {"_id": "tickets", "counts": {stats_key(row): count for row, count in rows}}
+    monkeypatch.setattr(stats_module, "get_ticket_stats_collection", lambda: FakeStats(doc))
+
+    result = asyncio.run(stats_module.get_ticket_stats(status="open", priority="P0"))
+    assert result["total"] == 4
+    assert [(row["assignee_user_id"], row["count"]) for row in result["rows"]] == [("devops", 3), ("legal", 1)]
+
+    assert asyncio.run(stats_module.get_ticket_stats())["total"] == 9
+
+
+class FlakyStats:
+    def __init__(self, failures):
+        self.failures = failures
+        self.updates = []
+
+    async def update_one(self, query, update, upsert=False):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("primary stepped down")
+        self.updates.append(update)
+
+
+def test_failed_counter_update_is_retried_in_the_background(monkeypatch):
+    created = {"status": "open", "priority": None, "assignee_user_id": None, "product_area": None}
+    key = f"counts.{stats_key(created)}"
+    stats = FlakyStats(failures=3)
+    monkeypatch.setattr(stats_module, "get_ticket_stats_collection", lambda: stats)
+    monkeypatch.setattr(stats_module, "TICKET_STATS_RETRY_SECONDS", 0)
+
+    async def run():
+        # The ticket write already landed: failing here must not fail it
+        await stats_module.record_ticket_change(None, created)
+        await stats_module.record_ticket_change(None, created)
+        assert stats_module.stats_pending()
+        await stats_module._retry_task
+        assert not stats_module.stats_pending()
+
+    asyncio.run(run())
+    # Both writes are counted, in one update once the stats collection is back
+    assert [update["$inc"] for update in stats.updates] == [{key: 2, "revision": 2}]
+
+
+class FakeTickets:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def aggregate(self, pipeline):
+        return self._iterate()
+
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+
+class FakeStatsDoc:
+    def __init__(self, doc):
+        self.doc = doc
+
+    async def find_one(self, query):
+        return self.doc
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.doc = doc
+
+
+def test_rebuild_uses_the_given_database(monkeypatch):
+    def app_database():
+        raise AssertionError("the app database must not be touched")
+
+    monkeypatch.setattr(stats_module, "get_tickets_collection", app_database)
+    monkeypatch.setattr(stats_module, "get_ticket_stats_collection", app_database)
+    open_ticket = {"status": "open", "priority": None, "assignee_user_id": None, "product_area": None}
+    scratch = {
+        "tickets": FakeTickets([{"_id": open_ticket, "count": 4}]),
+        "ticket_stats": FakeStatsDoc({"_id": "tickets", "counts": {stats_key(open_ticket): 3}, "revision": 7})
+    }
+
+    drift = asyncio.run(stats_module.rebuild_ticket_stats(scratch))
+
+    assert drift == {stats_key(open_ticket): -1}
+    assert scratch["ticket_stats"].doc["counts"] == {stats_key(open_ticket): 4}
+    assert scratch["ticket_stats"].doc["revision"] == 8
@@ -0,0 +1,90 @@
+import asyncio
+import time
+import triage.graph as graph_module
+from triage.graph import create_triage_graph
+
+
+def _timed_node(key, value, seconds, calls):
+    """Fake node that sleeps like an LLM/Mongo call and records when it ran."""
+    async def node(state):
+        started = time.perf_counter()
+        await asyncio.sleep(seconds)
+        calls.append((key, started, time.perf_counter()))
+        return {key: value} if key else {"error": None}
+    return node
+
+
+def test_graph_runs_independent_nodes_in_parallel(monkeypatch):
+    """Wall-clock time follows the critical path, not the sum of all nodes."""
+    calls = []
+    monkeypatch.setattr(graph_module, "context_detailer", _timed_node("context", {"title": "t"}, 0.05, calls))
+    monkeypatch.setattr(graph_module, "heuristic_classifier", _timed_node("heuristic", None, 0.0, calls))
+    monkeypatch.setattr(graph_module, "priority_agent", _timed_node("priority", {"priority": "P1"}, 0.1, calls))
+    monkeypatch.setattr(graph_module, "assignee_agent", _timed_node("assignee", {"assignee_user_id": "x"}, 0.1, calls))
+    monkeypatch.setattr(graph_module, "rationale_agent", _timed_node("rationale", {"priority_rationale": "r"}, 0.3, calls))
+    monkeypatch.setattr(graph_module, "reply_agent", _timed_node("reply", "hello", 0.4, calls))
+    monkeypatch.setattr(graph_module, "persist_node", _timed_node(None, None, 0.05, calls))
+
+    graph = create_triage_graph()
+    started = time.perf_counter()
+    final_state = asyncio.run(graph.ainvoke({"ticket": {"_id": "t1"}}))
+    elapsed = time.perf_counter() - started
+
+    # Sum of nodes: 1.0s. Critical path: context + priority + assignee + max(rationale, reply) + persist = 0.7s
+    assert elapsed < 0.85
+    assert final_state["reply"] == "hello"
+    assert final_state["rationale"] == {"priority_rationale": "r"}
+    assert final_state["error"] is None
+
+    # Rationale and reply overlap and persist waits for both
+    spans = {key: (start, end) for key, start, end in calls}
+    assert spans["reply"][0] < spans["rationale"][1]
+    assert spans["rationale"][0] < spans["reply"][1]
+    assert spans[None][0] >= max(spans["reply"][1], spans["rationale"][1])
+
+
+def test_batch_run_uses_prefetched_context_and_skips_persist(monkeypatch):
+    """Batch triage supplies the context and writes results itself."""
+    from triage.engine import TriageEngine
+    from triage.roster import roster
+    from triage.agents import fused_agent as fused_module
+
+    monkeypatch.setattr(fused_module, "get_llm", lambda agent: None)
+    monkeypatch.setattr(roster, "teams", [{"user_id": "devops_team", "name": "DevOps Team", "skills": ["server down"]}])
+    monkeypatch.setattr(roster, "loaded_at", time.monotonic())
+
+    context = {"title": "Server down", "body": "Production server down", "tags": [], "product_area": "",
+               "comments": [], "attachments": []}
+    final_state = asyncio.run(TriageEngine().run({"_id": "t1"}, "fused", persist=False, context=context))
+
+    assert final_state["context"] == context
+    assert final_state["assignee"] == {"assignee_user_id": "devops_team"}
+    assert final_state["error"] is None
+
+
+def test_stream_emits_each_node_as_it_finishes(monkeypatch):
+    """Priority is streamed long before the slow reply node finishes."""
+    from triage.engine import TriageEngine
+
+    calls = []
+    monkeypatch.setattr(graph_module, "context_detailer", _timed_node("context", {"title": "t"}, 0.01, calls))
+    monkeypatch.setattr(graph_module, "heuristic_classifier", _timed_node("heuristic", None, 0.0, calls))
+    monkeypatch.setattr(graph_module, "priority_agent", _timed_node("priority", {"priority": "P1"}, 0.01, calls))
+    monkeypatch.setattr(graph_module, "assignee_agent", _timed_node("assignee", {"assignee_user_id": "x"}, 0.01, calls))
+    monkeypatch.setattr(graph_module, "rationale_agent", _timed_node("rationale", {"priority_rationale": "r"}, 0.05, calls))
+    monkeypatch.setattr(graph_module, "reply_agent", _timed_node("reply", "hello", 0.3, calls))
+    monkeypatch.setattr(graph_module, "persist_node", _timed_node(None, None, 0.01, calls))
+
+    async def collect():
+        return [event async for event in TriageEngine().stream({"_id": "t1"}, "multi")]
+
+    events = asyncio.run(collect())
+    nodes = [event["node"] for event in events if event["event"] == "node"]
+    elapsed = {event["node"]: event["elapsed_ms"] for event in events if event["event"] == "node"}
+
+    assert nodes == ["find_duplicate", "fetch_context", "classify_ticket", "determine_priority", "assign_user",
+                     "generate_rationale", "generate_reply", "save_results"]
+    assert elapsed["determine_priority"] < 150 < elapsed["generate_reply"]
+    assert events[3]["output"] == {"priority": {"priority": "P1"}}
+    assert events[-1]["event"] == "final"
+    assert events[-1]["state"]["reply"] == "hello"
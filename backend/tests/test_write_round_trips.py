@@ -0,0 +1,130 @@
+"""
+Round-trip budgets for the ticket write endpoints, measured with pymongo
+command monitoring. Needs MongoDB (MONGODB_URL); skipped without it.
+
+A "round trip" is a wave of commands in flight together: a command that
+starts while no other is running opens a new wave. Every command is held
+for COMMAND_DELAY_SECONDS before it is sent, so commands issued together
+always overlap and sequential ones never do. Writes to the ticket itself
+must be one command; the activity bucket and stats counter writes that
+follow run concurrently as one more wave.
+"""
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import MongoClient, monitoring
+from database import db
+from main import app
+
+
+COMMAND_DELAY_SECONDS = 0.05
+IGNORED_COMMANDS = {"hello", "isMaster", "ismaster", "ping", "endSessions", "buildInfo", "saslStart", "saslContinue"}
+
+
+class CommandRecorder(monitoring.CommandListener):
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Only record (and delay) inside _measure; the listener stays registered for the session
+        self.active = False
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.commands = []
+            self.pending = set()
+            self.in_flight = 0
+            self.waves = 0
+
+    def started(self, event):
+        if not self.active or event.command_name in IGNORED_COMMANDS:
+            return
+        with self.lock:
+            if self.in_flight == 0:
+                self.waves += 1
+            self.in_flight += 1
+            self.commands.append((event.command_name, event.command.get(event.command_name), event.request_id))
+            self.pending.add(event.request_id)
+        # Listeners run on the thread sending the command, so this delays the send
+        time.sleep(COMMAND_DELAY_SECONDS)
+
+    def _finished(self, event):
+        with self.lock:
+            if event.request_id in self.pending:
+                self.pending.discard(event.request_id)
+                self.in_flight -= 1
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+    def on(self, collection):
+        return [name for name, target, _ in self.commands if target == collection]
+
+
+recorder = CommandRecorder()
+monitoring.register(recorder)
+
+
+@pytest.fixture(scope="module")
+def client():
+    probe = MongoClient(db.settings.url, serverSelectionTimeoutMS=2000)
+    try:
+        probe.admin.command("ping")
+    except Exception as e:
+        pytest.skip(f"MongoDB not available: {e}")
+    finally:
+        probe.close()
+    return TestClient(app)
+
+
+def _measure(send):
+    recorder.reset()
+    recorder.active = True
+    try:
+        response = send()
+    finally:
+        recorder.active = False
+    return response, list(recorder.commands), recorder.waves
+
+
+def test_create_is_one_ticket_write(client):
+    response, commands, waves = _measure(
+        lambda: client.post("/tickets", json={"title": "Budget", "description": "Count round trips"})
+    )
+    assert response.status_code == 201
+    assert recorder.on("tickets") == ["insert"]
+    assert len(commands) == 3, commands  # ticket, activity bucket, stats counter
+    assert waves == 2, commands
+
+
+def test_update_is_one_ticket_write(client):
+    ticket_id = client.post("/tickets", json={"title": "Budget", "description": "Count round trips"}).json()["id"]
+
+    response, commands, waves = _measure(
+        lambda: client.put(f"/tickets/{ticket_id}", json={"status": "resolved", "priority": "P2"})
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "resolved"
+    assert response.json()["activity_count"] == 2
+    assert recorder.on("tickets") == ["findAndModify"]
+    assert len(commands) == 3, commands
+    assert waves == 2, commands
+
+    # Changing only the title also refreshes the dedup signature, in the same second wave
+    response, commands, waves = _measure(lambda: client.put(f"/tickets/{ticket_id}", json={"title": "Budget v2"}))
+    assert response.json()["title"] == "Budget v2"
+    assert recorder.on("tickets") == ["findAndModify", "update"]
+    assert waves == 2, commands
+
+    client.delete(f"/tickets/{ticket_id}")
+
+
+def test_update_missing_ticket_is_one_round_trip(client):
+    response, commands, waves = _measure(
+        lambda: client.put("/tickets/65abc123def4561234567890", json={"status": "closed"})
+    )
+    assert response.status_code == 404
+    assert [name for name, _, _ in commands] == ["findAndModify"]
@@ -0,0 +1,123 @@
+"""
+Train the AssigneeRouter from triage history.
+
+Every ticket with an assignee is a training example labelled with its
+current assignee_user_id. Tickets whose assignee differs from the latest
+triage result (a person reassigned them through PUT /tickets/{id}), or
+that were never triaged, count --override-weight times as much.
+
+Usage (from backend/):
+    python train_assignee_router.py [--output artifacts/assignee_router.npz] [--epochs 200]
+
+Restart the API/workers afterwards to load the new model.
+"""
+import argparse
+import asyncio
+import zlib
+from database import (
+    connect_to_mongo,
+    close_mongo_connection,
+    get_tickets_collection,
+    get_triage_results_collection,
+    get_users_collection
+)
+from triage.agents.context_detailer import build_context
+from triage.assignee_router import (
+    ASSIGNEE_ROUTER_PATH,
+    ASSIGNEE_ROUTER_MIN_MARGIN,
+    DEFAULT_FEATURES,
+    train
+)
+
+
+async def load_examples(override_weight: float):
+    """Return (ticket_ids, contexts, labels, weights) for tickets assigned to existing teams."""
+    team_ids = set()
+    async for team in get_users_collection().find({}, {"_id": 1}):
+        team_ids.add(team["_id"])
+
+    # Latest triage decision per ticket
+    triaged = {}
+    pipeline = [
+        {"$sort": {"created_at": -1}},
+        {"$group": {"_id": "$ticket_id", "assignee_user_id": {"$first": "$assignee_user_id"}}}
+    ]
+    async for row in get_triage_results_collection().aggregate(pipeline):
+        triaged[row["_id"]] = row["assignee_user_id"]
+
+    ticket_ids, contexts, labels, weights = [], [], [], []
+    projection = {"title": 1, "description": 1, "tags": 1, "product_area": 1, "category": 1, "assignee_user_id": 1}
+    async for ticket in get_tickets_collection().find({"assignee_user_id": {"$nin": [None, "unassigned"]}}, projection):
+        label = ticket["assignee_user_id"]
+        if label not in team_ids:
+            continue
+        ticket_id = str(ticket["_id"])
+        ticket_ids.append(ticket_id)
+        contexts.append(build_context(ticket, [], []))
+        labels.append(label)
+        weights.append(override_weight if triaged.get(ticket_id) != label else 1.0)
+
+    return ticket_ids, contexts, labels, weights
+
+
+def evaluate(ticket_ids, contexts, labels, weights, args):
+    """Train on 80% of tickets and report accuracy on the rest (split by ticket id)."""
+    holdout = [zlib.crc32(t.encode("utf-8")) % 5 == 0 for t in ticket_ids]
+    train_rows = [i for i, h in enumerate(holdout) if not h]
+    test_rows = [i for i, h in enumerate(holdout) if h]
+    if not test_rows or len({labels[i] for i in train_rows}) < 2:
+        print("Not enough data for a holdout evaluation")
+        return
+
+    model = train(
+        [contexts[i] for i in train_rows],
+        [labels[i] for i in train_rows],
+        [weights[i] for i in train_rows],
+        n_features=args.features,
+        epochs=args.epochs
+    )
+    correct = decided = decided_correct = 0
+    for i in test_rows:
+        ranked = model.predict(contexts[i], top_k=2)
+        margin = ranked[0][1] - (ranked[1][1] if len(ranked) > 1 else 0.0)
+        hit = ranked[0][0] == labels[i]
+        correct += hit
+        if margin >= ASSIGNEE_ROUTER_MIN_MARGIN:
+            decided += 1
+            decided_correct += hit
+    print(f"Holdout: {len(test_rows)} tickets, top-1 accuracy {correct / len(test_rows):.1%}")
+    print(
+        f"Margin >= {ASSIGNEE_ROUTER_MIN_MARGIN}: {decided / len(test_rows):.1%} of tickets skip Gemini, "
+        f"accuracy {decided_correct / decided:.1%}" if decided else
+        f"Margin >= {ASSIGNEE_ROUTER_MIN_MARGIN}: no holdout ticket would skip Gemini"
+    )
+
+
+async def main(args):
+    await connect_to_mongo()
+    try:
+        ticket_ids, contexts, labels, weights = await load_examples(args.override_weight)
+    finally:
+        await close_mongo_connection()
+
+    overrides = sum(1 for w in weights if w != 1.0)
+    print(f"{len(labels)} labelled tickets ({overrides} human overrides), {len(set(labels))} teams")
+    if len(labels) < args.min_samples or len(set(labels)) < 2:
+        print(f"Need at least {args.min_samples} tickets across 2+ teams - model not written")
+        return
+
+    evaluate(ticket_ids, contexts, labels, weights, args)
+
+    model = train(contexts, labels, weights, n_features=args.features, epochs=args.epochs)
+    model.save(args.output)
+    print(f"Saved assignee router to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=ASSIGNEE_ROUTER_PATH)
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--features", type=int, default=DEFAULT_FEATURES)
+    parser.add_argument("--override-weight", type=float, default=3.0)
+    parser.add_argument("--min-samples", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -1,6 +1,7 @@
 """
 Triage package - Multi-agent LangGraph workflow.
 """
-from triage.graph import create_triage_graph
+from triage.graph import create_triage_graph, TRIAGE_MODES
+from triage.engine import triage_engine, build_triage_response
 
-__all__ = ["create_triage_graph"]
+__all__ = ["create_triage_graph", "TRIAGE_MODES", "triage_engine", "build_triage_response"]
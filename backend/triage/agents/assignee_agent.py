@@ -1,32 +1,30 @@
 """
 AssigneeAgent - Assigns ticket to best user based on skills and context only.
 """
-import os
 import json
-from typing import Dict, List
-from langchain_google_genai import ChatGoogleGenerativeAI
-from database import get_users_collection
+from typing import Dict, List, Tuple
+from triage.roster import roster
+from triage.assignee_router import assignee_router, ASSIGNEE_ROUTER_MIN_MARGIN, ASSIGNEE_ROUTER_TOP_K
 from triage.state import TriageState
+from triage.llm_cache import llm_cache, make_cache_key, model_name
+from triage.llm_governor import llm_governor
+from triage.llm_registry import get_llm
 
 
-# Initialize Gemini LLM
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-USE_MOCK = os.getenv("USE_MOCK_AI", "false").lower() == "true"
+# Bump when the prompt template changes so cached results are not reused
+PROMPT_VERSION = "1"
 
-llm = None
-if GEMINI_API_KEY and not USE_MOCK:
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        api_key=GEMINI_API_KEY,
-        temperature=0.2
-    )
+# Top skill-match candidates shown to Gemini
+CANDIDATE_LIMIT = 5
 
 
 async def assignee_agent(state: TriageState) -> TriageState:
     """
     Determine best team assignment based on:
-    1. Skill matching with ticket context
-    2. Gemini AI selection (if available)
+    1. The trained AssigneeRouter (if loaded) - decides alone when its
+       margin is high, otherwise picks the candidates
+    2. Skill matching with ticket context
+    3. Gemini AI selection (if available)
     
     Returns:
         {
@@ -38,33 +36,49 @@ async def assignee_agent(state: TriageState) -> TriageState:
         priority_info = state.get("priority", {})
         
         if not context:
-            state["error"] = "No context available for AssigneeAgent"
-            return state
+            return {"error": "No context available for AssigneeAgent"}
         
-        # Fetch all teams from MongoDB
-        users_collection = get_users_collection()
-        users_cursor = users_collection.find({})
-        teams = []
-        async for team in users_cursor:
-            teams.append({
-                "user_id": team["_id"],
-                "name": team.get("name", ""),
-                "skills": team.get("skills", [])
-            })
+        # The roster's skill matcher returns scored copies of the teams
+        matcher = await roster.get_matcher()
         
-        if not teams:
+        if not matcher.teams:
             # Fallback if no teams in DB
-            state["assignee"] = {
-                "assignee_user_id": "unassigned"
+            return {
+                "assignee": {
+                    "assignee_user_id": "unassigned"
+                }
             }
-            return state
         
-        # Score teams by skill match only (no workload consideration)
-        scored_teams = _score_users(teams, context, priority_info)
+        ranked = await _router_ranking(context)
+        if ranked:
+            margin = ranked[0][1] - (ranked[1][1] if len(ranked) > 1 else 0.0)
+            if margin >= ASSIGNEE_ROUTER_MIN_MARGIN:
+                assignee_router.decided += 1
+                return {
+                    "assignee": {
+                        "assignee_user_id": ranked[0][0],
+                        "source": "router",
+                        "confidence": round(ranked[0][1], 3)
+                    }
+                }
+            # Not confident: the model's shortlist goes to Gemini, ordered by skill match
+            assignee_router.deferred += 1
+            skill_scores = matcher.scores_by_id(context)
+            scored_teams = [
+                {**await roster.get_team(team_id), "score": skill_scores.get(team_id, 0.0)}
+                for team_id, _ in ranked[:ASSIGNEE_ROUTER_TOP_K]
+            ]
+            scored_teams.sort(key=lambda t: t["score"], reverse=True)
+        else:
+            # Score teams by skill match only (no workload consideration)
+            scored_teams = matcher.score(context, limit=CANDIDATE_LIMIT)
         
         # Use Gemini to make final selection
-        if llm and not USE_MOCK:
-            assignee_result = await _gemini_assignee(context, priority_info, scored_teams)
+        llm = get_llm("assignee")
+        if llm:
+            assignee_result = await _gemini_assignee(
+                llm, context, priority_info, scored_teams, state.get("bypass_cache", False)
+            )
         else:
             # Pick top scorer
             best_team = scored_teams[0]
@@ -72,61 +86,62 @@ async def assignee_agent(state: TriageState) -> TriageState:
                 "assignee_user_id": best_team["user_id"]
             }
         
-        state["assignee"] = assignee_result
-        return state
+        return {"assignee": assignee_result}
         
     except Exception as e:
         print(f"⚠️  AssigneeAgent Exception: {type(e).__name__}: {str(e)}")
         import traceback
         traceback.print_exc()
-        state["error"] = f"AssigneeAgent error: {str(e)}"
-        state["assignee"] = {
-            "assignee_user_id": "unassigned"
+        return {
+            "error": f"AssigneeAgent error: {str(e)}",
+            "assignee": {
+                "assignee_user_id": "unassigned"
+            }
         }
-        return state
 
 
-def _score_users(users: List[Dict], context: Dict, priority_info: Dict) -> List[Dict]:
-    """
-    Score teams based on skill match with ticket context only.
-    Returns sorted list (highest score first).
-    """
-    title = (context.get("title") or "").lower()
-    body = (context.get("body") or "").lower()
-    tags = [t.lower() for t in (context.get("tags") or [])]
-    product_area = (context.get("product_area") or "").lower()
-    
-    combined_text = f"{title} {body} {product_area} {' '.join(tags)}"
-    
-    for team in users:
-        skill_score = 0.0
-        team_skills = [s.lower() for s in team.get("skills", [])]
-        
-        # Skill matching - count how many team skills match the ticket context
-        for skill in team_skills:
-            if skill in combined_text:
-                skill_score += 10.0
-        
-        # Score is based purely on skill match
-        team["score"] = skill_score
-    
-    # Sort by score descending
-    users.sort(key=lambda u: u["score"], reverse=True)
-    return users
+async def _router_ranking(context: Dict) -> List[Tuple[str, float]]:
+    """Router predictions for teams still in the roster, most likely first ([] without a model)."""
+    model = assignee_router.model
+    if model is None:
+        return []
+    return [
+        (team_id, probability)
+        for team_id, probability in model.predict(context, top_k=None)
+        if await roster.get_team(team_id) is not None
+    ]
 
 
-async def _gemini_assignee(context: Dict, priority_info: Dict, scored_users: List[Dict]) -> Dict:
+async def _gemini_assignee(
+    llm,
+    context: Dict,
+    priority_info: Dict,
+    scored_users: List[Dict],
+    bypass_cache: bool = False
+) -> Dict:
     """Use Gemini to select final team from scored candidates based on context only."""
     
     # Build team roster summary
     team_summary = []
-    for i, team in enumerate(scored_users[:5]):  # Top 5 candidates
+    for i, team in enumerate(scored_users[:CANDIDATE_LIMIT]):
         team_summary.append(
             f"{i+1}. {team['name']} (ID: {team['user_id']}) - "
             f"Skills: {', '.join(team.get('skills', [])[:5])}... - "
             f"Match Score: {team['score']:.1f}"
         )
     
+    cache_key = make_cache_key("assignee", model_name(llm), PROMPT_VERSION, {
+        "title": context.get("title", ""),
+        "body": context.get("body", ""),
+        "priority": priority_info.get("priority", "P3"),
+        "product_area": context.get("product_area", ""),
+        "tags": context.get("tags", []),
+        "candidates": team_summary
+    })
+    cached = await llm_cache.get(cache_key, bypass=bypass_cache)
+    if cached is not None:
+        return cached
+    
     prompt = f"""You are assigning a support ticket to the best available team based on context and skills.
 
 Ticket Title: {context.get('title', '')}
@@ -153,7 +168,7 @@ Respond in JSON format:
 Only return assignee_user_id - no rationale needed."""
     
     try:
-        response = await llm.ainvoke(prompt)
+        response = await llm_governor.ainvoke(llm, prompt, lane="assignee")
         result_text = response.content.strip()
         
         # Clean JSON from markdown
@@ -172,6 +187,7 @@ Only return assignee_user_id - no rationale needed."""
         # Remove rationale if present
         result.pop("rationale", None)
         
+        await llm_cache.set(cache_key, result, agent="assignee")
         return result
         
     except Exception as e:
@@ -1,61 +1,129 @@
 """
 ContextDetailer - Fetches and compresses ticket context from MongoDB.
 """
-from typing import Dict
+import asyncio
+from typing import Dict, List
 from database import get_tickets_collection, get_comments_collection, get_attachments_collection
 from triage.state import TriageState
 
 
+# Context sent to the agents is capped per ticket
+COMMENT_LIMIT = 10
+ATTACHMENT_LIMIT = 5
+# Fields the context keeps (see _format_comment / _format_attachment)
+COMMENT_FIELDS = ["text", "created_at"]
+ATTACHMENT_FIELDS = ["filename", "size"]
+
+
 async def context_detailer(state: TriageState) -> TriageState:
     """
     Fetch ticket, comments, and attachments from MongoDB.
     Build compact context for downstream agents.
+    
+    Skipped when the caller already supplied the context (batch triage
+    fetches every ticket's comments and attachments up front).
     """
     try:
+        if state.get("context"):
+            return {"context": state["context"]}
+
         ticket = state.get("ticket")
         if not ticket or not ticket.get("_id"):
-            state["error"] = "No ticket provided to ContextDetailer"
-            return state
-        
+            return {"error": "No ticket provided to ContextDetailer"}
+
         ticket_id = str(ticket["_id"])
-        
-        # Fetch comments
-        comments_collection = get_comments_collection()
-        comments_cursor = comments_collection.find({"ticket_id": ticket_id}).sort("created_at", 1).limit(10)
-        comments = []
-        async for comment in comments_cursor:
-            comments.append({
-                "text": comment.get("text", ""),
-                "created_at": comment.get("created_at").isoformat() if comment.get("created_at") else ""
-            })
-        
-        # Fetch attachments (optional)
-        attachments_collection = get_attachments_collection()
-        attachments_cursor = attachments_collection.find({"ticket_id": ticket_id}).limit(5)
-        attachments = []
-        async for attachment in attachments_cursor:
-            attachments.append({
-                "filename": attachment.get("filename", ""),
-                "size": attachment.get("size", 0)
-            })
-        
-        # Build compact context
-        # Handle both old (description) and new (body) field names
-        body_text = ticket.get("body") or ticket.get("description", "")
-        
-        context = {
-            "title": ticket.get("title", ""),
-            "body": body_text,
-            "tags": ticket.get("tags", []),
-            "product_area": ticket.get("product_area", ticket.get("category", "")),
-            "comments": comments,
-            "attachments": attachments
-        }
-        
-        state["context"] = context
-        return state
-        
+
+        # Comments and attachments are independent - fetch them concurrently
+        comments, attachments = await asyncio.gather(
+            _fetch_comments(ticket_id),
+            _fetch_attachments(ticket_id)
+        )
+
+        return {"context": build_context(ticket, comments, attachments)}
+
     except Exception as e:
-        state["error"] = f"ContextDetailer error: {str(e)}"
-        return state
+        return {"error": f"ContextDetailer error: {str(e)}"}
+
+
+def build_context(ticket: Dict, comments: List[Dict], attachments: List[Dict]) -> Dict:
+    """Build compact context for downstream agents."""
+    return {
+        "title": ticket.get("title", ""),
+        "body": ticket.get("description", ""),
+        "tags": ticket.get("tags", []),
+        "product_area": ticket.get("product_area", ticket.get("category", "")),
+        "comments": comments,
+        "attachments": attachments
+    }
+
+
+async def fetch_contexts(tickets: List[Dict]) -> Dict[str, Dict]:
+    """
+    Build contexts for many tickets with one comments and one attachments query.
+
+    Returns {ticket_id: context}.
+    """
+    ticket_ids = [str(ticket["_id"]) for ticket in tickets]
+    comments, attachments = await asyncio.gather(
+        _fetch_grouped(get_comments_collection(), ticket_ids, COMMENT_FIELDS, COMMENT_LIMIT, sort_by="created_at"),
+        _fetch_grouped(get_attachments_collection(), ticket_ids, ATTACHMENT_FIELDS, ATTACHMENT_LIMIT)
+    )
+    return {
+        ticket_id: build_context(
+            ticket,
+            [_format_comment(c) for c in comments.get(ticket_id, [])],
+            [_format_attachment(a) for a in attachments.get(ticket_id, [])]
+        )
+        for ticket_id, ticket in zip(ticket_ids, tickets)
+    }
+
+
+def _format_comment(comment: Dict) -> Dict:
+    return {
+        "text": comment.get("text", ""),
+        "created_at": comment.get("created_at").isoformat() if comment.get("created_at") else ""
+    }
+
+
+def _format_attachment(attachment: Dict) -> Dict:
+    return {
+        "filename": attachment.get("filename", ""),
+        "size": attachment.get("size", 0)
+    }
+
+
+async def _fetch_comments(ticket_id: str) -> List[Dict]:
+    """Fetch the first 10 comments for a ticket."""
+    comments_collection = get_comments_collection()
+    comments_cursor = comments_collection.find({"ticket_id": ticket_id}).sort("created_at", 1).limit(COMMENT_LIMIT)
+    return [_format_comment(comment) async for comment in comments_cursor]
+
+
+async def _fetch_attachments(ticket_id: str) -> List[Dict]:
+    """Fetch up to 5 attachments for a ticket (optional)."""
+    attachments_collection = get_attachments_collection()
+    attachments_cursor = attachments_collection.find({"ticket_id": ticket_id}).limit(ATTACHMENT_LIMIT)
+    return [_format_attachment(attachment) async for attachment in attachments_cursor]
+
 
+async def _fetch_grouped(
+    collection,
+    ticket_ids: List[str],
+    fields: List[str],
+    limit: int,
+    sort_by: str = None
+) -> Dict[str, List[Dict]]:
+    """Fetch up to `limit` documents per ticket for many tickets in one aggregation (only `fields` are returned)."""
+    pipeline = [{"$match": {"ticket_id": {"$in": ticket_ids}}}]
+    if sort_by:
+        # Leading ticket_id lets the (ticket_id, <sort_by>) index return documents already ordered
+        pipeline.append({"$sort": {"ticket_id": 1, sort_by: 1}})
+    # $firstN keeps only `limit` small documents per group instead of every full document
+    pipeline.append({"$group": {
+        "_id": "$ticket_id",
+        "docs": {"$firstN": {"n": limit, "input": {field: f"${field}" for field in fields}}}
+    }})
+    grouped = {}
+    async for group in collection.aggregate(pipeline):
+        grouped[group["_id"]] = group["docs"]
+    return grouped
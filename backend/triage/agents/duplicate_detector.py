@@ -0,0 +1,58 @@
+"""
+DuplicateDetector - Reuses the triage of a recent near-identical ticket.
+
+Runs first. When the ticket's MinHash signature matches a ticket triaged
+within TICKET_DEDUP_WINDOW_SECONDS (and not re-prioritised or reassigned
+by hand since), its priority, assignee, rationale and (unless
+TICKET_DEDUP_FRESH_REPLY) reply are copied and the graph skips the LLM
+agents.
+"""
+from typing import Dict
+from triage.state import TriageState
+from triage.dedup import duplicate_index, TICKET_DEDUP_ENABLED, TICKET_DEDUP_FRESH_REPLY
+
+
+async def duplicate_detector(state: TriageState) -> TriageState:
+    """
+    Look up a canonical ticket for this one.
+
+    Returns {"duplicate": None} when there is none (or lookup fails), else
+    {"duplicate": {"ticket_id", "similarity"}, "priority", "assignee", "rationale"[, "reply"]}.
+    """
+    ticket = state.get("ticket") or {}
+    if not TICKET_DEDUP_ENABLED or state.get("bypass_cache"):
+        return {"duplicate": None}
+
+    try:
+        match = await duplicate_index.find_canonical(ticket)
+    except Exception as e:
+        # Triage normally rather than failing on the optimisation
+        print(f"⚠️  DuplicateDetector error: {e}")
+        return {"duplicate": None}
+
+    if not match:
+        return {"duplicate": None}
+    return reuse_triage_result(*match)
+
+
+def reuse_triage_result(result: Dict, similarity: float) -> Dict:
+    """State update that copies a stored triage result onto a duplicate ticket."""
+    update = {
+        "duplicate": {
+            # Chains point at the ticket that was actually triaged
+            "ticket_id": result.get("duplicate_of") or result["ticket_id"],
+            "similarity": round(similarity, 3)
+        },
+        "priority": {
+            "priority": result.get("priority", "P3"),
+            "confidence": result.get("priority_confidence", 0.0)
+        },
+        "assignee": {"assignee_user_id": result.get("assignee_user_id") or "unassigned"},
+        "rationale": {
+            "priority_rationale": result.get("priority_rationale", ""),
+            "assignee_rationale": result.get("assignee_rationale", "")
+        }
+    }
+    if not TICKET_DEDUP_FRESH_REPLY and result.get("reply_draft"):
+        update["reply"] = result["reply_draft"]
+    return update
@@ -0,0 +1,230 @@
+"""
+FusedTriageAgent - Priority, assignee, rationale and reply in one Gemini call.
+
+Replaces the PriorityAgent → AssigneeAgent → RationaleAgent/ReplyAgent chain
+with a single structured-output request. Any field the model gets wrong
+falls back to the heuristic the corresponding agent already uses.
+"""
+import json
+from typing import Dict, List, Optional
+from pydantic import BaseModel, ValidationInfo, field_validator
+from triage.roster import roster
+from triage.state import TriageState
+from triage.llm_cache import llm_cache, make_cache_key, model_name
+from triage.llm_governor import llm_governor
+from triage.llm_registry import get_llm
+from triage.agents.assignee_agent import CANDIDATE_LIMIT
+from triage.agents.rationale_agent import _mock_rationale
+from triage.agents.reply_agent import _mock_reply
+
+
+# Bump when the prompt template changes so cached results are not reused
+PROMPT_VERSION = "1"
+
+
+class FusedTriageOutput(BaseModel):
+    """
+    Schema for the fused triage response.
+
+    Invalid values become None instead of failing the whole response,
+    so each field can fall back independently.
+    """
+    priority: Optional[str] = None
+    confidence: Optional[float] = None
+    assignee_user_id: Optional[str] = None
+    priority_rationale: Optional[str] = None
+    assignee_rationale: Optional[str] = None
+    reply_draft: Optional[str] = None
+
+    @field_validator("priority", mode="before")
+    @classmethod
+    def _valid_priority(cls, value):
+        return value if value in ("P0", "P1", "P2", "P3") else None
+
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def _valid_confidence(cls, value):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        return value if 0.0 <= value <= 1.0 else None
+
+    @field_validator("assignee_user_id", mode="before")
+    @classmethod
+    def _valid_assignee(cls, value, info: ValidationInfo):
+        # Only the scored candidates shown to the model are acceptable
+        candidates = (info.context or {}).get("candidate_ids", [])
+        return value if value in candidates else None
+
+    @field_validator("priority_rationale", "assignee_rationale", "reply_draft", mode="before")
+    @classmethod
+    def _non_empty_text(cls, value):
+        return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+async def fused_triage_agent(state: TriageState) -> TriageState:
+    """
+    Produce every triage field with a single LLM call.
+
+    Returns:
+        {
+            "priority": {"priority": str, "confidence": float},
+            "assignee": {"assignee_user_id": str},
+            "rationale": {"priority_rationale": str, "assignee_rationale": str},
+            "reply": str
+        }
+    """
+    try:
+        context = state.get("context", {})
+        if not context:
+            return {"error": "No context available for FusedTriageAgent"}
+
+        matcher = await roster.get_matcher()
+        candidates = matcher.score(context, limit=CANDIDATE_LIMIT)
+
+        output = FusedTriageOutput()
+        llm = get_llm("fused")
+        if llm:
+            output = await _gemini_fused(llm, context, candidates, state.get("bypass_cache", False))
+
+        return _with_fallbacks(output, context, candidates)
+
+    except Exception as e:
+        print(f"⚠️  FusedTriageAgent Exception: {type(e).__name__}: {str(e)}")
+        return {"error": f"FusedTriageAgent error: {str(e)}"}
+
+
+def _with_fallbacks(output: FusedTriageOutput, context: Dict, candidates: List[Dict]) -> Dict:
+    """Fill any missing field with the heuristic the dedicated agent would use."""
+    # PriorityAgent falls back to P3 when the LLM gives no usable answer
+    if output.priority:
+        priority_info = {
+            "priority": output.priority,
+            "confidence": output.confidence if output.confidence is not None else 0.8
+        }
+    else:
+        priority_info = {"priority": "P3", "confidence": 0.5}
+
+    # AssigneeAgent falls back to the top skill-match score
+    if output.assignee_user_id:
+        assignee_user_id = output.assignee_user_id
+    else:
+        assignee_user_id = candidates[0]["user_id"] if candidates else "unassigned"
+    assignee_info = {"assignee_user_id": assignee_user_id}
+
+    team = next((t for t in candidates if t["user_id"] == assignee_user_id), {})
+    team_name = team.get("name", assignee_user_id)
+    mock_rationale = None
+    if not output.priority_rationale or not output.assignee_rationale:
+        mock_rationale = _mock_rationale(context, priority_info, assignee_info, team_name, team.get("skills", []))
+
+    rationale_info = {
+        "priority_rationale": output.priority_rationale or mock_rationale["priority_rationale"],
+        "assignee_rationale": output.assignee_rationale or mock_rationale["assignee_rationale"]
+    }
+
+    # ReplyAgent enforces the same 120-word limit
+    reply = output.reply_draft
+    if reply:
+        words = reply.split()
+        if len(words) > 120:
+            reply = " ".join(words[:120]) + "..."
+    else:
+        reply = _mock_reply(context, priority_info, assignee_info)
+
+    return {
+        "priority": priority_info,
+        "assignee": assignee_info,
+        "rationale": rationale_info,
+        "reply": reply
+    }
+
+
+async def _gemini_fused(llm, context: Dict, candidates: List[Dict], bypass_cache: bool = False) -> FusedTriageOutput:
+    """Ask Gemini for all triage fields at once and validate them against the schema."""
+
+    team_summary = []
+    for i, team in enumerate(candidates):
+        team_summary.append(
+            f"{i+1}. {team['name']} (ID: {team['user_id']}) - "
+            f"Skills: {', '.join(team.get('skills', [])[:5])}... - "
+            f"Match Score: {team['score']:.1f}"
+        )
+
+    cache_key = make_cache_key("fused", model_name(llm), PROMPT_VERSION, {
+        "title": context.get("title", ""),
+        "body": context.get("body", ""),
+        "product_area": context.get("product_area", ""),
+        "tags": context.get("tags", []),
+        "candidates": team_summary
+    })
+    candidate_ids = [team["user_id"] for team in candidates]
+    cached = await llm_cache.get(cache_key, bypass=bypass_cache)
+    if cached is not None:
+        return FusedTriageOutput.model_validate(cached, context={"candidate_ids": candidate_ids})
+
+    prompt = f"""You are an expert helpdesk triage system. Triage the ticket below in a single pass.
+
+Ticket Title: {context.get('title', '')}
+Ticket Body: {context.get('body', '')}
+Product Area: {context.get('product_area', '')}
+Tags: {', '.join(context.get('tags', [])) if context.get('tags') else 'None'}
+
+Candidate Teams (sorted by skill match score):
+{chr(10).join(team_summary) if team_summary else 'None'}
+
+1. PRIORITY
+- P0: System-wide outage, security/data breach, data loss or payment processing down. No workaround.
+- P1: Major feature broken or critical customer-facing functionality down for a large share of users.
+- P2: Moderate issue with a workaround, partial functionality, or billing/account questions.
+- P3: Minor or cosmetic issue, feature request, general question.
+Confidence: 0.9-1.0 very clear, 0.7-0.89 some ambiguity, 0.5-0.69 borderline.
+
+2. ASSIGNEE
+Pick the team whose skills best match the ticket. assignee_user_id MUST be one of the IDs listed above.
+If the ticket contains "i don't know" or is very vague, pick Customer Support / Customer Success if it is listed.
+
+3. RATIONALE
+priority_rationale: why this priority (50-80 words, reference ticket details).
+assignee_rationale: why this team (50-80 words, reference the team's skills).
+
+4. REPLY
+reply_draft: friendly, professional first reply to the customer, maximum 120 words.
+Set expectations by priority: P0 updates every 30 min, P1 update in 2-4 hours,
+P2 response in 24-48 hours, P3 response in 2-3 business days. Sign off professionally.
+
+Respond in JSON format:
+{{
+    "priority": "P0|P1|P2|P3",
+    "confidence": <float 0-1>,
+    "assignee_user_id": "<team_id from list>",
+    "priority_rationale": "<explanation for priority>",
+    "assignee_rationale": "<explanation for team>",
+    "reply_draft": "<reply text>"
+}}"""
+
+    try:
+        response = await llm_governor.ainvoke(llm, prompt, lane="fused")
+        result_text = response.content.strip()
+
+        # Clean JSON from markdown
+        if "```json" in result_text:
+            result_text = result_text.split("```json")[1].split("```")[0].strip()
+        elif "```" in result_text:
+            result_text = result_text.split("```")[1].split("```")[0].strip()
+
+        result = json.loads(result_text)
+        if not isinstance(result, dict):
+            raise ValueError("Fused triage response is not a JSON object")
+
+        output = FusedTriageOutput.model_validate(
+            result,
+            context={"candidate_ids": candidate_ids}
+        )
+        await llm_cache.set(cache_key, output.model_dump(), agent="fused")
+        return output
+
+    except Exception as e:
+        print(f"Gemini fused triage error: {e}")
+        return FusedTriageOutput()
@@ -0,0 +1,169 @@
+"""
+HeuristicClassifier - Local keyword classifier that runs before the LLM agents.
+
+Scores priority from keyword tiers (the same ones the mock triage uses)
+and the assignee from skill matching. When a result reaches its own
+threshold the PriorityAgent/AssigneeAgent Gemini call is skipped for it.
+"""
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from triage.roster import roster
+from triage.state import TriageState
+
+
+# Skip the LLM for a field when its local confidence reaches this. The default is
+# above MAX_CONFIDENCE, so nothing is skipped until it is lowered after checking
+# calibrate_heuristics.py against this deployment's triage history
+TRIAGE_HEURISTIC_THRESHOLD = float(os.getenv("TRIAGE_HEURISTIC_THRESHOLD", "1.0"))
+# Same for the assignee shortcut, opted into separately: its confidence is a
+# skill-match margin, not a precision measured by calibrate_heuristics.py
+TRIAGE_HEURISTIC_ASSIGNEE_THRESHOLD = float(os.getenv("TRIAGE_HEURISTIC_ASSIGNEE_THRESHOLD", "1.0"))
+# Measured priority confidences written by calibrate_heuristics.py
+HEURISTIC_CALIBRATION_PATH = os.getenv(
+    "HEURISTIC_CALIBRATION_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "artifacts", "heuristic_calibration.json")
+)
+
+# (priority, uncalibrated base confidence, keyword hits needed, keywords) - checked with word boundaries.
+# One generic word ("issue", "urgent") says little, so P0/P1 need two distinct hits
+PRIORITY_TIERS = [
+    ("P0", 0.92, 2, ["down", "outage", "broken", "not working", "crash", "crashed", "critical", "urgent", "security", "data loss"]),
+    ("P1", 0.85, 2, ["error", "bug", "issue", "problem", "fail", "failed", "failing"]),
+    ("P2", 0.78, 1, ["billing", "payment", "invoice", "charge", "refund"]),
+]
+# Every other tier that also matches makes the ticket more ambiguous
+CONFLICT_PENALTY = 0.1
+EXTRA_HIT_BONUS = 0.02
+MAX_CONFIDENCE = 0.95
+# Confidence reported for a tier matched by fewer keywords than it needs
+UNCORROBORATED_CONFIDENCE = 0.5
+# Calibration buckets group 3+ keyword hits together
+MAX_HIT_BUCKET = 3
+
+_TIER_PATTERNS = [
+    (priority, base, min_hits, re.compile(r"\b(" + "|".join(re.escape(k) for k in keywords) + r")\b"))
+    for priority, base, min_hits, keywords in PRIORITY_TIERS
+]
+
+
+def calibration_key(priority: str, hits: int, conflicted: bool) -> str:
+    """Bucket of a priority guess in the calibration file, e.g. "P0:2" or "P1:3:conflict"."""
+    key = f"{priority}:{min(hits, MAX_HIT_BUCKET)}"
+    return f"{key}:conflict" if conflicted else key
+
+
+def load_calibration(path: str) -> Optional[Dict[str, float]]:
+    """Measured confidence per calibration bucket, or None without a calibration file."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return {key: float(value) for key, value in json.load(f)["priority"].items()}
+    except Exception as e:
+        print(f"⚠️  Could not load heuristic calibration from {path}: {e}")
+        return None
+
+
+_calibration = load_calibration(HEURISTIC_CALIBRATION_PATH)
+
+
+async def heuristic_classifier(state: TriageState) -> TriageState:
+    """
+    Classify priority and assignee locally.
+
+    Confident fields are written to state (so the matching LLM agent is
+    skipped by the graph); the full decision goes to state["heuristic"]
+    and is stored with the triage result.
+    """
+    context = state.get("context") or {}
+    decision = {
+        "threshold": TRIAGE_HEURISTIC_THRESHOLD,
+        "assignee_threshold": TRIAGE_HEURISTIC_ASSIGNEE_THRESHOLD,
+        "skipped": []
+    }
+    update = {}
+
+    try:
+        priority, priority_confidence, matched = classify_priority(context)
+        decision.update({"priority": priority, "priority_confidence": priority_confidence, "keywords": matched})
+        if priority and priority_confidence >= TRIAGE_HEURISTIC_THRESHOLD:
+            update["priority"] = {"priority": priority, "confidence": priority_confidence}
+            decision["skipped"].append("priority")
+
+        matcher = await roster.get_matcher()
+        assignee_user_id, assignee_confidence = classify_assignee(matcher.score(context, limit=2))
+        decision.update({"assignee_user_id": assignee_user_id, "assignee_confidence": assignee_confidence})
+        if assignee_user_id and assignee_confidence >= TRIAGE_HEURISTIC_ASSIGNEE_THRESHOLD:
+            update["assignee"] = {"assignee_user_id": assignee_user_id}
+            decision["skipped"].append("assignee")
+
+    except Exception as e:
+        # The LLM agents still run; the classifier only ever saves work
+        print(f"⚠️  HeuristicClassifier error: {e}")
+        decision["error"] = str(e)
+
+    update["heuristic"] = decision
+    return update
+
+
+def match_priority(context: Dict) -> List[Tuple[str, float, int, List[str]]]:
+    """Matching tiers, highest first, as (priority, base confidence, hits needed, matched keywords)."""
+    text = " ".join([
+        context.get("title") or "",
+        context.get("body") or "",
+        " ".join(context.get("tags") or [])
+    ]).lower()
+
+    hits = []
+    for priority, base, min_hits, pattern in _TIER_PATTERNS:
+        matched = sorted(set(pattern.findall(text)))
+        if matched:
+            hits.append((priority, base, min_hits, matched))
+    return hits
+
+
+def classify_priority(context: Dict, calibration: Optional[Dict[str, float]] = None) -> Tuple[Optional[str], float, List[str]]:
+    """
+    Return (priority, confidence, matched keywords).
+
+    The highest matching tier wins. With a calibration file the confidence
+    is the measured precision of its bucket (tier, keyword hits, conflict),
+    0 for buckets without enough history; without one it is the tier's
+    base, plus a little per extra keyword, minus CONFLICT_PENALTY for
+    every other tier that also matched. A tier matched by fewer keywords
+    than it needs never exceeds UNCORROBORATED_CONFIDENCE. No match
+    returns (None, 0.0, []).
+    """
+    hits = match_priority(context)
+    if not hits:
+        return None, 0.0, []
+
+    calibration = _calibration if calibration is None else calibration
+    priority, base, min_hits, matched = hits[0]
+    if calibration is not None:
+        confidence = calibration.get(calibration_key(priority, len(matched), len(hits) > 1), 0.0)
+    else:
+        confidence = base + EXTRA_HIT_BONUS * (len(matched) - 1) - CONFLICT_PENALTY * (len(hits) - 1)
+    if len(matched) < min_hits:
+        confidence = min(confidence, UNCORROBORATED_CONFIDENCE)
+    return priority, round(max(0.0, min(MAX_CONFIDENCE, confidence)), 2), matched
+
+
+def classify_assignee(scored_teams: List[Dict]) -> Tuple[Optional[str], float]:
+    """
+    Return (team_id, confidence) from skill-match scores (sorted, highest first).
+
+    Confidence grows with the lead over the runner-up and with the number
+    of matched skills; it reaches the cap at three matches and no competitor.
+    It is uncalibrated, hence TRIAGE_HEURISTIC_ASSIGNEE_THRESHOLD.
+    """
+    if not scored_teams or scored_teams[0]["score"] <= 0:
+        return None, 0.0
+
+    top = scored_teams[0]["score"]
+    second = scored_teams[1]["score"] if len(scored_teams) > 1 else 0.0
+    margin = (top - second) / top
+    evidence = min(1.0, top / 30.0)
+    return scored_teams[0]["user_id"], round(min(MAX_CONFIDENCE, margin * evidence), 2)
@@ -1,130 +1,156 @@
 """
 PersistNode - Writes triage results to MongoDB.
+
+The ticket update, triage_results insert and activity_logs insert are
+independent, so by default they run concurrently; the stats counter
+update follows the ticket update (it also moves the ticket list ETag,
+which must not change before the ticket does). With TRIAGE_PERSIST_TRANSACTIONS=true (replica
+sets only) the three documents are written in one multi-document
+transaction instead, so a failure never leaves a ticket updated without
+its triage result. Per-write timings are returned in persist_timings and
+aggregated in persist_metrics for /metrics.
 """
+import asyncio
+import os
+import threading
+import time
 from datetime import datetime
+from typing import Awaitable, Dict, Tuple
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.write_concern import WriteConcern
 from models import get_ist_now
 from database import (
+    get_client,
     get_tickets_collection,
     get_triage_results_collection,
-    get_activity_logs_collection,
-    get_users_collection
+    get_activity_logs_collection
 )
+from services.ticket_stats import STATS_PROJECTION, record_ticket_change
+from triage.roster import roster
 from triage.state import TriageState
 
 
+# Write the ticket, triage result and activity log in one transaction (needs a replica set)
+TRIAGE_PERSIST_TRANSACTIONS = os.getenv("TRIAGE_PERSIST_TRANSACTIONS", "false").lower() == "true"
+
+# Timed steps; "transaction" spans the transactional writes including commit and retries
+PERSIST_WRITES = ("ticket", "triage_result", "activity_log", "stats", "transaction", "total")
+
+
+class PersistMetrics:
+    """Persist run counters and per-write latencies for /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.runs = 0
+            self.failures = 0
+            self.transactions = 0
+            self.total_ms = {write: 0.0 for write in PERSIST_WRITES}
+            self.max_ms = {write: 0.0 for write in PERSIST_WRITES}
+
+    def record(self, timings: Dict, failed: bool):
+        with self._lock:
+            self.runs += 1
+            self.failures += int(failed)
+            self.transactions += bool(timings.get("transactional"))
+            for write in self.total_ms:
+                if write + "_ms" in timings:
+                    self.total_ms[write] += timings[write + "_ms"]
+                    self.max_ms[write] = max(self.max_ms[write], timings[write + "_ms"])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "failures": self.failures,
+                "transactions": self.transactions,
+                "avg_ms": {w: round(t / self.runs, 2) if self.runs else 0.0 for w, t in self.total_ms.items()},
+                "max_ms": {w: round(t, 2) for w, t in self.max_ms.items()}
+            }
+
+
+persist_metrics = PersistMetrics()
+
+
+async def _timed(timings: Dict, write: str, operation: Awaitable):
+    """Await a write and record how long it took as timings[f"{write}_ms"]."""
+    started = time.perf_counter()
+    try:
+        return await operation
+    finally:
+        timings[f"{write}_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+
 async def persist_node(state: TriageState) -> TriageState:
     """
     Persist triage results to MongoDB:
     1. Update ticket (priority, assignee_user_id, status)
     2. Insert triage_results document
     3. Insert activity_log
+    4. Move the ticket between stats counters
     
-    Returns final state.
+    Returns {"error": None, "persist_timings": {...}} on success.
     """
+    timings = {"transactional": TRIAGE_PERSIST_TRANSACTIONS}
+    started = time.perf_counter()
+    ticket = state.get("ticket")
     try:
-        ticket = state.get("ticket")
-        priority_info = state.get("priority", {})
         assignee_info = state.get("assignee", {})
-        rationale_info = state.get("rationale", {})
-        reply = state.get("reply", "")
         
         if not ticket or not ticket.get("_id"):
-            state["error"] = "No ticket to persist"
-            return state
+            return {"error": "No ticket to persist"}
         
         # Ensure assignee_info is not None
         if assignee_info is None:
             assignee_info = {}
         
-        # Ensure rationale_info is not None
-        if rationale_info is None:
-            rationale_info = {}
-        
-        ticket_id = ticket["_id"]
-        now = get_ist_now()
-        
-        # 1. UPDATE TICKET
-        tickets_collection = get_tickets_collection()
-        
         # Get team name for display (old 'assignee' field)
         assignee_user_id = assignee_info.get("assignee_user_id", "unassigned")
         assignee_name = assignee_user_id  # Default to team_id
         
-        # Try to fetch team name from users collection
+        # Team name comes from the cached roster
         if assignee_user_id and assignee_user_id != "unassigned":
-            users_collection = get_users_collection()
-            team = await users_collection.find_one({"_id": assignee_user_id})
+            team = await roster.get_team(assignee_user_id)
             if team:
                 assignee_name = team.get("name", assignee_user_id)
         
-        # Combine rationales from RationaleAgent
-        priority_rationale = rationale_info.get("priority_rationale", "")
-        assignee_rationale = rationale_info.get("assignee_rationale", "")
-        combined_rationale = f"{priority_rationale} | {assignee_rationale}" if priority_rationale and assignee_rationale else (priority_rationale or assignee_rationale)
-        
-        update_fields = {
-            # New fields for multi-agent system
-            "priority": priority_info.get("priority", "P3"),
-            "assignee_user_id": assignee_user_id,
-            "status": "triaged",
-            "updated_at": now,
-            # Legacy fields for frontend compatibility
-            "assignee": assignee_name,
-            "ai_rationale": combined_rationale,
-            "ai_reply_draft": reply,
-            "ai_confidence": priority_info.get("confidence", 0.0)
-        }
-        
-        await tickets_collection.update_one(
-            {"_id": ticket_id},
-            {"$set": update_fields}
+        update_fields, triage_result_doc, activity_log_doc = build_persist_docs(
+            state, assignee_name, get_ist_now()
         )
         
-        # 2. INSERT TRIAGE_RESULTS
-        triage_results_collection = get_triage_results_collection()
-        
-        triage_result_doc = {
-            "ticket_id": str(ticket_id),
-            "priority": priority_info.get("priority", "P3"),
-            "priority_confidence": priority_info.get("confidence", 0.0),
-            "priority_rationale": priority_rationale,
-            "assignee_user_id": assignee_info.get("assignee_user_id"),
-            "assignee_rationale": assignee_rationale,
-            "reply_draft": reply,
-            "created_at": now
-        }
-        
-        await triage_results_collection.insert_one(triage_result_doc)
-        
-        # 3. INSERT ACTIVITY_LOG
-        activity_logs_collection = get_activity_logs_collection()
-        
-        activity_log_doc = {
-            "ticket_id": str(ticket_id),
-            "event_type": "triage_run",
-            "payload": {
-                "priority": priority_info.get("priority"),
-                "assignee": assignee_info.get("assignee_user_id"),
-                "confidence": priority_info.get("confidence")
-            },
-            "timestamp": now
-        }
-        
-        await activity_logs_collection.insert_one(activity_log_doc)
+        if TRIAGE_PERSIST_TRANSACTIONS:
+            before = await _write_in_transaction(ticket["_id"], update_fields, triage_result_doc, activity_log_doc, timings)
+            if before:
+                await _timed(timings, "stats", record_ticket_change(before, {**before, **update_fields}))
+        else:
+            results = await asyncio.gather(
+                _write_ticket(ticket["_id"], update_fields, timings),
+                _timed(timings, "triage_result", get_triage_results_collection().insert_one(triage_result_doc)),
+                _timed(timings, "activity_log", get_activity_logs_collection().insert_one(activity_log_doc)),
+                return_exceptions=True
+            )
+            errors = [result for result in results if isinstance(result, Exception)]
+            if errors:
+                raise errors[0]
         
-        # Success - no error
-        state["error"] = None
-        return state
+        timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        persist_metrics.record(timings, failed=False)
+        return {"error": None, "persist_timings": timings}
         
     except Exception as e:
-        state["error"] = f"PersistNode error: {str(e)}"
+        timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        persist_metrics.record(timings, failed=True)
         
         # Log failure to activity_logs
         try:
             activity_logs_collection = get_activity_logs_collection()
             await activity_logs_collection.insert_one({
-                "ticket_id": str(ticket.get("_id", "unknown")),
+                "ticket_id": str((ticket or {}).get("_id", "unknown")),
                 "event_type": "triage_failed",
                 "payload": {"error": str(e)},
                 "timestamp": get_ist_now()
@@ -132,4 +158,113 @@ async def persist_node(state: TriageState) -> TriageState:
         except:
             pass
         
-        return state
+        return {"error": f"PersistNode error: {str(e)}", "persist_timings": timings}
+
+
+def _update_ticket(ticket_id, update_fields: Dict, session=None) -> Awaitable[Dict]:
+    """
+    Apply the triage update and return the ticket's stats fields as they were
+    just before it, so the counters move from the stored values (a ticket
+    edited since triage started is counted correctly) in the same round trip.
+    """
+    return get_tickets_collection().find_one_and_update(
+        {"_id": ticket_id},
+        {"$set": update_fields, "$inc": {"revision": 1}},
+        projection=STATS_PROJECTION,
+        return_document=ReturnDocument.BEFORE,
+        session=session
+    )
+
+
+async def _write_ticket(ticket_id, update_fields: Dict, timings: Dict):
+    """Update the ticket, then count the change in the ticket stats."""
+    before = await _timed(timings, "ticket", _update_ticket(ticket_id, update_fields))
+    # None: the ticket was deleted meanwhile, so there is nothing to count
+    if before:
+        await _timed(timings, "stats", record_ticket_change(before, {**before, **update_fields}))
+
+
+async def _write_in_transaction(ticket_id, update_fields: Dict, triage_result_doc: Dict, activity_log_doc: Dict, timings: Dict) -> Dict:
+    """
+    Write the ticket, triage result and activity log atomically (retried on transient errors).
+
+    Returns the ticket's stats fields from before the committed update.
+    """
+    before = None
+
+    async def write(session):
+        nonlocal before
+        # Operations in one session run one at a time
+        before = await _timed(timings, "ticket", _update_ticket(ticket_id, update_fields, session=session))
+        await _timed(timings, "triage_result", get_triage_results_collection().insert_one(triage_result_doc, session=session))
+        await _timed(timings, "activity_log", get_activity_logs_collection().insert_one(activity_log_doc, session=session))
+    
+    async with await get_client().start_session() as session:
+        await _timed(timings, "transaction", session.with_transaction(write, write_concern=WriteConcern("majority")))
+    return before
+
+
+def build_persist_docs(state: TriageState, assignee_name: str, now: datetime) -> Tuple[Dict, Dict, Dict]:
+    """
+    Build the documents a triage run writes:
+    (ticket $set fields, triage_results document, activity_logs document).
+    
+    Shared by persist_node and batch triage, which writes many at once.
+    """
+    ticket_id = state["ticket"]["_id"]
+    priority_info = state.get("priority") or {}
+    assignee_info = state.get("assignee") or {}
+    rationale_info = state.get("rationale") or {}
+    reply = state.get("reply", "")
+    duplicate = state.get("duplicate") or {}
+    
+    assignee_user_id = assignee_info.get("assignee_user_id", "unassigned")
+    
+    # Combine rationales from RationaleAgent
+    priority_rationale = rationale_info.get("priority_rationale", "")
+    assignee_rationale = rationale_info.get("assignee_rationale", "")
+    combined_rationale = f"{priority_rationale} | {assignee_rationale}" if priority_rationale and assignee_rationale else (priority_rationale or assignee_rationale)
+    
+    update_fields = {
+        # New fields for multi-agent system
+        "priority": priority_info.get("priority", "P3"),
+        "assignee_user_id": assignee_user_id,
+        "status": "triaged",
+        "updated_at": now,
+        # Legacy fields for frontend compatibility
+        "assignee": assignee_name,
+        "ai_rationale": combined_rationale,
+        "ai_reply_draft": reply,
+        "ai_confidence": priority_info.get("confidence", 0.0),
+        # Canonical ticket whose triage was reused (cleared when triaged on its own)
+        "duplicate_of": duplicate.get("ticket_id")
+    }
+    
+    triage_result_doc = {
+        "ticket_id": str(ticket_id),
+        "priority": priority_info.get("priority", "P3"),
+        "priority_confidence": priority_info.get("confidence", 0.0),
+        "priority_rationale": priority_rationale,
+        "assignee_user_id": assignee_info.get("assignee_user_id"),
+        "assignee_rationale": assignee_rationale,
+        "reply_draft": reply,
+        "triage_mode": state.get("mode") or "multi",
+        "heuristic": state.get("heuristic"),
+        "duplicate_of": duplicate.get("ticket_id"),
+        "duplicate_similarity": duplicate.get("similarity"),
+        "created_at": now
+    }
+    
+    activity_log_doc = {
+        "ticket_id": str(ticket_id),
+        "event_type": "triage_run",
+        "payload": {
+            "priority": priority_info.get("priority"),
+            "assignee": assignee_info.get("assignee_user_id"),
+            "confidence": priority_info.get("confidence"),
+            "duplicate_of": duplicate.get("ticket_id")
+        },
+        "timestamp": now
+    }
+    
+    return update_fields, triage_result_doc, activity_log_doc
@@ -1,24 +1,16 @@
 """
 PriorityAgent - Determines ticket priority using Gemini AI.
 """
-import os
 import json
 from typing import Dict
-from langchain_google_genai import ChatGoogleGenerativeAI
 from triage.state import TriageState
+from triage.llm_cache import llm_cache, make_cache_key, model_name
+from triage.llm_governor import llm_governor
+from triage.llm_registry import get_llm
 
 
-# Initialize Gemini LLM
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-USE_MOCK = os.getenv("USE_MOCK_AI", "false").lower() == "true"
-
-llm = None
-if GEMINI_API_KEY and not USE_MOCK:
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        api_key=GEMINI_API_KEY,
-        temperature=0.2
-    )
+# Bump when the prompt template changes so cached results are not reused
+PROMPT_VERSION = "1"
 
 
 async def priority_agent(state: TriageState) -> TriageState:
@@ -34,12 +26,12 @@ async def priority_agent(state: TriageState) -> TriageState:
     try:
         context = state.get("context", {})
         if not context:
-            state["error"] = "No context available for PriorityAgent"
-            return state
+            return {"error": "No context available for PriorityAgent"}
         
         # Use Gemini for priority assignment if available
-        if llm and not USE_MOCK:
-            priority_result = await _gemini_priority(context)
+        llm = get_llm("priority")
+        if llm:
+            priority_result = await _gemini_priority(llm, context, state.get("bypass_cache", False))
         else:
             # Fallback to P3 if LLM is not available
             priority_result = {
@@ -47,16 +39,23 @@ async def priority_agent(state: TriageState) -> TriageState:
                 "confidence": 0.5
             }
         
-        state["priority"] = priority_result
-        return state
+        return {"priority": priority_result}
         
     except Exception as e:
-        state["error"] = f"PriorityAgent error: {str(e)}"
-        return state
+        return {"error": f"PriorityAgent error: {str(e)}"}
 
 
-async def _gemini_priority(context: Dict) -> Dict:
+async def _gemini_priority(llm, context: Dict, bypass_cache: bool = False) -> Dict:
     """Use Gemini to determine ticket priority with comprehensive analysis framework."""
+    cache_key = make_cache_key("priority", model_name(llm), PROMPT_VERSION, {
+        "title": context.get("title", ""),
+        "body": context.get("body", ""),
+        "tags": context.get("tags", [])
+    })
+    cached = await llm_cache.get(cache_key, bypass=bypass_cache)
+    if cached is not None:
+        return cached
+    
     prompt = f"""You are an expert ticket triage analyst. Your task is to analyze the ticket below and assign the most appropriate priority level.
 
 TICKET INFORMATION:
@@ -205,7 +204,7 @@ Respond in JSON format:
 Only return priority and confidence - no rationale needed."""
     
     try:
-        response = await llm.ainvoke(prompt)
+        response = await llm_governor.ainvoke(llm, prompt, lane="priority")
         result_text = response.content.strip()
         
         # Clean JSON from markdown
@@ -225,6 +224,7 @@ Only return priority and confidence - no rationale needed."""
         # Remove rationale if present
         result.pop("rationale", None)
         
+        await llm_cache.set(cache_key, result, agent="priority")
         return result
         
     except Exception as e:
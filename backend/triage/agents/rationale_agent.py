@@ -1,25 +1,17 @@
 """
 RationaleAgent - Generates rationale for priority and assignee decisions.
 """
-import os
 import json
 from typing import Dict
-from langchain_google_genai import ChatGoogleGenerativeAI
-from database import get_users_collection
+from triage.roster import roster
 from triage.state import TriageState
+from triage.llm_cache import llm_cache, make_cache_key, model_name
+from triage.llm_governor import llm_governor
+from triage.llm_registry import get_llm
 
 
-# Initialize Gemini LLM
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-USE_MOCK = os.getenv("USE_MOCK_AI", "false").lower() == "true"
-
-llm = None
-if GEMINI_API_KEY and not USE_MOCK:
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        api_key=GEMINI_API_KEY,
-        temperature=0.2
-    )
+# Bump when the prompt template changes so cached results are not reused
+PROMPT_VERSION = "1"
 
 
 async def rationale_agent(state: TriageState) -> TriageState:
@@ -33,30 +25,30 @@ async def rationale_agent(state: TriageState) -> TriageState:
             "assignee_rationale": str
         }
     """
+    # A duplicate ticket already carries the canonical ticket's rationale
+    if state.get("duplicate") and state.get("rationale"):
+        return {"rationale": state["rationale"]}
+    
     try:
         context = state.get("context", {})
         priority_info = state.get("priority", {})
         assignee_info = state.get("assignee", {})
         
         if not context or not isinstance(context, dict) or not context.get("title"):
-            state["error"] = "No context available for RationaleAgent"
-            return state
+            return {"error": "No context available for RationaleAgent"}
         
         if not priority_info or not isinstance(priority_info, dict) or not priority_info.get("priority"):
-            state["error"] = "No priority information available for RationaleAgent"
-            return state
+            return {"error": "No priority information available for RationaleAgent"}
         
         if not assignee_info or not isinstance(assignee_info, dict):
-            state["error"] = "No assignee information available for RationaleAgent"
-            return state
+            return {"error": "No assignee information available for RationaleAgent"}
         
         # Get team name for rationale
         assignee_user_id = assignee_info.get("assignee_user_id", "unassigned")
         team_name = assignee_user_id
         
         if assignee_user_id and assignee_user_id != "unassigned":
-            users_collection = get_users_collection()
-            team = await users_collection.find_one({"_id": assignee_user_id})
+            team = await roster.get_team(assignee_user_id)
             if team:
                 team_name = team.get("name", assignee_user_id)
                 team_skills = team.get("skills", [])
@@ -66,9 +58,11 @@ async def rationale_agent(state: TriageState) -> TriageState:
             team_skills = []
         
         # Generate rationale using Gemini if available
-        if llm and not USE_MOCK:
+        llm = get_llm("rationale")
+        if llm:
             rationale_result = await _gemini_rationale(
-                context, priority_info, assignee_info, team_name, team_skills
+                llm, context, priority_info, assignee_info, team_name, team_skills,
+                state.get("bypass_cache", False)
             )
         else:
             # Fallback rationale generation
@@ -76,28 +70,30 @@ async def rationale_agent(state: TriageState) -> TriageState:
                 context, priority_info, assignee_info, team_name, team_skills
             )
         
-        state["rationale"] = rationale_result
-        return state
+        return {"rationale": rationale_result}
         
     except Exception as e:
         print(f"⚠️  RationaleAgent Exception: {type(e).__name__}: {str(e)}")
         import traceback
         traceback.print_exc()
-        state["error"] = f"RationaleAgent error: {str(e)}"
         # Provide fallback rationale
-        state["rationale"] = {
-            "priority_rationale": f"Priority {priority_info.get('priority', 'P3')} assigned based on ticket analysis.",
-            "assignee_rationale": f"Assigned to {assignee_info.get('assignee_user_id', 'unassigned')} based on skill match."
+        return {
+            "error": f"RationaleAgent error: {str(e)}",
+            "rationale": {
+                "priority_rationale": f"Priority {priority_info.get('priority', 'P3')} assigned based on ticket analysis.",
+                "assignee_rationale": f"Assigned to {assignee_info.get('assignee_user_id', 'unassigned')} based on skill match."
+            }
         }
-        return state
 
 
 async def _gemini_rationale(
+    llm,
     context: Dict,
     priority_info: Dict,
     assignee_info: Dict,
     team_name: str,
-    team_skills: list
+    team_skills: list,
+    bypass_cache: bool = False
 ) -> Dict:
     """Use Gemini to generate comprehensive rationale for priority and assignee."""
     
@@ -105,6 +101,20 @@ async def _gemini_rationale(
     confidence = priority_info.get("confidence", 0.0)
     assignee_user_id = assignee_info.get("assignee_user_id", "unassigned")
     
+    cache_key = make_cache_key("rationale", model_name(llm), PROMPT_VERSION, {
+        "title": context.get("title", ""),
+        "body": context.get("body", ""),
+        "tags": context.get("tags", []),
+        "product_area": context.get("product_area", ""),
+        "priority": priority,
+        "confidence": f"{confidence:.2f}",
+        "team_name": team_name,
+        "team_skills": team_skills[:10]
+    })
+    cached = await llm_cache.get(cache_key, bypass=bypass_cache)
+    if cached is not None:
+        return cached
+    
     prompt = f"""You are a helpdesk triage expert. Generate clear, professional rationale for ticket triage decisions.
 
 Ticket Information:
@@ -144,7 +154,7 @@ Respond in JSON format:
 }}"""
     
     try:
-        response = await llm.ainvoke(prompt)
+        response = await llm_governor.ainvoke(llm, prompt, lane="rationale")
         result_text = response.content.strip()
         
         # Clean JSON from markdown
@@ -162,6 +172,7 @@ Respond in JSON format:
         if "assignee_rationale" not in result:
             result["assignee_rationale"] = f"Assigned to {team_name} based on skill match."
         
+        await llm_cache.set(cache_key, result, agent="rationale")
         return result
         
     except Exception as e:
@@ -1,33 +1,41 @@
 """
 ReplyAgent - Generates customer reply draft (≤120 words) using Gemini.
+
+The reply is streamed: tokens are forwarded to stream_mode="custom" as they
+arrive and generation stops as soon as the draft passes 120 words. If the
+stream fails after tokens went out, the fallback reply is sent with
+reset=True so listeners replace what they have shown with it.
 """
-import os
-import json
-from langchain_google_genai import ChatGoogleGenerativeAI
+import re
+from contextlib import aclosing
+from langgraph.types import StreamWriter
 from triage.state import TriageState
+from triage.llm_cache import llm_cache, make_cache_key, model_name
+from triage.llm_governor import llm_governor
+from triage.llm_registry import get_llm
 
 
-# Initialize Gemini LLM
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-USE_MOCK = os.getenv("USE_MOCK_AI", "false").lower() == "true"
+# Bump when the prompt template changes so cached results are not reused
+PROMPT_VERSION = "1"
 
-llm = None
-if GEMINI_API_KEY and not USE_MOCK:
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        api_key=GEMINI_API_KEY,
-        temperature=0.2
-    )
+MAX_REPLY_WORDS = 120
 
 
-async def reply_agent(state: TriageState) -> TriageState:
+async def reply_agent(state: TriageState, writer: StreamWriter) -> TriageState:
     """
     Generate a customer reply draft using Gemini.
     
     STRICT REQUIREMENT: Reply must be ≤120 words.
     
+    writer is injected by LangGraph; with stream_mode="custom" it receives
+    {"node": "generate_reply", "token": str} chunks of the draft, and
+    {"node": "generate_reply", "token": str, "reset": True} when the draft
+    so far is replaced by the whole of `token`.
+    
     Returns:
-        state with reply: str
+        {
+            "reply": str
+        }
     """
     try:
         context = state.get("context", {})
@@ -35,30 +43,56 @@ async def reply_agent(state: TriageState) -> TriageState:
         assignee_info = state.get("assignee", {})
         
         if not context:
-            state["error"] = "No context available for ReplyAgent"
-            return state
+            return {"error": "No context available for ReplyAgent"}
         
         # Use Gemini for reply generation
-        if llm and not USE_MOCK:
-            reply = await _gemini_reply(context, priority_info, assignee_info)
+        llm = get_llm("reply")
+        if llm:
+            reply = await _gemini_reply(
+                llm, context, priority_info, assignee_info, state.get("bypass_cache", False), writer
+            )
         else:
             reply = _mock_reply(context, priority_info, assignee_info)
+            _emit(writer, reply)
         
-        state["reply"] = reply
-        return state
+        return {"reply": reply}
         
     except Exception as e:
-        state["error"] = f"ReplyAgent error: {str(e)}"
-        return state
+        return {"error": f"ReplyAgent error: {str(e)}"}
+
 
+def _emit(writer: StreamWriter, token: str, reset: bool = False):
+    """Forward part of the draft to stream_mode="custom" listeners (reset: all of it, replacing what was sent)."""
+    if writer and reset:
+        writer({"node": "generate_reply", "token": token, "reset": True})
+    elif writer and token:
+        writer({"node": "generate_reply", "token": token})
 
-async def _gemini_reply(context: dict, priority_info: dict, assignee_info: dict) -> str:
+
+async def _gemini_reply(
+    llm,
+    context: dict,
+    priority_info: dict,
+    assignee_info: dict,
+    bypass_cache: bool = False,
+    writer: StreamWriter = None
+) -> str:
     """Generate reply using Gemini with strict 120-word limit."""
     
     priority = priority_info.get("priority", "P3")
     title = context.get("title", "")
     body = context.get("body", "")
     
+    cache_key = make_cache_key("reply", model_name(llm), PROMPT_VERSION, {
+        "title": title,
+        "body": body,
+        "priority": priority
+    })
+    cached = await llm_cache.get(cache_key, bypass=bypass_cache)
+    if cached is not None:
+        _emit(writer, cached)
+        return cached
+    
     prompt = f"""You are a professional customer support agent. Write a friendly first reply to this ticket.
 
 Ticket Title: {title}
@@ -79,20 +113,48 @@ CRITICAL REQUIREMENTS:
 Respond ONLY with the reply text (no JSON, no extra formatting).
 Word count must be ≤120 words."""
     
+    text = ""
+    sent = 0
+    truncated = False
     try:
-        response = await llm.ainvoke(prompt)
-        reply_text = response.content.strip()
+        # aclosing releases the governor slot as soon as we stop reading
+        async with aclosing(llm_governor.astream(llm, prompt, lane="reply")) as stream:
+            async for chunk in stream:
+                text += chunk.content if isinstance(chunk.content, str) else ""
+                
+                # Enforce the word limit on the fly: once a 121st word has started,
+                # the 120th is complete, so cut there and stop generating
+                cutoff = _word_limit_cutoff(text, MAX_REPLY_WORDS)
+                if cutoff is not None:
+                    _emit(writer, text[sent:cutoff] + "...")
+                    text = text[:cutoff]
+                    truncated = True
+                    break
+                
+                _emit(writer, text[sent:])
+                sent = len(text)
         
-        # Ensure word count ≤120
-        words = reply_text.split()
-        if len(words) > 120:
-            reply_text = " ".join(words[:120]) + "..."
-        
-        return reply_text
+        if not text.strip():
+            raise ValueError("Empty reply from Gemini")
         
     except Exception as e:
         print(f"Gemini reply error: {e}")
-        return _mock_reply(context, priority_info, assignee_info)
+        reply_text = _mock_reply(context, priority_info, assignee_info)
+        # Listeners may already show part of the failed draft; the fallback replaces it
+        _emit(writer, reply_text, reset=sent > 0)
+        return reply_text
+    
+    reply_text = text.strip() + ("..." if truncated else "")
+    await llm_cache.set(cache_key, reply_text, agent="reply")
+    return reply_text
+
+
+def _word_limit_cutoff(text: str, max_words: int):
+    """End index of the max_words-th word if text already has more words, else None."""
+    words = list(re.finditer(r"\S+", text))
+    if len(words) > max_words:
+        return words[max_words - 1].end()
+    return None
 
 
 def _mock_reply(context: dict, priority_info: dict, assignee_info: dict) -> str:
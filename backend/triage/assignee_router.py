@@ -0,0 +1,200 @@
+"""
+AssigneeRouter - Local linear model that predicts the assignee team.
+
+Tickets are turned into hashed features (title/body words and bigrams,
+tags, product area) and scored by a multinomial logistic regression
+trained offline with train_assignee_router.py from past triage results
+and human reassignments. Inference is a sparse dot product, well under a
+millisecond, so AssigneeAgent only calls Gemini when the model's margin
+between its top two teams is low.
+
+The model is a single .npz file (ASSIGNEE_ROUTER_PATH) loaded at startup;
+without it AssigneeAgent works exactly as before.
+"""
+import os
+import time
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from triage.skill_matcher import tokenize
+
+
+ASSIGNEE_ROUTER_PATH = os.getenv(
+    "ASSIGNEE_ROUTER_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "artifacts", "assignee_router.npz")
+)
+# Skip the assignee LLM call when top-1 minus top-2 probability reaches this
+ASSIGNEE_ROUTER_MIN_MARGIN = float(os.getenv("ASSIGNEE_ROUTER_MIN_MARGIN", "0.35"))
+# Candidates the model hands to Gemini when it is not confident
+ASSIGNEE_ROUTER_TOP_K = int(os.getenv("ASSIGNEE_ROUTER_TOP_K", "5"))
+
+DEFAULT_FEATURES = 2 ** 16
+
+
+def ticket_features(context: Dict, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashed, L2-normalized features as (indices, values).
+
+    Words and word bigrams from title + body, plus tags and product area
+    as their own namespaces. A hash bit picks the sign so collisions tend
+    to cancel out instead of adding up.
+    """
+    words = tokenize(f"{context.get('title') or ''} {context.get('body') or ''}")
+    terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    terms += [f"tag:{tag.lower()}" for tag in context.get("tags") or []]
+    if context.get("product_area"):
+        terms.append(f"area:{context['product_area'].lower()}")
+
+    counts: Dict[int, float] = {}
+    for term in terms:
+        h = zlib.crc32(term.encode("utf-8"))
+        index = h % n_features
+        counts[index] = counts.get(index, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+
+    if not counts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    # Sublinear term frequency, then unit length
+    values = np.sign(values) * np.log1p(np.abs(values))
+    norm = np.linalg.norm(values)
+    if norm > 0:
+        values /= norm
+    return indices, values
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def train(
+    contexts: Sequence[Dict],
+    labels: Sequence[str],
+    sample_weights: Optional[Sequence[float]] = None,
+    n_features: int = DEFAULT_FEATURES,
+    epochs: int = 200,
+    learning_rate: float = 2.0,
+    l2: float = 1e-4
+) -> "AssigneeRouter":
+    """
+    Fit a multinomial logistic regression with full-batch gradient descent.
+
+    `sample_weights` scale each ticket's loss (human reassignments count
+    more than labels the triage pipeline produced itself).
+    """
+    classes = sorted(set(labels))
+    class_index = {c: i for i, c in enumerate(classes)}
+    y = np.array([class_index[label] for label in labels], dtype=np.int64)
+    weights = np.ones(len(labels), dtype=np.float32) if sample_weights is None else np.asarray(sample_weights, dtype=np.float32)
+    weights = weights / weights.sum()
+
+    # Sparse rows in CSR form: row_of[k] is the ticket that nonzero k belongs to
+    features = [ticket_features(context, n_features) for context in contexts]
+    indices = np.concatenate([f[0] for f in features])
+    values = np.concatenate([f[1] for f in features])
+    row_of = np.repeat(np.arange(len(features)), [len(f[0]) for f in features])
+
+    W = np.zeros((len(classes), n_features), dtype=np.float32)
+    b = np.zeros(len(classes), dtype=np.float32)
+    targets = np.zeros((len(labels), len(classes)), dtype=np.float32)
+    targets[np.arange(len(labels)), y] = 1.0
+
+    for _ in range(epochs):
+        logits = np.zeros((len(labels), len(classes)), dtype=np.float32)
+        np.add.at(logits, row_of, (W[:, indices] * values).T)
+        error = (_softmax(logits + b) - targets) * weights[:, None]
+        grad_W = np.zeros((n_features, len(classes)), dtype=np.float32)
+        np.add.at(grad_W, indices, error[row_of] * values[:, None])
+        W -= learning_rate * (grad_W.T + l2 * W)
+        b -= learning_rate * error.sum(axis=0)
+
+    return AssigneeRouter(W, b, classes, trained_at=time.time(), samples=len(labels))
+
+
+class AssigneeRouter:
+    """Trained weights plus the team id for each row."""
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, classes: List[str], trained_at: float = 0.0, samples: int = 0):
+        self.weights = weights
+        self.bias = bias
+        self.classes = list(classes)
+        self.n_features = weights.shape[1]
+        self.trained_at = trained_at
+        self.samples = samples
+
+    def predict(self, context: Dict, top_k: Optional[int] = ASSIGNEE_ROUTER_TOP_K) -> List[Tuple[str, float]]:
+        """Top-k (team_id, probability), most likely first; top_k=None returns every team."""
+        indices, values = ticket_features(context, self.n_features)
+        probabilities = _softmax(self.weights[:, indices] @ values + self.bias)
+        order = np.argsort(-probabilities, kind="stable")[:top_k]
+        return [(self.classes[i], float(probabilities[i])) for i in order]
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                weights=self.weights,
+                bias=self.bias,
+                classes=np.array(self.classes, dtype=np.str_),
+                trained_at=np.float64(self.trained_at),
+                samples=np.int64(self.samples)
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "AssigneeRouter":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["weights"],
+                data["bias"],
+                [str(c) for c in data["classes"]],
+                trained_at=float(data["trained_at"]),
+                samples=int(data["samples"])
+            )
+
+
+class RouterHolder:
+    """The model this process uses, loaded once at startup."""
+
+    def __init__(self, path: str = ASSIGNEE_ROUTER_PATH):
+        self.path = path
+        self.model: Optional[AssigneeRouter] = None
+        self.error: Optional[str] = None
+        # Metrics
+        self.decided = 0
+        self.deferred = 0
+
+    def load(self) -> Optional[AssigneeRouter]:
+        """Load the model file if it exists (a missing file just disables the router)."""
+        self.model = None
+        self.error = None
+        if not os.path.exists(self.path):
+            return None
+        try:
+            self.model = AssigneeRouter.load(self.path)
+        except Exception as e:
+            self.error = str(e)
+            print(f"⚠️  Could not load assignee router from {self.path}: {e}")
+        return self.model
+
+    def status(self) -> dict:
+        """Model details for /ready and /metrics."""
+        if self.model is None:
+            return {"loaded": False, "path": self.path, "error": self.error}
+        return {
+            "loaded": True,
+            "path": self.path,
+            "teams": len(self.model.classes),
+            "samples": self.model.samples,
+            "trained_at": self.model.trained_at,
+            "min_margin": ASSIGNEE_ROUTER_MIN_MARGIN,
+            "decided": self.decided,
+            "deferred": self.deferred
+        }
+
+
+assignee_router = RouterHolder()
@@ -0,0 +1,251 @@
+"""
+Batch triage - Triage many tickets with bulk reads and writes.
+
+Per-ticket triage pays for its own ticket lookup, comment and attachment
+queries, team-name lookup and three writes. Here tickets, comments and
+attachments are fetched with $in queries, the graphs run without
+ContextDetailer/PersistNode under TRIAGE_BATCH_CONCURRENCY, and results
+are written with one bulk_write (preceded by a read of the tickets'
+counted fields, for the stats) and two insert_many calls.
+"""
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from database import (
+    get_tickets_collection,
+    get_triage_results_collection,
+    get_activity_logs_collection
+)
+from models import get_ist_now
+from services.ticket_stats import STATS_PROJECTION, record_ticket_changes
+from triage.roster import roster
+from triage.engine import triage_engine, build_triage_response
+from triage.agents.context_detailer import fetch_contexts
+from triage.agents.persist_node import build_persist_docs
+
+
+# LLM stages in flight at once for a batch
+TRIAGE_BATCH_CONCURRENCY = int(os.getenv("TRIAGE_BATCH_CONCURRENCY", "8"))
+# Largest batch accepted by POST /tickets/triage:batch
+TRIAGE_BATCH_MAX_IDS = int(os.getenv("TRIAGE_BATCH_MAX_IDS", "500"))
+
+
+async def run_triage_batch(
+    ticket_ids: List[str],
+    mode: Optional[str] = None,
+    bypass_cache: bool = False,
+    concurrency: int = TRIAGE_BATCH_CONCURRENCY
+) -> List[Dict]:
+    """
+    Triage and persist a batch of tickets.
+
+    Returns one item per distinct ticket id, in request order:
+        {"ticket_id": str, "status": "succeeded"|"failed", "result": dict|None, "error": str|None}
+    """
+    ticket_ids = list(dict.fromkeys(ticket_ids))
+    errors: Dict[str, str] = {}
+
+    valid_ids = []
+    for ticket_id in ticket_ids:
+        if ObjectId.is_valid(ticket_id):
+            valid_ids.append(ticket_id)
+        else:
+            errors[ticket_id] = "Invalid ticket ID format"
+
+    # 1. BULK READS
+    tickets = {}
+    if valid_ids:
+        cursor = get_tickets_collection().find({"_id": {"$in": [ObjectId(t) for t in valid_ids]}})
+        async for ticket in cursor:
+            tickets[str(ticket["_id"])] = ticket
+    for ticket_id in valid_ids:
+        if ticket_id not in tickets:
+            errors[ticket_id] = "Ticket not found"
+
+    contexts = await fetch_contexts(list(tickets.values())) if tickets else {}
+    # Load the roster once so a TTL reload cannot land in the middle of the batch
+    teams = await roster.get_teams()
+
+    # 2. LLM STAGES
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def triage_one(ticket_id: str) -> dict:
+        async with slots:
+            return await triage_engine.run(
+                tickets[ticket_id], mode, bypass_cache, persist=False, context=contexts[ticket_id]
+            )
+
+    triaged_ids = list(tickets)
+    outcomes = await asyncio.gather(*(triage_one(t) for t in triaged_ids), return_exceptions=True)
+
+    states = {}
+    for ticket_id, outcome in zip(triaged_ids, outcomes):
+        if isinstance(outcome, Exception):
+            errors[ticket_id] = f"AI triage failed: {str(outcome)}"
+        elif outcome.get("error"):
+            errors[ticket_id] = f"AI triage failed: {outcome['error']}"
+        else:
+            states[ticket_id] = outcome
+
+    # 3. BULK WRITES
+    if states:
+        team_names = {team["user_id"]: team.get("name", team["user_id"]) for team in teams}
+        try:
+            failures = await _persist_states(states, team_names)
+        except Exception as e:
+            failures = {ticket_id: str(e) for ticket_id in states}
+        for ticket_id, error in failures.items():
+            errors[ticket_id] = f"Persist failed: {error}"
+            states.pop(ticket_id, None)
+
+    await _log_failures({t: e for t, e in errors.items() if t in tickets})
+
+    return [
+        {
+            "ticket_id": ticket_id,
+            "status": "failed" if ticket_id in errors else "succeeded",
+            "result": build_triage_response(states[ticket_id]) if ticket_id in states else None,
+            "error": errors.get(ticket_id)
+        }
+        for ticket_id in ticket_ids
+    ]
+
+
+async def _persist_states(states: Dict[str, Dict], team_names: Dict[str, str]) -> Dict[str, str]:
+    """
+    Write every ticket update, triage result and activity log in three bulk calls.
+
+    Returns {ticket_id: error} for tickets with a write that did not land.
+    Stats are recorded for every ticket update that did.
+    """
+    now = get_ist_now()
+    ticket_ids = list(states)
+    ticket_updates, triage_results, activity_logs = [], [], []
+    for ticket_id in ticket_ids:
+        state = states[ticket_id]
+        assignee_user_id = (state.get("assignee") or {}).get("assignee_user_id", "unassigned")
+        update_fields, triage_result_doc, activity_log_doc = build_persist_docs(
+            state, team_names.get(assignee_user_id, assignee_user_id), now
+        )
+        ticket_updates.append(update_fields)
+        triage_results.append(triage_result_doc)
+        activity_logs.append(activity_log_doc)
+
+    # Unordered: one bad document must not stop the rest of the batch
+    outcomes = await asyncio.gather(
+        _write_tickets([states[t]["ticket"]["_id"] for t in ticket_ids], ticket_updates),
+        get_triage_results_collection().insert_many(triage_results, ordered=False),
+        get_activity_logs_collection().insert_many(activity_logs, ordered=False),
+        return_exceptions=True
+    )
+    if isinstance(outcomes[0], BaseException):
+        ticket_failures, stats_changes = _failed_positions(outcomes[0], len(ticket_ids)), []
+    else:
+        ticket_failures, stats_changes = outcomes[0]
+
+    # After the ticket writes: this also moves the list ETag revision
+    await record_ticket_changes(stats_changes)
+
+    failures = {}
+    # Ticket update errors take precedence over result and log errors for the same ticket
+    for position_errors in (_failed_positions(outcomes[2], len(ticket_ids)),
+                            _failed_positions(outcomes[1], len(ticket_ids)),
+                            ticket_failures):
+        for position, error in position_errors.items():
+            failures[ticket_ids[position]] = error
+    return failures
+
+
+async def _write_tickets(object_ids: List, updates: List[Dict]) -> Tuple[Dict[int, str], List[Tuple[Dict, Dict]]]:
+    """
+    Apply the ticket updates in one bulk_write, counted from the stored tickets.
+
+    The tickets' stats fields are read just before the write (the batch's
+    own copies are minutes old) and each update only applies while the
+    revision is unchanged, so a ticket edited in between is reported as
+    failed instead of being counted from stale values. Returns
+    ({position: error}, [(before, after)] for the updates that landed).
+    """
+    collection = get_tickets_collection()
+    stored = {
+        ticket["_id"]: ticket
+        async for ticket in collection.find({"_id": {"$in": object_ids}}, {**STATS_PROJECTION, "revision": 1})
+    }
+
+    failures, requests, positions = {}, [], []
+    for position, (object_id, update_fields) in enumerate(zip(object_ids, updates)):
+        before = stored.get(object_id)
+        if before is None:
+            failures[position] = "Ticket not found"
+            continue
+        requests.append(UpdateOne(
+            {"_id": object_id, "revision": before.get("revision")},
+            {"$set": update_fields, "$inc": {"revision": 1}}
+        ))
+        positions.append(position)
+    if not requests:
+        return failures, []
+
+    try:
+        matched = (await collection.bulk_write(requests, ordered=False)).matched_count
+    except BulkWriteError as e:
+        matched = e.details.get("nMatched", 0)
+        for index, error in _failed_positions(e, len(requests)).items():
+            failures[positions[index]] = error
+
+    landed = [position for position in positions if position not in failures]
+    if matched < len(landed):
+        # Some guards did not match: a ticket still carrying this write's updated_at is ours
+        # (one edited again right after ours is reported too, and left to a reconcile run)
+        written_at = {
+            ticket["_id"]: ticket.get("updated_at")
+            async for ticket in collection.find({"_id": {"$in": [object_ids[p] for p in landed]}}, {"updated_at": 1})
+        }
+        for position in landed:
+            if _millis(written_at.get(object_ids[position])) != _millis(updates[position]["updated_at"]):
+                failures[position] = "Ticket changed during triage; triage it again"
+
+    changes = [
+        (stored[object_ids[position]], {**stored[object_ids[position]], **updates[position]})
+        for position in positions if position not in failures
+    ]
+    return failures, changes
+
+
+def _millis(value) -> Optional[int]:
+    """A datetime at the millisecond precision MongoDB stores."""
+    return int(value.timestamp() * 1000) if isinstance(value, datetime) else None
+
+
+def _failed_positions(outcome, count: int) -> Dict[int, str]:
+    """{position: error} for the operations of one bulk call that did not land."""
+    if not isinstance(outcome, BaseException):
+        return {}
+    if isinstance(outcome, BulkWriteError):
+        # Only the listed operations failed; the rest of the unordered batch was written
+        return {error["index"]: error.get("errmsg", str(outcome)) for error in outcome.details.get("writeErrors", [])}
+    # Anything else (e.g. a network error) leaves every operation in doubt
+    return {position: str(outcome) for position in range(count)}
+
+
+async def _log_failures(errors: Dict[str, str]):
+    """Record triage_failed activity logs for tickets that exist but failed."""
+    if not errors:
+        return
+    now = get_ist_now()
+    try:
+        await get_activity_logs_collection().insert_many([
+            {
+                "ticket_id": ticket_id,
+                "event_type": "triage_failed",
+                "payload": {"error": error},
+                "timestamp": now
+            }
+            for ticket_id, error in errors.items()
+        ], ordered=False)
+    except Exception as e:
+        print(f"⚠️  Could not log batch triage failures: {e}")
@@ -0,0 +1,158 @@
+"""
+Near-duplicate tickets - MinHash signatures with LSH banding.
+
+create_ticket stores a MinHash signature of the normalised title and
+description (dedup_signature) plus its LSH band keys (dedup_bands).
+Tickets that share any band key are candidates; the fraction of equal
+signature slots estimates their Jaccard similarity over character
+shingles. DuplicateDetector uses this to reuse a recent triage result
+for near-identical tickets (e.g. an outage storm of "dashboard down").
+"""
+import os
+import zlib
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from database import get_tickets_collection, get_triage_results_collection
+from models import get_ist_now
+from triage.skill_matcher import tokenize
+
+
+TICKET_DEDUP_ENABLED = os.getenv("TICKET_DEDUP_ENABLED", "true").lower() == "true"
+# Estimated Jaccard similarity at which a ticket reuses another's triage
+TICKET_DEDUP_THRESHOLD = float(os.getenv("TICKET_DEDUP_THRESHOLD", "0.7"))
+# Only triage results newer than this are reused
+TICKET_DEDUP_WINDOW_SECONDS = float(os.getenv("TICKET_DEDUP_WINDOW_SECONDS", "21600"))
+# Generate a new reply for duplicates instead of reusing the canonical ticket's
+TICKET_DEDUP_FRESH_REPLY = os.getenv("TICKET_DEDUP_FRESH_REPLY", "false").lower() == "true"
+
+# 16 bands x 4 rows: pairs at 0.7 similarity share a band ~99% of the time,
+# pairs at 0.3 about 12% (and are then rejected by the signature comparison)
+BANDS = 16
+ROWS = 4
+NUM_HASHES = BANDS * ROWS
+SHINGLE_SIZE = 5
+CANDIDATE_LIMIT = 50
+# triage_results fields a duplicate reuses (see duplicate_detector.reuse_triage_result)
+REUSED_RESULT_FIELDS = {
+    field: 1 for field in (
+        "ticket_id", "duplicate_of", "priority", "priority_confidence", "priority_rationale",
+        "assignee_user_id", "assignee_rationale", "reply_draft", "created_at"
+    )
+}
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240611)
+_A = _rng.integers(1, _PRIME, size=NUM_HASHES, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=NUM_HASHES, dtype=np.uint64)
+
+
+def normalize(title: str, description: str) -> str:
+    """Lowercase words joined by single spaces (punctuation and plurals folded)."""
+    return " ".join(tokenize(f"{title or ''} {description or ''}"))
+
+
+def minhash_signature(text: str) -> List[int]:
+    """MinHash of the text's character shingles ([] for empty text)."""
+    if not text:
+        return []
+    if len(text) <= SHINGLE_SIZE:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) & _PRIME for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+    # (a*x + b) mod p for every hash function at once; a, x < 2^31 so nothing overflows
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return permuted.min(axis=1).tolist()
+
+
+def band_keys(signature: List[int]) -> List[str]:
+    """One key per LSH band; tickets sharing a key are duplicate candidates."""
+    if not signature:
+        return []
+    return [
+        f"{band}:{zlib.crc32(repr(signature[band * ROWS:(band + 1) * ROWS]).encode('utf-8')):08x}"
+        for band in range(BANDS)
+    ]
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not a or len(a) != len(b):
+        return 0.0
+    return float(np.mean(np.asarray(a) == np.asarray(b)))
+
+
+def dedup_fields(title: str, description: str) -> Dict:
+    """Ticket fields create_ticket/update_ticket store for duplicate lookup."""
+    signature = minhash_signature(normalize(title, description))
+    return {"dedup_signature": signature, "dedup_bands": band_keys(signature)}
+
+
+class DuplicateIndex:
+    """Queries over the dedup fields stored on tickets."""
+
+    async def find_canonical(self, ticket: Dict) -> Optional[Tuple[Dict, float]]:
+        """
+        Most similar other ticket with a recent triage result.
+
+        Returns (triage_result, similarity) or None. A result that was itself
+        reused from another ticket points at that ticket via duplicate_of.
+        A ticket whose priority or assignee was changed by hand since its
+        latest result is not reused: the stored rationale and reply no longer
+        match it.
+        """
+        signature = ticket.get("dedup_signature")
+        bands = ticket.get("dedup_bands")
+        if not signature or not bands:
+            return None
+
+        cutoff = get_ist_now() - timedelta(seconds=TICKET_DEDUP_WINDOW_SECONDS)
+        candidates = []
+        cursor = get_tickets_collection().find(
+            {
+                "dedup_bands": {"$in": bands},
+                "_id": {"$ne": ticket["_id"]},
+                # Untriaged tickets from the same storm cannot be reused, so skip them
+                "priority": {"$ne": None},
+                # Triage sets updated_at, so older tickets have no result inside the window
+                "updated_at": {"$gte": cutoff}
+            },
+            {"dedup_signature": 1, "priority": 1, "assignee_user_id": 1}
+        ).sort("updated_at", -1).limit(CANDIDATE_LIMIT)
+        current = {}
+        async for candidate in cursor:
+            score = similarity(signature, candidate.get("dedup_signature") or [])
+            if score >= TICKET_DEDUP_THRESHOLD:
+                candidates.append((str(candidate["_id"]), score))
+                current[str(candidate["_id"])] = _triage_outcome(candidate)
+        if not candidates:
+            return None
+
+        scores = dict(candidates)
+        seen, best = set(), None
+        async for result in get_triage_results_collection().find(
+            {"ticket_id": {"$in": list(scores)}, "created_at": {"$gte": cutoff}},
+            REUSED_RESULT_FIELDS
+        ).sort("created_at", -1):
+            ticket_id = result["ticket_id"]
+            # Only the newest result per ticket counts, and only if the ticket still agrees with it
+            if ticket_id in seen:
+                continue
+            seen.add(ticket_id)
+            if _triage_outcome(result) != current[ticket_id]:
+                continue
+            # The most similar ticket wins
+            if best is None or scores[ticket_id] > best[1]:
+                best = (result, scores[ticket_id])
+        return best
+
+
+def _triage_outcome(doc: Dict) -> Tuple[Optional[str], str]:
+    """(priority, assignee) of a ticket or triage result, as persist_node stores them on the ticket."""
+    return doc.get("priority"), doc.get("assignee_user_id") or "unassigned"
+
+
+duplicate_index = DuplicateIndex()
@@ -0,0 +1,192 @@
+"""
+TriageEngine - Long-lived triage runtime built once per process.
+
+Holds the compiled LangGraph workflow, the LLM clients, the team roster
+and a primed MongoDB pool so individual triage requests only pay for the
+work that is specific to their ticket.
+"""
+import os
+import time
+from typing import AsyncIterator, Dict, Optional
+from database import get_database
+from triage.graph import create_triage_graph, TRIAGE_MODES
+from triage.roster import roster
+from triage.assignee_router import assignee_router
+from triage.llm_registry import llm_registry
+
+
+# Default workflow when a request does not choose one ("multi" or "fused")
+TRIAGE_MODE = os.getenv("TRIAGE_MODE", "multi").lower()
+if TRIAGE_MODE not in TRIAGE_MODES:
+    print(f"⚠️  Unknown TRIAGE_MODE '{TRIAGE_MODE}', using 'multi'")
+    TRIAGE_MODE = "multi"
+
+
+class TriageEngine:
+    """Process-wide triage engine, warmed up in the FastAPI lifespan."""
+
+    def __init__(self):
+        self.graphs: Dict[str, object] = {}
+        self.llm_clients: Dict[str, Optional[dict]] = {}
+        self.ready = False
+        self.warmup_error: Optional[str] = None
+        self.warmup_seconds: Optional[float] = None
+
+    async def warm_up(self):
+        """
+        Build everything a triage run needs:
+        1. Compile the triage graphs
+        2. Create the shared LLM clients
+        3. Prime the MongoDB connection pool
+        4. Load the team roster
+        5. Load the trained assignee router, if there is one
+        """
+        started = time.perf_counter()
+        self.ready = False
+        self.warmup_error = None
+
+        try:
+            for mode in TRIAGE_MODES:
+                self._graph(mode)
+                self._graph(mode, persist=False)
+
+            llm_registry.warm_up()
+            self.llm_clients = llm_registry.status()
+
+            # A ping opens the first pooled connection before traffic arrives
+            await get_database().command("ping")
+            await roster.load()
+            assignee_router.load()
+
+            self.ready = True
+            print(f"Triage engine ready ({len(roster.teams)} teams)")
+        except Exception as e:
+            self.warmup_error = str(e)
+            print(f"⚠️  Triage engine warm-up failed: {e}")
+        finally:
+            self.warmup_seconds = time.perf_counter() - started
+
+    def _graph(self, mode: str, persist: bool = True):
+        """Return the compiled graph for a mode, compiling it once."""
+        key = mode if persist else f"{mode}:no_persist"
+        if key not in self.graphs:
+            self.graphs[key] = create_triage_graph(mode, persist=persist)
+        return self.graphs[key]
+
+    async def run(
+        self,
+        ticket: dict,
+        mode: Optional[str] = None,
+        bypass_cache: bool = False,
+        persist: bool = True,
+        context: Optional[dict] = None
+    ) -> dict:
+        """
+        Run the triage workflow for a ticket and return the final state.
+
+        bypass_cache forces fresh LLM calls (results still refresh the cache).
+        persist=False skips persist_node and a prefetched context skips
+        ContextDetailer; batch triage uses both to do its I/O in bulk.
+        """
+        mode = mode or TRIAGE_MODE
+        # Triage still works if warm-up was skipped or failed; the graph is compiled on first use
+        graph = self._graph(mode, persist)
+        return await graph.ainvoke(_initial_state(ticket, mode, bypass_cache, context))
+
+    async def stream(self, ticket: dict, mode: Optional[str] = None, bypass_cache: bool = False) -> AsyncIterator[dict]:
+        """
+        Run the triage workflow and yield progress as each node finishes.
+
+        Yields {"event": "node", "node", "output", "node_ms", "elapsed_ms"} per
+        node, {"event": "token", "node", "token"[, "reset"]} for each reply-draft chunk,
+        then {"event": "final", "state", "elapsed_ms"}. node_ms is measured
+        from the start of the node's graph step (nodes in one step run in parallel).
+        """
+        mode = mode or TRIAGE_MODE
+        graph = self._graph(mode)
+
+        started = step_started = time.perf_counter()
+        final_state = None
+        async for stream_mode, chunk in graph.astream(
+            _initial_state(ticket, mode, bypass_cache),
+            stream_mode=["updates", "values", "custom"]
+        ):
+            now = time.perf_counter()
+            if stream_mode == "custom":
+                # Written by nodes through their StreamWriter (reply tokens)
+                yield {"event": "token", **chunk}
+                continue
+            if stream_mode == "values":
+                # Full state after every step; the last one is the final state
+                final_state = chunk
+                step_started = now
+                continue
+            for node, output in chunk.items():
+                yield {
+                    "event": "node",
+                    "node": node,
+                    "output": output,
+                    "node_ms": round((now - step_started) * 1000, 1),
+                    "elapsed_ms": round((now - started) * 1000, 1)
+                }
+
+        yield {
+            "event": "final",
+            "state": final_state or {},
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def status(self) -> dict:
+        """Readiness details for the /ready endpoint."""
+        return {
+            "ready": self.ready,
+            "graphs_compiled": sorted(self.graphs),
+            "default_mode": TRIAGE_MODE,
+            "llm_clients": self.llm_clients,
+            "teams": len(roster.teams),
+            "assignee_router": assignee_router.status(),
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.warmup_error
+        }
+
+
+def _initial_state(ticket: dict, mode: str, bypass_cache: bool, context: Optional[dict] = None) -> dict:
+    """Initial workflow state for a ticket."""
+    return {
+        "ticket": ticket,
+        "mode": mode,
+        "bypass_cache": bypass_cache,
+        "context": context,
+        "priority": None,
+        "assignee": None,
+        "rationale": None,
+        "reply": None,
+        "heuristic": None,
+        "duplicate": None,
+        "persist_timings": None,
+        "error": None
+    }
+
+
+def build_triage_response(final_state: dict) -> dict:
+    """Build TriageResponse fields from the final workflow state."""
+    priority_info = final_state.get("priority") or {}
+    assignee_info = final_state.get("assignee") or {}
+    rationale_info = final_state.get("rationale") or {}
+    reply = final_state.get("reply") or ""
+
+    # Combine rationales from RationaleAgent
+    priority_rationale = rationale_info.get("priority_rationale", "")
+    assignee_rationale = rationale_info.get("assignee_rationale", "")
+    combined_rationale = f"{priority_rationale} | {assignee_rationale}" if priority_rationale and assignee_rationale else (priority_rationale or assignee_rationale)
+
+    return {
+        "priority": priority_info.get("priority", "P3"),
+        "confidence": priority_info.get("confidence", 0.0),
+        "assignee": assignee_info.get("assignee_user_id", "unassigned"),
+        "rationale": combined_rationale,
+        "reply_draft": reply
+    }
+
+
+triage_engine = TriageEngine()
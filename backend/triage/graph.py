@@ -4,10 +4,13 @@ LangGraph workflow definition for multi-agent ticket triage.
 from langgraph.graph import StateGraph, END
 from triage.state import TriageState
 from triage.agents.context_detailer import context_detailer
+from triage.agents.duplicate_detector import duplicate_detector
+from triage.agents.heuristic_classifier import heuristic_classifier
 from triage.agents.priority_agent import priority_agent
 from triage.agents.assignee_agent import assignee_agent
 from triage.agents.rationale_agent import rationale_agent
 from triage.agents.reply_agent import reply_agent
+from triage.agents.fused_agent import fused_triage_agent
 from triage.agents.persist_node import persist_node
 
 # Workaround for langchain.debug attribute error
@@ -21,33 +24,110 @@ except ImportError:
     pass
 
 
-def create_triage_graph():
+# "multi": one agent (and one LLM call) per field; "fused": a single LLM call for all fields
+TRIAGE_MODES = ("multi", "fused")
+
+# Independent final steps of the multi-agent flow
+FAN_OUT = ["generate_rationale", "generate_reply"]
+
+
+def _reuses_reply(state: TriageState) -> bool:
+    """Duplicate whose canonical reply was copied too - nothing left to generate."""
+    return bool(state.get("duplicate")) and bool(state.get("reply"))
+
+
+def _after_classify(state: TriageState):
+    """Skip the LLM agents whose field the heuristic classifier already set."""
+    if not state.get("priority"):
+        return "determine_priority"
+    if not state.get("assignee"):
+        return "assign_user"
+    return FAN_OUT
+
+
+def _after_priority(state: TriageState):
+    return FAN_OUT if state.get("assignee") else "assign_user"
+
+
+def create_triage_graph(mode: str = "multi", persist: bool = True):
     """
     Create and compile the LangGraph triage workflow.
     
-    Flow:
-        context_detailer → priority_agent → assignee_agent → rationale_agent → reply_agent → persist_node → END
+    Multi-agent flow:
+        duplicate_detector → context_detailer → heuristic_classifier → priority_agent → assignee_agent ─┬→ rationale_agent ─┬→ persist_node → END
+                                                                                                        └→ reply_agent ─────┘
+    
+    duplicate_detector copies the triage of a recent near-identical ticket.
+    With its reply as well the graph goes straight to persist_node; with
+    TICKET_DEDUP_FRESH_REPLY it continues to reply_agent only (rationale_agent
+    passes the copied rationale through).
+    
+    heuristic_classifier sets priority and/or assignee when its keyword and
+    skill-match confidence reaches TRIAGE_HEURISTIC_THRESHOLD; conditional
+    edges then skip the corresponding agent (and its LLM call).
+    
+    RationaleAgent and ReplyAgent do not depend on each other, so they run in
+    the same step and persist_node waits for both.
+    
+    Fused flow:
+        duplicate_detector → context_detailer → fused_triage_agent → persist_node → END
+    (duplicates needing a fresh reply go context_detailer → reply_agent instead)
+    
+    With persist=False the graph ends before persist_node and the caller
+    writes the results itself.
     """
+    if mode not in TRIAGE_MODES:
+        raise ValueError(f"Unknown triage mode: {mode}")
     
     # Initialize graph with state schema
     workflow = StateGraph(TriageState)
+    workflow.add_node("find_duplicate", duplicate_detector)
+    workflow.add_node("fetch_context", context_detailer)
+    workflow.set_entry_point("find_duplicate")
+    
+    if persist:
+        workflow.add_node("save_results", persist_node)
+        workflow.add_edge("save_results", END)
+    last_node = "save_results" if persist else END
+    
+    workflow.add_conditional_edges(
+        "find_duplicate",
+        lambda state: last_node if _reuses_reply(state) else "fetch_context",
+        ["fetch_context", last_node]
+    )
+    
+    if mode == "fused":
+        workflow.add_node("fused_triage", fused_triage_agent)
+        workflow.add_node("generate_reply", reply_agent)
+        workflow.add_conditional_edges(
+            "fetch_context",
+            lambda state: "generate_reply" if state.get("duplicate") else "fused_triage",
+            ["fused_triage", "generate_reply"]
+        )
+        workflow.add_edge("fused_triage", last_node)
+        workflow.add_edge("generate_reply", last_node)
+        return workflow.compile()
     
     # Add nodes (using unique names that don't conflict with state keys)
-    workflow.add_node("fetch_context", context_detailer)
+    workflow.add_node("classify_ticket", heuristic_classifier)
     workflow.add_node("determine_priority", priority_agent)
     workflow.add_node("assign_user", assignee_agent)
     workflow.add_node("generate_rationale", rationale_agent)
     workflow.add_node("generate_reply", reply_agent)
-    workflow.add_node("save_results", persist_node)
     
-    # Define edges (sequential flow)
-    workflow.set_entry_point("fetch_context")
-    workflow.add_edge("fetch_context", "determine_priority")
-    workflow.add_edge("determine_priority", "assign_user")
+    # Define edges (duplicates and the classifier may skip agents, fan-out after assignee, fan-in before persist)
+    workflow.add_conditional_edges(
+        "fetch_context",
+        lambda state: FAN_OUT if state.get("duplicate") else "classify_ticket",
+        ["classify_ticket", *FAN_OUT]
+    )
+    workflow.add_conditional_edges(
+        "classify_ticket", _after_classify, ["determine_priority", "assign_user", *FAN_OUT]
+    )
+    workflow.add_conditional_edges("determine_priority", _after_priority, ["assign_user", *FAN_OUT])
     workflow.add_edge("assign_user", "generate_rationale")
-    workflow.add_edge("generate_rationale", "generate_reply")
-    workflow.add_edge("generate_reply", "save_results")
-    workflow.add_edge("save_results", END)
+    workflow.add_edge("assign_user", "generate_reply")
+    workflow.add_edge(FAN_OUT, last_node)
     
     # Compile graph
     graph = workflow.compile()
@@ -0,0 +1,214 @@
+"""
+Triage job queue - Runs triage outside the HTTP request.
+
+Jobs live in the triage_jobs collection. Workers (in the API process or
+separate `python worker.py` processes on any host) claim jobs with an
+atomic find_one_and_update that sets a lease; a job whose worker dies is
+picked up again once its lease expires. Failed runs are retried with
+exponential backoff up to TRIAGE_JOB_MAX_ATTEMPTS.
+"""
+import asyncio
+import os
+import random
+import socket
+import uuid
+from datetime import timedelta
+from typing import Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from database import get_triage_jobs_collection, get_tickets_collection
+from models import get_ist_now
+from triage.engine import triage_engine, build_triage_response
+
+
+TRIAGE_JOB_MAX_ATTEMPTS = int(os.getenv("TRIAGE_JOB_MAX_ATTEMPTS", "3"))
+TRIAGE_JOB_LEASE_SECONDS = float(os.getenv("TRIAGE_JOB_LEASE_SECONDS", "120"))
+TRIAGE_JOB_BACKOFF_SECONDS = float(os.getenv("TRIAGE_JOB_BACKOFF_SECONDS", "5"))
+TRIAGE_WORKER_POLL_SECONDS = float(os.getenv("TRIAGE_WORKER_POLL_SECONDS", "1.0"))
+
+
+async def enqueue_triage_job(ticket_id: str, mode: Optional[str] = None, bypass_cache: bool = False) -> dict:
+    """Queue a triage run for a ticket and return the job document."""
+    now = get_ist_now()
+    job = {
+        "ticket_id": ticket_id,
+        "mode": mode,
+        "bypass_cache": bypass_cache,
+        "status": "queued",
+        "attempts": 0,
+        "max_attempts": TRIAGE_JOB_MAX_ATTEMPTS,
+        "available_at": now,
+        "lease_owner": None,
+        "lease_expires_at": None,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": None
+    }
+    result = await get_triage_jobs_collection().insert_one(job)
+    job["_id"] = result.inserted_id
+    return job
+
+
+async def get_triage_job(job_id: str) -> Optional[dict]:
+    """Get a triage job by id."""
+    return await get_triage_jobs_collection().find_one({"_id": ObjectId(job_id)})
+
+
+async def claim_next_job(worker_id: str) -> Optional[dict]:
+    """
+    Atomically claim the oldest runnable job.
+
+    Runnable means queued and due, or running with an expired lease
+    (its worker stopped heartbeating).
+    """
+    now = get_ist_now()
+    return await get_triage_jobs_collection().find_one_and_update(
+        {
+            "$or": [
+                {"status": "queued", "available_at": {"$lte": now}},
+                {"status": "running", "lease_expires_at": {"$lte": now}}
+            ]
+        },
+        {
+            "$set": {
+                "status": "running",
+                "lease_owner": worker_id,
+                "lease_expires_at": now + timedelta(seconds=TRIAGE_JOB_LEASE_SECONDS),
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("available_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def _finish_job(job: dict, worker_id: str, update: dict) -> bool:
+    """Update a job only if this worker still holds its lease."""
+    update["updated_at"] = get_ist_now()
+    result = await get_triage_jobs_collection().update_one(
+        {"_id": job["_id"], "lease_owner": worker_id, "status": "running"},
+        {"$set": update}
+    )
+    return result.modified_count == 1
+
+
+async def complete_job(job: dict, worker_id: str, result: dict) -> bool:
+    """Mark a job as succeeded with its triage result."""
+    return await _finish_job(job, worker_id, {
+        "status": "succeeded",
+        "result": result,
+        "error": None,
+        "lease_owner": None,
+        "lease_expires_at": None,
+        "finished_at": get_ist_now()
+    })
+
+
+async def fail_job(job: dict, worker_id: str, error: str, retry: bool = True) -> bool:
+    """Requeue a failed job with exponential backoff, or fail it for good."""
+    if retry and job.get("attempts", 0) < job.get("max_attempts", TRIAGE_JOB_MAX_ATTEMPTS):
+        delay = TRIAGE_JOB_BACKOFF_SECONDS * (2 ** (job["attempts"] - 1))
+        delay *= random.uniform(0.8, 1.2)  # jitter so retries from a burst spread out
+        return await _finish_job(job, worker_id, {
+            "status": "queued",
+            "error": error,
+            "available_at": get_ist_now() + timedelta(seconds=delay),
+            "lease_owner": None,
+            "lease_expires_at": None
+        })
+    return await _finish_job(job, worker_id, {
+        "status": "failed",
+        "error": error,
+        "lease_owner": None,
+        "lease_expires_at": None,
+        "finished_at": get_ist_now()
+    })
+
+
+class TriageWorker:
+    """Drains the triage job queue with at most `concurrency` jobs in flight."""
+
+    def __init__(self, concurrency: int = 4, worker_id: Optional[str] = None):
+        self.concurrency = max(1, concurrency)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._stop = asyncio.Event()
+        self._tasks = set()
+
+    def stop(self):
+        """Stop claiming new jobs; in-flight jobs finish."""
+        self._stop.set()
+
+    async def run(self):
+        """Claim and process jobs until stop() is called."""
+        slots = asyncio.Semaphore(self.concurrency)
+        print(f"Triage worker {self.worker_id} started (concurrency={self.concurrency})")
+
+        while not self._stop.is_set():
+            await slots.acquire()
+            try:
+                job = await claim_next_job(self.worker_id)
+            except Exception as e:
+                print(f"⚠️  Triage worker claim error: {e}")
+                job = None
+
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=TRIAGE_WORKER_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(self._process(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        print(f"Triage worker {self.worker_id} stopped")
+
+    async def _heartbeat(self, job: dict):
+        """Extend the lease while the job is running."""
+        collection = get_triage_jobs_collection()
+        while True:
+            await asyncio.sleep(TRIAGE_JOB_LEASE_SECONDS / 3)
+            try:
+                await collection.update_one(
+                    {"_id": job["_id"], "lease_owner": self.worker_id, "status": "running"},
+                    {"$set": {"lease_expires_at": get_ist_now() + timedelta(seconds=TRIAGE_JOB_LEASE_SECONDS)}}
+                )
+            except Exception as e:
+                print(f"⚠️  Triage job {job['_id']} heartbeat failed: {e}")
+
+    async def _process(self, job: dict):
+        """Run triage for one claimed job."""
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            # A lease can expire after the last attempt was claimed (worker crashed)
+            if job["attempts"] > job.get("max_attempts", TRIAGE_JOB_MAX_ATTEMPTS):
+                await fail_job(job, self.worker_id, job.get("error") or "Lease expired too many times", retry=False)
+                return
+
+            ticket = await get_tickets_collection().find_one({"_id": ObjectId(job["ticket_id"])})
+            if not ticket:
+                await fail_job(job, self.worker_id, "Ticket not found", retry=False)
+                return
+
+            final_state = await triage_engine.run(ticket, job.get("mode"), job.get("bypass_cache", False))
+            if final_state.get("error"):
+                raise Exception(final_state["error"])
+
+            await complete_job(job, self.worker_id, build_triage_response(final_state))
+
+        except Exception as e:
+            print(f"⚠️  Triage job {job['_id']} failed (attempt {job['attempts']}): {e}")
+            try:
+                await fail_job(job, self.worker_id, f"AI triage failed: {str(e)}")
+            except Exception as inner:
+                print(f"⚠️  Could not record triage job failure: {inner}")
+        finally:
+            heartbeat.cancel()
@@ -0,0 +1,178 @@
+"""
+LLMCache - Content-addressed cache for agent LLM results.
+
+Prompts run at a fixed temperature and are deterministic functions of
+their inputs, so a result can be reused whenever the agent, model,
+prompt-template version and normalised inputs are the same.
+
+Two tiers:
+- In-memory LRU with TTL (always on)
+- MongoDB collection shared across processes and restarts (LLM_CACHE_PERSIST=true)
+"""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from database import get_llm_cache_collection
+from models import get_ist_now
+
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "false").lower() == "true"
+
+
+def _normalize(value: Any) -> Any:
+    """Normalise inputs so formatting-only differences hit the same entry."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, float):
+        return round(value, 4)
+    return value
+
+
+def make_cache_key(agent: str, model: str, prompt_version: str, inputs: Dict) -> str:
+    """Hash of agent, model, prompt-template version and normalised inputs."""
+    payload = json.dumps(_normalize(inputs), sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(f"{agent}|{model}|{prompt_version}|{payload}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def model_name(llm) -> str:
+    """Model identifier (plus bound generation settings) of a chat model, used as part of the cache key."""
+    name = str(getattr(llm, "model", "") or getattr(llm, "model_name", "") or type(llm).__name__)
+    # Registry clients bind per-agent temperature/max tokens; those change the output too
+    bound = getattr(llm, "kwargs", None)
+    if isinstance(bound, dict) and bound.get("generation_config"):
+        name += "|" + json.dumps(bound["generation_config"], sort_keys=True)
+    return name
+
+
+class LLMCache:
+    """Two-tier LRU/TTL cache for parsed agent results."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_seconds: float = LLM_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = LLM_CACHE_ENABLED
+        self.persist = LLM_CACHE_PERSIST
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters for /metrics."""
+        lookups = self.hits + self.persistent_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "persistent_tier": self.persist,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.persistent_hits) / lookups, 4) if lookups else 0.0
+        }
+
+    def clear(self):
+        """Drop every in-memory entry."""
+        self._entries.clear()
+
+    async def get(self, key: str, bypass: bool = False) -> Optional[Any]:
+        """Return a cached value, or None on miss, expiry or bypass."""
+        if not self.enabled:
+            return None
+        if bypass:
+            self.bypassed += 1
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        if self.persist:
+            value = await self._get_persistent(key)
+            if value is not None:
+                self._set_memory(key, value)
+                self.persistent_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any, agent: str = ""):
+        """Store a value in every enabled tier."""
+        if not self.enabled:
+            return
+        self._set_memory(key, value)
+        self.writes += 1
+        if self.persist:
+            await self._set_persistent(key, value, agent)
+
+    def _set_memory(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _get_persistent(self, key: str) -> Optional[Any]:
+        try:
+            doc = await get_llm_cache_collection().find_one({"_id": key})
+        except Exception as e:
+            print(f"LLM cache read error: {e}")
+            return None
+        if not doc:
+            return None
+        # The TTL monitor only runs once a minute, so check expiry here too
+        expires_at = doc["expires_at"]
+        if expires_at.tzinfo is None:
+            # MongoDB returns naive UTC datetimes
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= datetime.now(timezone.utc):
+            return None
+        return doc.get("value")
+
+    async def _set_persistent(self, key: str, value: Any, agent: str):
+        try:
+            collection = get_llm_cache_collection()
+            now = get_ist_now()
+            await collection.replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "agent": agent,
+                    "value": value,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds)
+                },
+                upsert=True
+            )
+        except Exception as e:
+            print(f"LLM cache write error: {e}")
+
+
+llm_cache = LLMCache()
@@ -0,0 +1,326 @@
+"""
+LLMGovernor - Process-wide admission control for every LLM call.
+
+- Token buckets for requests per minute and tokens per minute
+- Adaptive concurrency limit (AIMD): +1 per window of successful calls,
+  halved on a 429 or timeout
+- Priority lanes: when calls queue, priority classification goes first
+  and reply/rationale generation waits
+- Retries with backoff for 429s and timeouts, so a burst slows down
+  instead of degrading into fallback output
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Callable, Dict
+
+
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "600"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_INITIAL_CONCURRENCY = int(os.getenv("LLM_INITIAL_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "1.0"))
+LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "60"))
+
+# Lower runs first when calls are queued
+LANE_PRIORITY = {
+    "priority": 0,
+    "assignee": 1,
+    "fused": 1,
+    "rationale": 2,
+    "reply": 2
+}
+DEFAULT_LANE_PRIORITY = 2
+
+# Output tokens reserved per call until the real usage is known
+ESTIMATED_OUTPUT_TOKENS = 300
+
+# Exceptions that mean "slow down" (google.api_core and HTTP client names)
+OVERLOAD_ERRORS = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded"}
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """True for rate-limit (429), unavailable (503) and timeout errors."""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    if type(error).__name__ in OVERLOAD_ERRORS:
+        return True
+    return getattr(error, "code", None) in (429, 503) or "429" in str(error)
+
+
+def estimate_tokens(prompt: Any) -> int:
+    """Rough prompt size (~4 characters per token) plus the output reserve."""
+    return len(str(prompt)) // 4 + ESTIMATED_OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """Refills `rate_per_minute` units per minute up to one minute's worth."""
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float):
+        """Wait until `amount` units are available and take them."""
+        if self.rate <= 0:
+            return
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount: float):
+        """Return over-reserved units (negative) or charge extra ones (positive)."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class LaneStats:
+    """Queue-wait and outcome counters for one lane."""
+
+    def __init__(self):
+        self.calls = 0
+        self.queued = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.retries = 0
+        self.failures = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "queued": self.queued,
+            "wait_avg_ms": round(self.wait_total / self.calls * 1000, 2) if self.calls else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+            "retries": self.retries,
+            "failures": self.failures
+        }
+
+
+class LLMGovernor:
+    """Shared limiter that every agent LLM call goes through."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+        initial_concurrency: int = LLM_INITIAL_CONCURRENCY,
+        min_concurrency: int = LLM_MIN_CONCURRENCY,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_retries: int = LLM_MAX_RETRIES,
+        timeout_seconds: float = LLM_CALL_TIMEOUT_SECONDS
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.max_retries = max_retries
+        self.timeout_seconds = timeout_seconds
+        self.in_flight = 0
+        self.throttled = 0
+        self.timeouts = 0
+        self._waiters = []  # heap of (lane priority, sequence, future)
+        self._sequence = itertools.count()
+        self._last_decrease = 0.0
+        self.lanes: Dict[str, LaneStats] = {}
+
+    # --- Adaptive concurrency (AIMD) ---
+
+    def _on_success(self):
+        # Additive increase: about +1 after `limit` successful calls
+        self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def _on_overload(self):
+        # Multiplicative decrease, at most once per typical call duration so a
+        # burst of 429s from the same window only halves the limit once
+        now = time.monotonic()
+        if now - self._last_decrease >= 1.0:
+            self.limit = max(self.min_concurrency, self.limit / 2)
+            self._last_decrease = now
+
+    # --- Admission with priority lanes ---
+
+    async def _acquire_slot(self, priority: int):
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just before cancellation - hand it on
+                self._release_slot()
+            raise
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # waiter was cancelled
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    async def _admit(self, lane: str, estimated_tokens: int) -> LaneStats:
+        stats = self.lanes.setdefault(lane, LaneStats())
+        stats.queued += 1
+        started = time.monotonic()
+        try:
+            await self._acquire_slot(LANE_PRIORITY.get(lane, DEFAULT_LANE_PRIORITY))
+        finally:
+            stats.queued -= 1
+        try:
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimated_tokens)
+        except BaseException:
+            self._release_slot()
+            raise
+        waited = time.monotonic() - started
+        stats.calls += 1
+        stats.wait_total += waited
+        stats.wait_max = max(stats.wait_max, waited)
+        return stats
+
+    # --- Calls ---
+
+    async def call(self, lane: str, make_call: Callable[[], Any], prompt: Any = "") -> Any:
+        """
+        Run `await make_call()` under the governor and return its result.
+
+        429s and timeouts shrink the concurrency limit and are retried with
+        backoff up to max_retries; other errors are raised immediately.
+        """
+        estimated = estimate_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            stats = await self._admit(lane, estimated)
+            try:
+                result = await asyncio.wait_for(make_call(), timeout=self.timeout_seconds)
+            except Exception as e:
+                self._release_slot()
+                overloaded = is_overload_error(e)
+                if overloaded:
+                    self._record_overload(e)
+                if not overloaded or attempt == self.max_retries:
+                    stats.failures += 1
+                    raise
+                stats.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            except BaseException:
+                # Cancelled (client disconnect, caller's timeout): free the slot
+                # and the unused output reservation, or later calls queue forever
+                self._release_slot()
+                self.tokens.adjust(-ESTIMATED_OUTPUT_TOKENS)
+                raise
+            self._charge_usage(result, estimated)
+            self._release_slot()
+            self._on_success()
+            return result
+
+    async def ainvoke(self, llm, prompt: Any, lane: str) -> Any:
+        """llm.ainvoke(prompt) under the governor."""
+        return await self.call(lane, lambda: llm.ainvoke(prompt), prompt)
+
+    async def astream(self, llm, prompt: Any, lane: str) -> AsyncIterator[Any]:
+        """
+        llm.astream(prompt) under the governor.
+
+        The slot is held until the caller stops iterating, so callers that
+        stop early must close the iterator (contextlib.aclosing). Overload
+        errors before the first chunk are retried; later ones are raised.
+        """
+        estimated = estimate_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            stats = await self._admit(lane, estimated)
+            received = False
+            try:
+                stream = llm.astream(prompt)
+                try:
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(stream.__anext__(), timeout=self.timeout_seconds)
+                        except StopAsyncIteration:
+                            break
+                        received = True
+                        yield chunk
+                finally:
+                    await stream.aclose()
+            except GeneratorExit:
+                # Consumer stopped reading early (e.g. the reply hit its word limit)
+                self._release_slot()
+                self._on_success()
+                raise
+            except Exception as e:
+                self._release_slot()
+                overloaded = is_overload_error(e)
+                if overloaded:
+                    self._record_overload(e)
+                if received or not overloaded or attempt == self.max_retries:
+                    stats.failures += 1
+                    raise
+                stats.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            except BaseException:
+                self._release_slot()
+                raise
+            self._release_slot()
+            self._on_success()
+            return
+
+    def _record_overload(self, error: BaseException):
+        if isinstance(error, asyncio.TimeoutError):
+            self.timeouts += 1
+        else:
+            self.throttled += 1
+        self._on_overload()
+
+    def _backoff(self, attempt: int) -> float:
+        return LLM_RETRY_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.8, 1.2)
+
+    def _charge_usage(self, result: Any, estimated: int):
+        """Correct the token bucket with the provider-reported usage, if any."""
+        usage = getattr(result, "usage_metadata", None) or {}
+        total = usage.get("total_tokens") if isinstance(usage, dict) else None
+        if total:
+            self.tokens.adjust(total - estimated)
+
+    def stats(self) -> dict:
+        """Limiter state and per-lane queue-wait metrics for /metrics."""
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": len([w for w in self._waiters if not w[2].done()]),
+            "throttled": self.throttled,
+            "timeouts": self.timeouts,
+            "requests_available": round(self.requests.tokens, 1),
+            "tokens_available": round(self.tokens.tokens, 1),
+            "lanes": {lane: stats.snapshot() for lane, stats in self.lanes.items()}
+        }
+
+
+llm_governor = LLMGovernor()
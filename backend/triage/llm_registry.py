@@ -0,0 +1,240 @@
+"""
+LLMRegistry - One place that creates and shares chat model clients.
+
+Agents ask for a client by name with get_llm("priority"). Clients are
+created on first use; agents that use the same provider and model share
+one client (and its HTTP connection pool). Per-agent temperature and
+output-token limits are bound per call instead of needing a new client.
+
+Providers (LLM_PROVIDER):
+- gemini: Google Gemini via langchain-google-genai (needs GEMINI_API_KEY)
+- stub: deterministic local model with configurable latency, for
+  benchmarking the pipeline offline
+
+Per-agent settings fall back to the global ones:
+    LLM_MODEL / LLM_<AGENT>_MODEL
+    LLM_TEMPERATURE / LLM_<AGENT>_TEMPERATURE
+    LLM_MAX_OUTPUT_TOKENS / LLM_<AGENT>_MAX_OUTPUT_TOKENS
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+USE_MOCK = os.getenv("USE_MOCK_AI", "false").lower() == "true"
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+LLM_STUB_LATENCY_MS = float(os.getenv("LLM_STUB_LATENCY_MS", "300"))
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+DEFAULT_TEMPERATURE = 0.2
+
+# Agents that call an LLM (services/ai_triage.py is "legacy")
+AGENTS = ("priority", "assignee", "rationale", "reply", "fused", "legacy")
+
+
+def _agent_setting(agent: str, name: str, default: Optional[str]) -> Optional[str]:
+    """LLM_<AGENT>_<NAME>, then LLM_<NAME>, then the default."""
+    value = os.getenv(f"LLM_{agent.upper()}_{name}")
+    if value in (None, ""):
+        value = os.getenv(f"LLM_{name}", default)
+    return value if value not in (None, "") else None
+
+
+def agent_config(agent: str) -> Dict[str, Any]:
+    """Model, temperature and max_output_tokens for an agent."""
+    max_tokens = _agent_setting(agent, "MAX_OUTPUT_TOKENS", None)
+    return {
+        "model": _agent_setting(agent, "MODEL", DEFAULT_MODEL),
+        "temperature": float(_agent_setting(agent, "TEMPERATURE", str(DEFAULT_TEMPERATURE))),
+        "max_output_tokens": int(max_tokens) if max_tokens else None
+    }
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Deterministic offline chat model.
+
+    Answers every agent prompt in the format the agent expects after
+    `latency_ms`, so the graph can be benchmarked without network calls.
+    The same prompt always gets the same answer.
+    """
+    model: str = "stub"
+    latency_ms: float = LLM_STUB_LATENCY_MS
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+        priority = ("P0", "P1", "P2", "P3")[digest % 4]
+        # Candidate teams are listed as "Name (ID: team_id)"
+        team_ids = re.findall(r"\(ID: ([^)]+)\)", prompt)
+        assignee = team_ids[0] if team_ids else "unassigned"
+
+        if '"reply_draft"' in prompt:
+            return json.dumps({
+                "priority": priority,
+                "confidence": 0.8,
+                "assignee_user_id": assignee,
+                "priority_rationale": f"Stub rationale for {priority}.",
+                "assignee_rationale": f"Stub rationale for {assignee}.",
+                "reply_draft": _stub_reply(priority)
+            })
+        if '"priority_rationale"' in prompt:
+            return json.dumps({
+                "priority_rationale": f"Stub rationale for {priority}.",
+                "assignee_rationale": f"Stub rationale for {assignee}."
+            })
+        if '"assignee_user_id"' in prompt:
+            return json.dumps({"assignee_user_id": assignee})
+        if '"priority"' in prompt:
+            return json.dumps({"priority": priority, "confidence": 0.8})
+        return _stub_reply(priority)
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        text = self._respond(messages)
+        usage = _stub_usage(messages, text)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        time.sleep(self.latency_ms / 1000)
+        return self._result(messages)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._result(messages)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        words = self._respond(messages).split(" ")
+        for i, word in enumerate(words):
+            time.sleep(self.latency_ms / 1000 / len(words))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        # Latency is spread over the words to mimic time-to-first-token + decoding
+        words = self._respond(messages).split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.latency_ms / 1000 / len(words))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+
+
+def _stub_reply(priority: str) -> str:
+    return (
+        "Hello, thank you for contacting us. We have received your ticket and "
+        f"logged it as {priority}. Our team is reviewing it and will follow up "
+        "with an update soon. Best regards, Support Team"
+    )
+
+
+def _stub_usage(messages: List[BaseMessage], text: str) -> Dict[str, int]:
+    input_tokens = sum(len(str(message.content)) for message in messages) // 4
+    output_tokens = len(text) // 4
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+
+class LLMRegistry:
+    """Lazily created, shared chat model clients."""
+
+    def __init__(self, provider: str = LLM_PROVIDER):
+        self.provider = provider
+        self._clients: Dict[str, BaseChatModel] = {}  # one per model
+        self._agents: Dict[str, Any] = {}  # per-agent bound runnables
+
+    def enabled(self) -> bool:
+        """False when agents should use their heuristic fallbacks."""
+        if self.provider == "stub":
+            return True
+        return self.provider == "gemini" and bool(GEMINI_API_KEY) and not USE_MOCK
+
+    def get(self, agent: str):
+        """Client for an agent with its temperature/max tokens bound, or None."""
+        if agent in self._agents:
+            return self._agents[agent]
+        if not self.enabled():
+            return None
+
+        config = agent_config(agent)
+        client = self._client(config["model"])
+        if self.provider == "gemini":
+            generation_config = {"temperature": config["temperature"]}
+            if config["max_output_tokens"]:
+                generation_config["max_output_tokens"] = config["max_output_tokens"]
+            llm = client.bind(generation_config=generation_config)
+        else:
+            llm = client
+        self._agents[agent] = llm
+        return llm
+
+    def _client(self, model: str) -> BaseChatModel:
+        if model not in self._clients:
+            if self.provider == "stub":
+                self._clients[model] = StubChatModel(model=f"stub:{model}")
+            else:
+                from langchain_google_genai import ChatGoogleGenerativeAI
+                # Per-agent settings are bound per call, so the defaults here only apply to unbound use
+                self._clients[model] = ChatGoogleGenerativeAI(
+                    model=model,
+                    api_key=GEMINI_API_KEY,
+                    temperature=DEFAULT_TEMPERATURE
+                )
+        return self._clients[model]
+
+    def warm_up(self):
+        """Create every agent's client up front (used by TriageEngine.warm_up)."""
+        for agent in AGENTS:
+            self.get(agent)
+
+    def status(self) -> Dict[str, Optional[dict]]:
+        """Per-agent provider/model config, None for agents without a client."""
+        return {
+            agent: ({"provider": self.provider, **agent_config(agent)} if self.get(agent) is not None else None)
+            for agent in AGENTS
+        }
+
+    def reset(self):
+        """Drop all clients (next get() creates them again)."""
+        self._clients.clear()
+        self._agents.clear()
+
+
+llm_registry = LLMRegistry()
+
+
+def get_llm(agent: str):
+    """Shared chat model for an agent, or None when no provider is configured."""
+    return llm_registry.get(agent)
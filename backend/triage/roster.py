@@ -0,0 +1,171 @@
+"""
+TeamRoster - Process-wide copy of the teams in the users collection.
+
+Loaded at startup and shared by every triage run, with id -> team lookups
+so agents never query the users collection per ticket. The copy is
+reloaded when:
+- ROSTER_TTL_SECONDS have passed since the last load
+- the roster version (a counter in roster_meta, bumped by seed_users.py
+  and the /teams admin endpoints) changes; any process notices within
+  ROSTER_VERSION_CHECK_SECONDS
+- invalidate() is called in this process
+"""
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional
+from pymongo import ReturnDocument
+from database import get_users_collection, get_roster_meta_collection
+from models import get_ist_now
+from triage.skill_matcher import SkillMatcher
+
+
+# Reload the roster after this many seconds even if no change was announced
+ROSTER_TTL_SECONDS = float(os.getenv("ROSTER_TTL_SECONDS", "300"))
+# How often to compare the cached roster version with MongoDB (0 disables)
+ROSTER_VERSION_CHECK_SECONDS = float(os.getenv("ROSTER_VERSION_CHECK_SECONDS", "5"))
+
+ROSTER_VERSION_ID = "roster"
+
+
+async def get_roster_version() -> int:
+    """Current roster version (0 before the first bump)."""
+    doc = await get_roster_meta_collection().find_one({"_id": ROSTER_VERSION_ID})
+    return doc["version"] if doc else 0
+
+
+async def bump_roster_version() -> int:
+    """Announce a change to the users collection; every process reloads its roster."""
+    doc = await get_roster_meta_collection().find_one_and_update(
+        {"_id": ROSTER_VERSION_ID},
+        {"$inc": {"version": 1}, "$set": {"updated_at": get_ist_now()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["version"]
+
+
+class TeamRoster:
+    """Teams loaded once and shared by every triage run."""
+
+    def __init__(self):
+        self.teams: List[Dict] = []
+        self.loaded_at: Optional[float] = None
+        self.version: Optional[int] = None
+        self._by_id: Dict[str, Dict] = {}
+        self._by_id_teams: Optional[List[Dict]] = None
+        self._matcher: Optional[SkillMatcher] = None
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.version_changes = 0
+
+    async def load(self) -> List[Dict]:
+        """Load all teams from MongoDB."""
+        version = await get_roster_version()
+        users_collection = get_users_collection()
+        teams = []
+        async for team in users_collection.find({}):
+            teams.append({
+                "user_id": team["_id"],
+                "name": team.get("name", ""),
+                "skills": team.get("skills", [])
+            })
+        # Keep the same list when nothing changed so the skill matcher is reused
+        if teams != self.teams:
+            self.teams = teams
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self._checked_at = self.loaded_at
+        self.reloads += 1
+        return self.teams
+
+    def invalidate(self):
+        """Reload on the next access."""
+        self.loaded_at = None
+
+    def _expired(self) -> bool:
+        return (
+            self.loaded_at is None
+            or not self.teams
+            or time.monotonic() - self.loaded_at > ROSTER_TTL_SECONDS
+        )
+
+    async def _version_changed(self) -> bool:
+        """Compare with the MongoDB roster version, at most every ROSTER_VERSION_CHECK_SECONDS."""
+        if ROSTER_VERSION_CHECK_SECONDS <= 0 or self.version is None:
+            return False
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < ROSTER_VERSION_CHECK_SECONDS:
+            return False
+        self._checked_at = now
+        try:
+            changed = await get_roster_version() != self.version
+        except Exception as e:
+            print(f"⚠️  Roster version check failed: {e}")
+            return False
+        if changed:
+            self.version_changes += 1
+        return changed
+
+    async def get_teams(self) -> List[Dict]:
+        """
+        Return the cached teams, reloading them if missing, empty, expired
+        or changed in MongoDB.
+
+        Callers must not mutate the returned dicts.
+        """
+        seen = self.loaded_at
+        if self._expired() or await self._version_changed():
+            async with self._lock:
+                # Concurrent callers wait for one reload instead of each running their own
+                if self.loaded_at == seen:
+                    try:
+                        await self.load()
+                    except Exception as e:
+                        self.reload_errors += 1
+                        if not self.teams:
+                            raise
+                        print(f"⚠️  Roster reload failed, using cached teams: {e}")
+        return self.teams
+
+    async def get_team(self, user_id: str) -> Optional[Dict]:
+        """Team for an id from the cached roster, or None."""
+        teams = await self.get_teams()
+        if self._by_id_teams is not teams:
+            self._by_id = {team["user_id"]: team for team in teams}
+            self._by_id_teams = teams
+        team = self._by_id.get(user_id)
+        if team is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return team
+
+    async def get_matcher(self) -> SkillMatcher:
+        """Skill matcher for the current teams, rebuilt only when they change."""
+        teams = await self.get_teams()
+        if self._matcher is None or self._matcher.teams is not teams:
+            self._matcher = SkillMatcher(teams)
+        return self._matcher
+
+    def stats(self) -> dict:
+        """Lookup and freshness counters for /metrics."""
+        return {
+            "teams": len(self.teams),
+            "version": self.version,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at is not None else None,
+            "ttl_seconds": ROSTER_TTL_SECONDS,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "version_changes": self.version_changes
+        }
+
+
+roster = TeamRoster()
@@ -0,0 +1,90 @@
+"""
+SkillMatcher - Scores every team's skills against a ticket in one pass.
+
+Built once from the roster: each skill is split into word tokens and
+indexed by its first token. Scoring tokenizes the ticket text once and,
+at each position, only checks the skills that start with that token, so
+the cost follows the ticket length and the number of real candidates
+instead of teams x skills. Skills match on whole words ("ip" does not
+match "ship"); a trailing plural "s" is ignored on both sides.
+"""
+import re
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+
+SKILL_MATCH_SCORE = 10.0
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(token: str) -> str:
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with plurals folded."""
+    return [_normalize(token) for token in _TOKEN_RE.findall(text.lower())]
+
+
+def context_text(context: Dict) -> str:
+    """The ticket fields that skills are matched against."""
+    return " ".join([
+        context.get("title") or "",
+        context.get("body") or "",
+        context.get("product_area") or "",
+        " ".join(context.get("tags") or [])
+    ])
+
+
+class SkillMatcher:
+    """Phrase index over the skills of a fixed list of teams."""
+
+    def __init__(self, teams: List[Dict]):
+        self.teams = teams
+        # first token -> [(skill tokens, team index, skill id)]
+        self._index: Dict[str, List[Tuple[Tuple[str, ...], int, int]]] = {}
+        skill_id = 0
+        for team_index, team in enumerate(teams):
+            for skill in team.get("skills", []):
+                tokens = tuple(tokenize(skill))
+                if tokens:
+                    self._index.setdefault(tokens[0], []).append((tokens, team_index, skill_id))
+                skill_id += 1
+
+    def match(self, text: str) -> Dict[int, float]:
+        """Score per team index for teams with at least one matching skill."""
+        tokens = tokenize(text)
+        matched = set()
+        scores: Dict[int, float] = {}
+        for i, token in enumerate(tokens):
+            for skill_tokens, team_index, skill_id in self._index.get(token, ()):
+                if skill_id in matched:
+                    continue
+                if len(skill_tokens) == 1 or tuple(tokens[i:i + len(skill_tokens)]) == skill_tokens:
+                    matched.add(skill_id)
+                    scores[team_index] = scores.get(team_index, 0.0) + SKILL_MATCH_SCORE
+        return scores
+
+    def score(self, context: Dict, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Teams sorted by skill-match score (highest first), each a copy with
+        a "score" field. Ties keep roster order. `limit` returns only the top
+        entries, padded with unmatched teams like the full list would be.
+        """
+        scores = self.match(context_text(context))
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))
+        if limit is not None:
+            ranked = ranked[:limit]
+            if len(ranked) < limit:
+                unmatched = (i for i in range(len(self.teams)) if i not in scores)
+                ranked += islice(unmatched, limit - len(ranked))
+        else:
+            ranked += [i for i in range(len(self.teams)) if i not in scores]
+        return [{**self.teams[i], "score": scores.get(i, 0.0)} for i in ranked]
+
+    def scores_by_id(self, context: Dict) -> Dict[str, float]:
+        """Skill-match score per team id, for teams with at least one match."""
+        return {self.teams[i]["user_id"]: score for i, score in self.match(context_text(context)).items()}
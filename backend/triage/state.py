@@ -1,15 +1,30 @@
 """
 TriageState - State model for LangGraph multi-agent workflow.
 """
-from typing import Optional, TypedDict
+from typing import Annotated, Optional, TypedDict
+
+
+def _latest_error(current: Optional[str], update: Optional[str]) -> Optional[str]:
+    """Reducer for error: parallel branches may both write it in the same step."""
+    return update
 
 
 class TriageState(TypedDict, total=False):
-    """State passed between agents in the triage workflow."""
+    """
+    State passed between agents in the triage workflow.
+
+    Nodes return only the keys they produce so branches that run in
+    parallel never write the same key.
+    """
     ticket: Optional[dict]
+    mode: Optional[str]  # "multi" or "fused"
+    bypass_cache: Optional[bool]  # Skip LLM cache reads for this run
     context: Optional[dict]
     priority: Optional[dict]
     assignee: Optional[dict]
     rationale: Optional[dict]  # Contains priority_rationale and assignee_rationale
     reply: Optional[str]
-    error: Optional[str]
+    heuristic: Optional[dict]  # HeuristicClassifier decision (which LLM calls were skipped)
+    duplicate: Optional[dict]  # Canonical ticket whose triage was reused: {"ticket_id", "similarity"}
+    persist_timings: Optional[dict]  # PersistNode write latencies in ms
+    error: Annotated[Optional[str], _latest_error]
@@ -0,0 +1,36 @@
+"""
+Triage worker - Drains the async triage job queue.
+
+Run any number of these (on any host that can reach MongoDB):
+    python worker.py --concurrency 4
+"""
+import argparse
+import asyncio
+import signal
+from database import connect_to_mongo, close_mongo_connection
+from triage import triage_engine
+from triage.jobs import TriageWorker
+
+
+async def run_worker(concurrency: int, worker_id: str = None):
+    """Connect, warm up the triage engine and process jobs until SIGINT/SIGTERM."""
+    await connect_to_mongo()
+    await triage_engine.warm_up()
+    
+    worker = TriageWorker(concurrency=concurrency, worker_id=worker_id)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    
+    try:
+        await worker.run()
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process async triage jobs")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs processed at once")
+    parser.add_argument("--worker-id", default=None, help="Lease owner id (defaults to host:pid)")
+    args = parser.parse_args()
+    asyncio.run(run_worker(args.concurrency, args.worker_id))
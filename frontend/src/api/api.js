@@ -11,10 +11,25 @@ const api = axios.create({
 
 // Tickets API
 export const ticketsAPI = {
-  // Get all tickets
-  getAll: async () => {
-    const response = await api.get('/tickets');
-    return response.data;
+  // Get one page of tickets (newest first); pass nextCursor back to get the next page
+  getPage: async ({ cursor, limit, ...filters } = {}) => {
+    const response = await api.get('/tickets', {
+      params: { cursor, limit, ...filters },
+      paramsSerializer: { indexes: null },
+    });
+    return {
+      tickets: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null,
+    };
+  },
+
+  // Get one page of a ticket's activity history (newest first)
+  getActivities: async (id, { cursor, limit } = {}) => {
+    const response = await api.get(`/tickets/${id}/activities`, { params: { cursor, limit } });
+    return {
+      activities: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null,
+    };
   },
 
   // Get single ticket
@@ -46,6 +61,35 @@ export const ticketsAPI = {
     const response = await api.post(`/tickets/${id}/triage`);
     return response.data;
   },
+
+  // Triage ticket with live progress (Server-Sent Events).
+  // onNode is called as each graph node finishes, onToken(token, reset) with each
+  // chunk of the reply draft (reset: the draft so far is replaced by token);
+  // resolves with the triage result.
+  triageStream: (id, { onNode, onToken } = {}) =>
+    new Promise((resolve, reject) => {
+      const source = new EventSource(`${API_BASE_URL}/tickets/${id}/triage/stream`);
+      source.addEventListener('node', (event) => {
+        if (onNode) onNode(JSON.parse(event.data));
+      });
+      source.addEventListener('token', (event) => {
+        const data = JSON.parse(event.data);
+        if (onToken) onToken(data.token, Boolean(data.reset));
+      });
+      source.addEventListener('result', (event) => {
+        source.close();
+        resolve(JSON.parse(event.data));
+      });
+      source.addEventListener('failed', (event) => {
+        source.close();
+        reject(new Error(JSON.parse(event.data).detail));
+      });
+      // Connection errors (and 4xx responses) - don't let EventSource reconnect
+      source.onerror = () => {
+        source.close();
+        reject(new Error('Triage stream disconnected'));
+      };
+    }),
 };
 
 export default api;
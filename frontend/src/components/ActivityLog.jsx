@@ -1,5 +1,7 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import {
+  Box,
+  Button,
   Card,
   CardContent,
   Typography,
@@ -17,11 +19,38 @@ import CreateIcon from '@mui/icons-material/Create';
 import EditIcon from '@mui/icons-material/Edit';
 import SmartToyIcon from '@mui/icons-material/SmartToy';
 import ErrorIcon from '@mui/icons-material/Error';
+import { ticketsAPI } from '../api/api';
 
-const ActivityLog = ({ activities }) => {
+const ActivityLog = ({ ticketId, activities: recentActivities, activityCount }) => {
+  // Full history loaded from GET /tickets/{id}/activities (oldest first), null until requested
+  const [history, setHistory] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingHistory, setLoadingHistory] = useState(false);
+
+  useEffect(() => {
+    setHistory(null);
+    setNextCursor(null);
+  }, [ticketId, activityCount]);
+
+  const loadHistory = async () => {
+    try {
+      setLoadingHistory(true);
+      const page = await ticketsAPI.getActivities(ticketId, { cursor: nextCursor });
+      const older = [...page.activities].reverse();
+      setHistory((current) => (current && nextCursor ? [...older, ...current] : older));
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('ActivityLog: Error loading history:', error);
+    } finally {
+      setLoadingHistory(false);
+    }
+  };
+
+  const activities = history || recentActivities;
   if (!activities || activities.length === 0) {
     return null;
   }
+  const hasOlder = history ? Boolean(nextCursor) : (activityCount || 0) > activities.length;
 
   const getIcon = (action) => {
     switch (action) {
@@ -86,6 +115,13 @@ const ActivityLog = ({ activities }) => {
         <Typography variant="h6" gutterBottom>
           Activity Log
         </Typography>
+        {hasOlder && (
+          <Box sx={{ display: 'flex', justifyContent: 'center' }}>
+            <Button size="small" onClick={loadHistory} disabled={loadingHistory}>
+              {loadingHistory ? 'Loading...' : history ? 'Load older activity' : `Show full history (${activityCount})`}
+            </Button>
+          </Box>
+        )}
         <Timeline position="right">
           {activities.map((activity, index) => {
             const timestamp = activity?.timestamp || activity?.created_at || null;
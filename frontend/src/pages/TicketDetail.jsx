@@ -39,12 +39,26 @@ const priorityColors = {
   P3: 'success',
 };
 
+const triageStepLabels = {
+  find_duplicate: 'Duplicate check',
+  fetch_context: 'Context loaded',
+  classify_ticket: 'Quick classification',
+  determine_priority: 'Priority set',
+  assign_user: 'Team assigned',
+  generate_rationale: 'Rationale written',
+  generate_reply: 'Reply drafted',
+  fused_triage: 'Triage complete',
+  save_results: 'Saved',
+};
+
 const TicketDetail = () => {
   const { id } = useParams();
   const navigate = useNavigate();
   const [ticket, setTicket] = useState(null);
   const [loading, setLoading] = useState(true);
   const [triaging, setTriaging] = useState(false);
+  const [triageSteps, setTriageSteps] = useState([]);
+  const [streamedReply, setStreamedReply] = useState('');
   const [error, setError] = useState(null);
   const [editingReply, setEditingReply] = useState(false);
   const [replyDraft, setReplyDraft] = useState('');
@@ -78,8 +92,22 @@ const TicketDetail = () => {
   const handleTriage = async () => {
     try {
       setTriaging(true);
+      setTriageSteps([]);
+      setStreamedReply('');
       setError(null);
-      await ticketsAPI.triage(id);
+      await ticketsAPI.triageStream(id, {
+        onNode: ({ node, output }) => {
+          let label = triageStepLabels[node] || node;
+          if (node === 'determine_priority' && output.priority) {
+            label = `Priority ${output.priority.priority}`;
+          }
+          if (node === 'find_duplicate' && output.duplicate) {
+            label = `Duplicate of ${output.duplicate.ticket_id}`;
+          }
+          setTriageSteps((steps) => [...steps, label]);
+        },
+        onToken: (token, reset) => setStreamedReply((reply) => (reset ? token : reply + token)),
+      });
       await fetchTicket(); // Refresh ticket data
     } catch (err) {
       setError('AI triage failed, please try again.');
@@ -311,7 +339,13 @@ const TicketDetail = () => {
           <Box sx={{ mt: 2 }}>
             <Alert severity="info">
               {saving ? 'Saving ticket...' : 'Auto-triaging ticket...'}
+              {!saving && triageSteps.length > 0 && ` ${triageSteps.join(' · ')}`}
             </Alert>
+            {!saving && streamedReply && (
+              <Typography variant="body2" sx={{ mt: 1, whiteSpace: 'pre-wrap' }}>
+                {streamedReply}
+              </Typography>
+            )}
           </Box>
         )}
       </Paper>
@@ -374,7 +408,11 @@ const TicketDetail = () => {
         </Paper>
       )}
 
-      <ActivityLog activities={ticket.activities} />
+      <ActivityLog
+        ticketId={ticket.id}
+        activities={ticket.activities}
+        activityCount={ticket.activity_count}
+      />
 
       <Dialog open={deleteDialogOpen} onClose={() => setDeleteDialogOpen(false)}>
         <DialogTitle>Delete Ticket</DialogTitle>
@@ -19,7 +19,9 @@ import { ticketsAPI } from '../api/api';
 
 const TicketList = () => {
   const [tickets, setTickets] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const [editDialogOpen, setEditDialogOpen] = useState(false);
   const [editingTicket, setEditingTicket] = useState(null);
@@ -31,8 +33,9 @@ const TicketList = () => {
     try {
       setLoading(true);
       setError(null);
-      const data = await ticketsAPI.getAll();
-      setTickets(data);
+      const page = await ticketsAPI.getPage();
+      setTickets(page.tickets);
+      setNextCursor(page.nextCursor);
     } catch (err) {
       setError('Failed to load tickets. Please try again.');
       console.error(err);
@@ -41,6 +44,20 @@ const TicketList = () => {
     }
   };
 
+  const fetchMoreTickets = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await ticketsAPI.getPage({ cursor: nextCursor });
+      setTickets((current) => [...current, ...page.tickets]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      setError('Failed to load more tickets. Please try again.');
+      console.error(err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchTickets();
   }, []);
@@ -137,6 +154,14 @@ const TicketList = () => {
         </Grid>
       )}
 
+      {nextCursor && (
+        <Box sx={{ display: 'flex', justifyContent: 'center', mt: 3 }}>
+          <Button variant="outlined" onClick={fetchMoreTickets} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </Button>
+        </Box>
+      )}
+
       <Dialog 
         open={editDialogOpen} 
         onClose={handleEditCancel}